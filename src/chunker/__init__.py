@@ -2,13 +2,23 @@
 
 This package provides various chunking strategies to split documents into manageable pieces for further processing,
 such as embedding and indexing. It includes token-based, sliding window, sentence-based, paragraph-based, LLM-based,
-semantic, and context-aware chunking methods.
+semantic, and context-aware chunking methods, and the multilingual sentence segmenter they share.
 """
 
 
 from src.chunker.chunkers import (
-    BaseChunker, TokenChunker, SlidingWindowChunker, SentenceChunker, ParagraphChunker, llm_based_chunking, 
-    semantic_chunking, context_aware_chunking
+    BaseChunker, TokenChunker, SlidingWindowChunker, SentenceChunker, TokenBudgetChunker, ParagraphChunker, SemanticChunker, llm_based_chunking, 
+    semantic_chunking, context_aware_chunking, context_aware_chunking_many, context_aware_spans,
+    iter_context_aware_chunks, iter_context_aware_spans, iter_paragraph_chunks
+)
+from src.chunker.chunk_batch import ChunkBatch, ChunkView, materialize
+from src.chunker.chunk_cache import ChunkCache, shared_chunk_cache
+from src.chunker.segmenter import (
+    SentenceSegmenter, get_segmenter, sentence_spans, sentence_spans_many, split_sentences
+)
+from src.chunker.registry import (
+    TokenizerHandle, tokenizer_handle, get_tokenizer, get_hf_tokenizer, get_spacy_tokenizer, preload_tokenizers,
+    tokenizer_memory_report, get_embedding_provider, get_token_chunker
 )
 
 
@@ -17,8 +27,34 @@ __all__ = [
     "TokenChunker",
     "SlidingWindowChunker",
     "SentenceChunker",
+    "TokenBudgetChunker",
     "ParagraphChunker",
+    "SemanticChunker",
     "llm_based_chunking",
     "semantic_chunking",
-    "context_aware_chunking"
+    "context_aware_chunking",
+    "context_aware_chunking_many",
+    "context_aware_spans",
+    "iter_context_aware_chunks",
+    "iter_context_aware_spans",
+    "iter_paragraph_chunks",
+    "ChunkBatch",
+    "ChunkView",
+    "materialize",
+    "ChunkCache",
+    "shared_chunk_cache",
+    "SentenceSegmenter",
+    "get_segmenter",
+    "sentence_spans",
+    "sentence_spans_many",
+    "split_sentences",
+    "TokenizerHandle",
+    "tokenizer_handle",
+    "get_tokenizer",
+    "get_hf_tokenizer",
+    "get_spacy_tokenizer",
+    "preload_tokenizers",
+    "tokenizer_memory_report",
+    "get_embedding_provider",
+    "get_token_chunker"
 ]
\ No newline at end of file
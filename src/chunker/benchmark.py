@@ -0,0 +1,305 @@
+"""
+Throughput benchmark for XRAG+ chunkers on long documents.
+
+Run using - python -m src.chunker.benchmark [--path ./data/index/hf_wiki_extracted/en] [--docs 200] [--repeat 3]
+
+Compares the single-pass `SentenceChunker` and `context_aware_chunking` against their previous implementations
+(re-tokenizing / re-joining the growing merged string, locating offsets with `text.find`, regex sentence splits),
+checks both return the same chunks (on real articles they differ where the segmenter keeps abbreviations and
+lowercase continuations inside a sentence), and reports docs/s and MB/s. Documents are read from a JSON/JSONL file or directory of extracted
+Wikipedia articles (`text` field, longest first); without `--path` synthetic long articles are generated.
+
+Also measures the memory held by chunker outputs (`chunk()` strings vs `chunk_views()` ChunkViews, tracemalloc)
+for the sliding-window (`--window`/`--overlap` tokens), sentence and context-aware chunkers, and the sentence
+segmenter (`src.chunker.segmenter`) against the regexes it replaced, in sentences/s: on the articles, and on
+synthetic en/de/es/ru/hi paragraphs with abbreviations, initials, ordinals and dandas, where the number of
+sentences is known (`exact` = share of texts split into exactly that many sentences).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import re
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Iterator, List
+
+from src.chunker.chunkers import (
+    SentenceChunker, SlidingWindowChunker, context_aware_chunking, iter_context_aware_chunks,
+)
+from src.chunker.config import Settings
+from src.chunker.segmenter import get_segmenter, sentence_spans_many
+from src.chunker.utils import split_spans, whitespace_tokens
+
+settings = Settings()
+
+# sentence splitters replaced by the segmenter, kept as baselines
+LEGACY_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?。！？])\s+|(?<=\n)\s*")                          # SentenceChunker & co.
+LEGACY_CONTEXT_SPLIT_RE = re.compile(r'[.!?\n](?:(?<=[.!?])(\s+)(?=[A-Z0-9"])|(?<=\n)\s*\n+)')    # context-aware chunking
+LEGACY_SUMMARIZER_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")                                      # summarizer without punkt
+
+
+
+def legacy_sentence_chunk(doc: Dict[str, Any], min_tokens: int = settings.DEFAULT_MIN_TOKENS_SENTENCE):
+    """Previous `SentenceChunker.chunk` (whitespace counting, regex splitter), kept as the benchmark baseline."""
+    text = doc.get("text", "")
+    parts = [p.strip() for p in re.split(LEGACY_SENTENCE_SPLIT_RE, text) if p and p.strip()]
+    out = []
+    i = 0
+    while i < len(parts):
+        curr = parts[i]
+        token_count = len(whitespace_tokens(curr))
+        j = i + 1
+        while token_count < min_tokens and j < len(parts):
+            curr = curr + " " + parts[j]
+            token_count = len(whitespace_tokens(curr))
+            j += 1
+        start = text.find(curr)
+        out.append((curr, {"start_char": start, "end_char": start + len(curr) if start != -1 else -1, "token_count": token_count}))
+        i = j
+    return out
+
+
+
+def legacy_context_aware_chunking(doc: Dict[str, Any], max_chars: int, overlap_sentences: int):
+    """
+    Previous `context_aware_chunking` (candidate string rebuilt per sentence), kept as the benchmark baseline.
+    Only change: when the carried-over overlap leaves no room for the next sentence it is dropped, where the
+    original re-emitted the same chunk forever.
+    """
+    text, title = doc["text"], doc.get("title", "")
+    if not text:
+        return []
+    paragraphs = [p.strip() for p in re.split(r"\n\s*\n+", text) if p.strip()]
+    sentences = []
+    for p in paragraphs:
+        s = [s.strip() for s in re.split(r'(?<=[\.\!\?])\s+(?=[A-Z0-9"])', p) if s.strip()]
+        sentences.extend(s or [p])
+
+    chunks, current, fresh, i = [], [], False, 0
+    join_current = lambda: " ".join(current).strip()
+    while i < len(sentences):
+        sent = sentences[i]
+        candidate = (join_current() + " " + sent).strip() if current else sent
+        if len(candidate) > max_chars:
+            if current and fresh:
+                chunks.append(join_current())
+                current = current[-overlap_sentences:] if overlap_sentences > 0 else []
+                fresh = False
+            elif current:
+                current = []
+            else:
+                chunks.append(sent[:max_chars])
+                sentences[i] = sent[max_chars:]
+        else:
+            current.append(sent)
+            fresh = True
+            i += 1
+    if current and fresh:
+        chunks.append(join_current())
+    return [(c, {"context_title": title}) for c in chunks]
+
+
+
+def _iter_texts(path: str) -> Iterator[str]:
+    files = [os.path.join(path, f) for f in sorted(os.listdir(path))] if os.path.isdir(path) else [path]
+    for fp in files:
+        with open(fp, "r", encoding="utf-8") as fh:
+            try:
+                data = json.load(fh)
+                records = data.get("data", [data]) if isinstance(data, dict) else data
+            except json.JSONDecodeError:
+                fh.seek(0)
+                records = (json.loads(line) for line in fh if line.strip())
+            for rec in records:
+                if isinstance(rec, dict) and rec.get("text"):
+                    yield rec["text"]
+
+
+def load_docs(path: str = None, n_docs: int = 200, seed: int = 13) -> List[Dict[str, Any]]:
+    """The `n_docs` longest articles under `path`, or synthetic Wikipedia-like articles (~60k chars each)."""
+    if path:
+        texts = sorted(_iter_texts(path), key=len, reverse=True)[:n_docs]
+    else:
+        rng = random.Random(seed)
+        words = ("the of and in to a was is for on as by with from that at his an were which are it "
+                 "century river city population university war government system language species").split()
+        def sentence():
+            return " ".join(rng.choice(words) for _ in range(rng.randint(2, 25))).capitalize() + rng.choice(".!?")
+        texts = ["\n\n".join(" ".join(sentence() for _ in range(rng.randint(3, 12))) for _ in range(80))
+                 for _ in range(n_docs)]
+    return [{"doc_id": f"bench-{i}", "title": f"bench-{i}", "text": t, "language": "en"} for i, t in enumerate(texts)]
+
+
+
+def time_chunker(fn: Callable[[Dict[str, Any]], list], docs: List[Dict[str, Any]], repeat: int = 3) -> Dict[str, float]:
+    """Best-of-`repeat` wall time of chunking all docs with `fn`."""
+    n_chars = sum(len(d["text"]) for d in docs)
+    best, n_chunks = float("inf"), 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        n_chunks = sum(len(fn(d)) for d in docs)
+        best = min(best, time.perf_counter() - t0)
+    return {"seconds": round(best, 4), "docs_per_s": round(len(docs) / best, 2),
+            "mb_per_s": round(n_chars / best / 1e6, 3), "chunks": n_chunks}
+
+
+def measure_chunk_memory(fn: Callable[[Dict[str, Any]], list], docs: List[Dict[str, Any]]) -> Dict[str, float]:
+    """Bytes allocated (and still held) by the outputs of `fn` over all docs, i.e. what a chunk buffer keeps alive."""
+    n_chars = sum(len(d["text"]) for d in docs)
+    tracemalloc.start()
+    try:
+        held = [fn(d) for d in docs]
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"held_mb": round(current / 1e6, 2), "peak_mb": round(peak / 1e6, 2),
+            "x_corpus": round(current / max(n_chars, 1), 2), "chunks": sum(len(c) for c in held)}
+
+
+def compare_sentence_chunker(docs: List[Dict[str, Any]], min_tokens: int = settings.DEFAULT_MIN_TOKENS_SENTENCE) -> Dict[str, int]:
+    """Differences between the legacy and current SentenceChunker outputs."""
+    chunker = SentenceChunker(min_tokens=min_tokens)
+    diff = {"text_or_count_mismatch": 0, "legacy_offset_wrong": 0}
+    for d in docs:
+        new, old = chunker.chunk(d), legacy_sentence_chunk(d, min_tokens)
+        if [(t, m["token_count"]) for t, m in new] != [(t, m["token_count"]) for t, m in old]:
+            diff["text_or_count_mismatch"] += 1
+        diff["legacy_offset_wrong"] += sum(1 for (_, n), (_, o) in zip(new, old) if n["start_char"] != o["start_char"])
+    return diff
+
+
+def compare_context_aware(docs: List[Dict[str, Any]], max_chars: int, overlap_sentences: int) -> Dict[str, int]:
+    """Documents whose legacy and current context-aware chunks differ."""
+    return {"mismatch": sum(1 for d in docs if context_aware_chunking(d, max_chars, overlap_sentences)
+                            != legacy_context_aware_chunking(d, max_chars, overlap_sentences))}
+
+
+
+# one sentence each: the segmenter must not split inside them
+SEGMENTER_SAMPLES = {
+    "en": ["Dr. Smith moved to the U.S. in 1999.", "The river is 3.5 km long!", "Was it built by J. R. Tolkien?",
+           "Prices rose approx. 4% that year.", "The vote was 5 vs. 3 in favour.", "\"It works,\" she said."],
+    "de": ["Am 3. Oktober kam Herr Dr. Müller an.", "Das ist z.B. ein gutes Beispiel.", "Die Stadt hat ca. 4000 Einwohner!",
+           "Wer war der 1. Kanzler?", "Sie kam gegen 8 Uhr bzw. etwas später."],
+    "es": ["¿Qué hora es?", "¡Son las tres!", "El Sr. García llegó a las 5 p.m. con su hija.",
+           "La Dra. López vive en la Avda. Central.", "El río mide aprox. 20 km."],
+    "ru": ["Он родился в 1990 г. в Москве.", "Это было, т.е. есть, важно!", "Проф. Иванов читал лекцию.",
+           "Город основан им. князя Юрия?", "На рынке были яблоки, груши и т.д."],
+    "hi": ["यह एक वाक्य है।", "डॉ. शर्मा दिल्ली आए।", "क्या आप आएंगे?", "भारत की राजधानी नई दिल्ली है॥",
+           "प्रो. वर्मा ने भाषण दिया।"],
+}
+
+
+def load_multilingual_texts(n_texts: int = 200, seed: int = 13) -> List[Dict[str, Any]]:
+    """Synthetic paragraphs of `SEGMENTER_SAMPLES` sentences per language, with their true sentence count."""
+    rng = random.Random(seed)
+    out = []
+    for lang, samples in SEGMENTER_SAMPLES.items():
+        for _ in range(n_texts):
+            paragraphs = [[rng.choice(samples) for _ in range(rng.randint(2, 8))] for _ in range(rng.randint(5, 20))]
+            out.append({"language": lang, "text": "\n\n".join(" ".join(p) for p in paragraphs),
+                        "n_sentences": sum(len(p) for p in paragraphs)})
+    return out
+
+
+def time_segmenter(fn: Callable[[str], list], texts: List[str], repeat: int = 3,
+                   expected: List[int] = None) -> Dict[str, float]:
+    """Best-of-`repeat` wall time of splitting every text with `fn` (-> list of sentences or spans), in sentences/s."""
+    n_chars = sum(len(t) for t in texts)
+    best, counts = float("inf"), []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        counts = [len(fn(t)) for t in texts]
+        best = min(best, time.perf_counter() - t0)
+    out = {"seconds": round(best, 4), "sentences": sum(counts), "sentences_per_s": round(sum(counts) / best),
+           "mb_per_s": round(n_chars / best / 1e6, 2)}
+    if expected is not None:
+        out["exact"] = round(sum(1 for c, e in zip(counts, expected) if c == e) / max(len(texts), 1), 3)
+    return out
+
+
+def time_segmenter_batch(texts: List[str], langs: List[str], repeat: int = 3) -> Dict[str, float]:
+    """`time_segmenter` of one `sentence_spans_many` call over all texts (mixed languages)."""
+    n_chars = sum(len(t) for t in texts)
+    best, n = float("inf"), 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        n = sum(len(spans) for spans in sentence_spans_many(texts, langs))
+        best = min(best, time.perf_counter() - t0)
+    return {"seconds": round(best, 4), "sentences": n, "sentences_per_s": round(n / best),
+            "mb_per_s": round(n_chars / best / 1e6, 2)}
+
+
+def legacy_summarizer_split(text: str) -> List[str]:
+    """Previous `summarizer.utils.split_sentences` without NLTK punkt installed."""
+    return [s.strip() for s in LEGACY_SUMMARIZER_SPLIT_RE.split(text) if s.strip()]
+
+
+def segmenter_cases(lang: str = None) -> List[tuple]:
+    """(name, splitter) pairs: each legacy regex, then the segmenter in the matching mode."""
+    lines, paragraphs = get_segmenter(lang, line_breaks=True), get_segmenter(lang)
+    return [
+        ("SentenceChunker regex       ", lambda t: split_spans(t, LEGACY_SENTENCE_SPLIT_RE)),
+        ("segmenter (line breaks)     ", lines.spans),
+        ("context-aware regex         ", lambda t: split_spans(t, LEGACY_CONTEXT_SPLIT_RE)),
+        ("summarizer regex (strings)  ", legacy_summarizer_split),
+        ("segmenter (paragraphs)      ", paragraphs.spans),
+        ("segmenter (strings)         ", paragraphs.sentences),
+    ]
+
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Benchmark XRAG+ chunkers on long articles.")
+    p.add_argument("--path", default=None, help="JSON/JSONL file or directory of articles with a 'text' field")
+    p.add_argument("--docs", type=int, default=200)
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--min-tokens", type=int, default=settings.DEFAULT_MIN_TOKENS_SENTENCE)
+    p.add_argument("--max-chars", type=int, nargs="+", default=[300, 2500], help="context-aware budgets (indexer, summarizer)")
+    p.add_argument("--overlap-sentences", type=int, default=1)
+    p.add_argument("--window", type=int, default=512, help="sliding-window size (tokens) for the memory benchmark")
+    p.add_argument("--overlap", type=int, default=128, help="sliding-window overlap (tokens) for the memory benchmark")
+    args = p.parse_args()
+
+    docs = load_docs(args.path, args.docs)
+    print(f"{len(docs)} docs, {sum(len(d['text']) for d in docs) / 1e6:.2f}M chars")
+
+    sentence_chunker = SentenceChunker(min_tokens=args.min_tokens)
+    legacy = time_chunker(lambda d: legacy_sentence_chunk(d, args.min_tokens), docs, args.repeat)
+    current = time_chunker(sentence_chunker.chunk, docs, args.repeat)
+    print(f"SentenceChunker (legacy) : {legacy}")
+    print(f"SentenceChunker          : {current}  speedup x{legacy['seconds'] / current['seconds']:.1f}")
+    print(f"SentenceChunker diff     : {compare_sentence_chunker(docs, args.min_tokens)}")
+
+    for max_chars in args.max_chars:
+        legacy = time_chunker(lambda d: legacy_context_aware_chunking(d, max_chars, args.overlap_sentences), docs, args.repeat)
+        current = time_chunker(lambda d: context_aware_chunking(d, max_chars, args.overlap_sentences), docs, args.repeat)
+        print(f"context_aware_chunking (legacy, max_chars={max_chars}) : {legacy}")
+        print(f"context_aware_chunking (max_chars={max_chars})         : {current}  speedup x{legacy['seconds'] / current['seconds']:.1f}")
+        print(f"context_aware_chunking diff                  : {compare_context_aware(docs, max_chars, args.overlap_sentences)}")
+
+    texts = [d["text"] for d in docs]
+    for name, fn in segmenter_cases(docs[0]["language"] if docs else None):
+        print(f"{name}: {time_segmenter(fn, texts, args.repeat)}")
+    ml = load_multilingual_texts(max(args.docs // 5, 1))
+    for lang in SEGMENTER_SAMPLES:
+        sub = [d for d in ml if d["language"] == lang]
+        sub_texts, expected = [d["text"] for d in sub], [d["n_sentences"] for d in sub]
+        for name, fn in segmenter_cases(lang):
+            print(f"[{lang}] {name}: {time_segmenter(fn, sub_texts, args.repeat, expected)}")
+    print(f"sentence_spans_many (all languages): {time_segmenter_batch([d['text'] for d in ml], [d['language'] for d in ml], args.repeat)}")
+
+    window_chunker = SlidingWindowChunker(chunk_size=args.window, overlap=args.overlap)
+    memory_cases = [
+        (f"SlidingWindowChunker({args.window}/{args.overlap})", window_chunker.chunk, window_chunker.chunk_views),
+        ("SentenceChunker", sentence_chunker.chunk, sentence_chunker.chunk_views),
+        (f"context_aware_chunking(max_chars={args.max_chars[-1]})",
+         lambda d: context_aware_chunking(d, args.max_chars[-1], args.overlap_sentences),
+         lambda d: list(iter_context_aware_chunks(d, args.max_chars[-1], args.overlap_sentences, views=True))),
+    ]
+    for name, strings, views in memory_cases:
+        print(f"{name} memory (strings) : {measure_chunk_memory(strings, docs)}")
+        print(f"{name} memory (views)   : {measure_chunk_memory(views, docs)}")
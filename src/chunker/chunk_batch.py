@@ -0,0 +1,289 @@
+"""
+Columnar storage of many chunks for XRAG+.
+
+Chunkers emit one `(chunk_text, metadata_dict)` pair per chunk, and the same keys ('doc_id', 'chunk_type',
+'language', ...) repeat in every dict. `ChunkBatch` keeps the same information as columns:
+
+- per document : the source text (a reference, only kept when some chunk is a plain slice of it) and one
+                 base-metadata dict (e.g. the indexer's doc_id/title/url/...)
+- per chunk    : `array` columns for the document row, ordinal (chunk index in its document), start/end
+                 offsets and token count; the remaining chunker metadata interned (one dict per distinct
+                 value set, usually one per document); checksums
+- sparse       : texts that are not `source[start:end]` (merged sentences, context-aware chunks) and
+                 chunk_ids that are not `make_chunk_id(doc_id, ordinal, language)`
+
+Chunk strings and per-chunk metadata dicts are only built by `texts()` / `metadatas()`, e.g. at upsert time.
+
+`ChunkView` is the per-chunk counterpart emitted by `BaseChunker.iter_views()`: a (source, start, end) reference
+whose string is only built by `.text` / `str()`, so overlapping windows (e.g. `SlidingWindowChunker`) share
+their document instead of each holding a copy. `ChunkBatch.add` stores a view as offsets without comparing text.
+"""
+from __future__ import annotations
+
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .utils import make_chunk_id
+
+_HAS_SPAN, _HAS_TOKENS, _DERIVED_ID = 1, 2, 4
+
+
+
+class ChunkView:
+    """
+    Text of one chunk as `source[start:end]`, without copying it (see module docstring).
+
+    - ChunkView.of(chunk_text, source, start, end): a view over `source` when chunk_text is that slice, else
+      over chunk_text itself (merged / re-joined chunks)
+    - .text / str(view): the chunk string, built on each call; `materialize(views)` for a batch
+    - len(view) and == against strings or views work on the source, without building the string
+    """
+    __slots__ = ("source", "start", "end")
+
+    def __init__(self, source: str, start: int = 0, end: Optional[int] = None):
+        self.source = source
+        self.start = start
+        self.end = len(source) if end is None else end
+
+    @classmethod
+    def of(cls, chunk_text: str, source: Optional[str] = None, start: Any = -1, end: Any = -1) -> "ChunkView":
+        if (source is not None and type(start) is int and type(end) is int and 0 <= start
+                and end - start == len(chunk_text) and source.startswith(chunk_text, start)):
+            return cls(source, start, end)
+        return cls(chunk_text)
+
+    @property
+    def text(self) -> str:
+        return self.source[self.start:self.end]
+
+    def __str__(self) -> str:
+        return self.text
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, ChunkView):
+            return len(other) == len(self) and self.source.startswith(other.text, self.start)
+        if isinstance(other, str):
+            return len(other) == len(self) and self.source.startswith(other, self.start)
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.text)
+
+    def __repr__(self) -> str:
+        return f"ChunkView([{self.start}:{self.end}] of {len(self.source)} chars)"
+
+    def __reduce__(self):
+        # pickled with its source; pickle's memo keeps one copy per source per dumps() (e.g. per pool task)
+        return ChunkView, (self.source, self.start, self.end)
+
+
+def materialize(chunks: Iterable[Any]) -> List[str]:
+    """Chunk strings of a batch of chunk texts (`ChunkView`s and/or strings), e.g. for an embedding call."""
+    return [c.text if isinstance(c, ChunkView) else c for c in chunks]
+
+
+
+class ChunkBatch:
+    """
+    Columnar, append-only batch of chunks (see module docstring).
+
+    - add(text, meta, source, doc_meta, ordinal, checksum): append one chunk (text: a string or a `ChunkView`);
+      consecutive chunks passing the same `doc_meta` object share a document row
+    - extend(other, indices): append (a subset of) another batch's chunks
+    - texts() / metadatas() / iter_chunks(): materialize chunk strings / metadata dicts; view(i): a `ChunkView`
+    """
+    def __init__(self):
+        self.sources: List[Optional[str]] = []
+        self.doc_metas: List[Dict[str, Any]] = []
+        self.doc = array("i")
+        self.ordinal = array("i")
+        self.start = array("q")
+        self.end = array("q")
+        self.token_count = array("q")
+        self.flags = array("B")
+        self.shared = array("i")
+        self.checksums: List[Optional[str]] = []
+        self._texts: Dict[int, str] = {}
+        self._chunk_ids: Dict[int, Any] = {}
+        self._shared: List[Dict[str, Any]] = []
+        self._shared_index: Dict[Tuple, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.doc)
+
+
+    def _intern(self, meta: Dict[str, Any]) -> int:
+        try:
+            key = tuple(sorted(meta.items()))
+            hash(key)
+        except TypeError:       # unhashable / unorderable values: store as is
+            self._shared.append(meta)
+            return len(self._shared) - 1
+        idx = self._shared_index.get(key)
+        if idx is None:
+            idx = self._shared_index[key] = len(self._shared)
+            self._shared.append(meta)
+        return idx
+
+    def _row(self, doc_meta: Optional[Dict[str, Any]]) -> int:
+        if not self.doc_metas or self.doc_metas[-1] is not doc_meta:
+            self.sources.append(None)
+            self.doc_metas.append(doc_meta)
+        return len(self.doc_metas) - 1
+
+
+    def add(self, text: Any, meta: Optional[Dict[str, Any]] = None, source: Optional[str] = None,
+            doc_meta: Optional[Dict[str, Any]] = None, ordinal: Optional[int] = None, checksum: Optional[str] = None) -> int:
+        """
+        Append one chunk (as emitted by a chunker) and return its index.
+
+        - source: text of the chunk's document; the chunk text is not stored when it equals source[start_char:end_char]
+          (a `ChunkView` at the chunk's offsets is stored against its own source, without comparing text)
+        - doc_meta: base metadata of the document (shared by all its chunks, must not be mutated afterwards)
+        - ordinal: index of the chunk in its document (default: position in this batch)
+        """
+        i = len(self.doc)
+        row = self._row(doc_meta)
+        meta = dict(meta or {})
+        flags = 0
+
+        start, end = meta.get("start_char"), meta.get("end_char")
+        if type(start) is int and type(end) is int:
+            del meta["start_char"], meta["end_char"]
+            flags |= _HAS_SPAN
+        else:
+            start = end = -1
+        tokens = meta.get("token_count")
+        if type(tokens) is int:
+            del meta["token_count"]
+            flags |= _HAS_TOKENS
+        else:
+            tokens = -1
+
+        ordinal = i if ordinal is None else int(ordinal)
+        if "chunk_id" in meta:
+            chunk_id = meta.pop("chunk_id")
+            if chunk_id == make_chunk_id(meta.get("doc_id"), ordinal, meta.get("language")):
+                flags |= _DERIVED_ID
+            else:
+                self._chunk_ids[i] = chunk_id
+
+        if isinstance(text, ChunkView) and 0 <= start == text.start and end == text.end:
+            source, sliced = text.source, True
+        else:
+            text = str(text)
+            sliced = source is not None and 0 <= start <= end and source[start:end] == text
+        if sliced and self.sources[row] is None:
+            self.sources[row] = source
+        if not sliced or self.sources[row] is not source:
+            self._texts[i] = str(text)
+
+        self.doc.append(row)
+        self.ordinal.append(ordinal)
+        self.start.append(start)
+        self.end.append(end)
+        self.token_count.append(tokens)
+        self.flags.append(flags)
+        self.shared.append(self._intern(meta))
+        self.checksums.append(checksum)
+        return i
+
+
+    def add_chunks(self, chunks: Iterable[Tuple[str, Dict[str, Any]]], source: Optional[str] = None,
+                   doc_meta: Optional[Dict[str, Any]] = None) -> "ChunkBatch":
+        """Append all (chunk_text, metadata) pairs of one document (ordinals 0..n-1)."""
+        doc_meta = {} if doc_meta is None else doc_meta
+        for ordinal, (text, meta) in enumerate(chunks):
+            self.add(text, meta, source=source, doc_meta=doc_meta, ordinal=ordinal)
+        return self
+
+
+    def extend(self, other: "ChunkBatch", indices: Optional[Sequence[int]] = None) -> "ChunkBatch":
+        """Append the chunks `indices` (default: all) of `other`; documents and texts are shared, not copied."""
+        indices = range(len(other)) if indices is None else indices
+        rows: Dict[int, int] = {}
+        shared: Dict[int, int] = {}
+        for j in indices:
+            i = len(self.doc)
+            r = other.doc[j]
+            if r not in rows:
+                self.sources.append(other.sources[r])
+                self.doc_metas.append(other.doc_metas[r])
+                rows[r] = len(self.doc_metas) - 1
+            s = other.shared[j]
+            if s not in shared:
+                shared[s] = self._intern(other._shared[s])
+            if j in other._texts:
+                self._texts[i] = other._texts[j]
+            if j in other._chunk_ids:
+                self._chunk_ids[i] = other._chunk_ids[j]
+            self.doc.append(rows[r])
+            self.ordinal.append(other.ordinal[j])
+            self.start.append(other.start[j])
+            self.end.append(other.end[j])
+            self.token_count.append(other.token_count[j])
+            self.flags.append(other.flags[j])
+            self.shared.append(shared[s])
+            self.checksums.append(other.checksums[j])
+        return self
+
+
+    def text(self, i: int) -> str:
+        t = self._texts.get(i)
+        if t is not None:
+            return t
+        return self.sources[self.doc[i]][self.start[i]:self.end[i]]
+
+    def texts(self) -> List[str]:
+        return [self.text(i) for i in range(len(self.doc))]
+
+    def view(self, i: int) -> ChunkView:
+        t = self._texts.get(i)
+        if t is not None:
+            return ChunkView(t)
+        return ChunkView(self.sources[self.doc[i]], self.start[i], self.end[i])
+
+
+    def metadata(self, i: int, ordinal_key: Optional[str] = None, checksum_key: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Metadata dict of chunk i: document metadata, then (optionally) the ordinal / checksum under the given keys,
+        then the chunker's own metadata (which wins on conflicts, as `dict.update` would).
+        """
+        meta = dict(self.doc_metas[self.doc[i]] or {})
+        if ordinal_key:
+            meta[ordinal_key] = self.ordinal[i]
+        if checksum_key:
+            meta[checksum_key] = self.checksums[i]
+        return self._chunk_meta(i, meta)
+
+    def _chunk_meta(self, i: int, meta: Dict[str, Any]) -> Dict[str, Any]:
+        shared = self._shared[self.shared[i]]
+        meta.update(shared)
+        flags = self.flags[i]
+        if flags & _DERIVED_ID:
+            meta["chunk_id"] = make_chunk_id(shared.get("doc_id"), self.ordinal[i], shared.get("language"))
+        elif i in self._chunk_ids:
+            meta["chunk_id"] = self._chunk_ids[i]
+        if flags & _HAS_SPAN:
+            meta["start_char"] = self.start[i]
+            meta["end_char"] = self.end[i]
+        if flags & _HAS_TOKENS:
+            meta["token_count"] = self.token_count[i]
+        return meta
+
+    def metadatas(self, ordinal_key: Optional[str] = None, checksum_key: Optional[str] = None) -> List[Dict[str, Any]]:
+        return [self.metadata(i, ordinal_key, checksum_key) for i in range(len(self.doc))]
+
+
+    def iter_chunks(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """(chunk_text, chunker metadata) pairs, as the chunkers emitted them."""
+        for i in range(len(self.doc)):
+            yield self.text(i), self._chunk_meta(i, {})
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[Tuple[str, Dict[str, Any]]], source: Optional[str] = None) -> "ChunkBatch":
+        """Columnar form of one chunker output (`source` = the document text the chunks were cut from)."""
+        return cls().add_chunks(chunks, source=source)
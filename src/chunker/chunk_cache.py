@@ -0,0 +1,326 @@
+"""
+Persistent cache of chunker outputs for XRAG+.
+
+Ablations run the same corpus through the same chunking method once per embedding model, collection prefix or
+persist directory, and each run re-chunks gigabytes of text. `ChunkCache` stores the output of a chunker for a
+document once, keyed by (sha1 of the document text, chunker signature, sentence-segmentation language):
+
+    <CHUNK_CACHE_DIR>/chunks.sqlite3
+
+- The signature names the chunker class and its parameters (`BaseChunker.cache_signature`, or
+  "context_aware_chunking|max_chars=..|overlap=.." for the functional chunker), so another configuration never
+  reads a stale entry. Sentence boundaries depend on the document's language (`src.chunker.segmenter` rules),
+  so documents with the same text share an entry only when their languages use the same rules.
+- Chunks are stored as spans, not strings: per chunk the (start, end) offsets of the document slices it is cut
+  from (context-aware chunks join several sentences with a space), packed as uint32 arrays. Token counts and
+  flags are packed arrays too, chunker metadata is interned per document as JSON templates in which values taken
+  from the document (doc_id, title, language, ...) are placeholders. Chunks that are not slices of the document
+  (e.g. tokenizers without offsets) are stored as text.
+- A hit skips chunking: the chunks are rebuilt as slices (or `ChunkView`s) of the text of the document asked for.
+- Safe to share between threads; several processes may use the same file (WAL journal, writes retried on lock).
+"""
+from __future__ import annotations
+
+from array import array
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import uuid
+
+from .chunk_batch import ChunkView
+from .segmenter import rules_lang
+from .utils import make_chunk_id
+
+logger = logging.getLogger(__name__)
+
+CACHE_FORMAT = 2        # bump when the encoding or a chunker's output changes: old entries are never read again
+
+# document fields chunkers copy into their metadata; equal values are stored as placeholders. A doc_id the chunker
+# minted (uuid4) for a document without one is a placeholder too: a hit resolves it like the chunker would.
+_DOC_FIELDS = ("doc_id", "title", "language", "source", "url")
+
+_HAS_SPAN = 1           # start_char / end_char equal the first start / last end of the chunk's spans
+_HAS_TOKENS = 2
+_DERIVED_ID = 4         # chunk_id == make_chunk_id(doc_id, index, language)
+
+Span = Tuple[int, int]
+
+
+
+def _is_uuid(value: Any) -> bool:
+    try:
+        return isinstance(value, str) and str(uuid.UUID(value)) == value
+    except ValueError:
+        return False
+
+
+def _chunk_spans(chunk: Any, meta: Dict[str, Any], text: str) -> Optional[List[Span]]:
+    """Spans of a chunker output chunk in `text`, None when it is not a slice of it."""
+    if isinstance(chunk, ChunkView):
+        if chunk.source is text:
+            return [(chunk.start, chunk.end)]
+        chunk = str(chunk)
+    start, end = meta.get("start_char"), meta.get("end_char")
+    if type(start) is int and type(end) is int and 0 <= start <= end and text[start:end] == chunk:
+        return [(start, end)]
+    return None
+
+
+def _join(text: str, spans: Sequence[Span], views: bool) -> Any:
+    if len(spans) == 1:
+        start, end = spans[0]
+        return ChunkView(text, start, end) if views else text[start:end]
+    joined = " ".join(text[s:e] for s, e in spans)
+    return ChunkView(joined) if views else joined
+
+
+
+class ChunkCache:
+    """
+    SQLite-backed map (document text hash, chunker signature) -> chunks as spans + metadata templates.
+
+    - path: sqlite file to use. If None, the cache lives in memory only (no persistence).
+    - `put` writes are uncommitted until `commit()`.
+    - hits / misses count `get` lookups of this instance.
+    """
+    FILENAME = "chunks.sqlite3"
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path or ":memory:", check_same_thread=False, timeout=60)
+        if path:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS chunks (
+                key TEXT PRIMARY KEY, n INTEGER, nspans BLOB, spans BLOB, tokens BLOB, flags BLOB,
+                templates BLOB, metas TEXT, literals TEXT
+            ) WITHOUT ROWID""")
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def open(cls, cache_dir: Optional[str]) -> "ChunkCache":
+        """Open the cache kept in `cache_dir` (in-memory if None)."""
+        return cls(os.path.join(cache_dir, cls.FILENAME) if cache_dir else None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+
+    @staticmethod
+    def key_for(text: str, signature: str, lang: Optional[str] = None) -> str:
+        """
+        Cache key of a document: sha1 over the cache format, the chunker signature, the segmentation rules of
+        its language and the text.
+        """
+        h = hashlib.sha1(f"{CACHE_FORMAT}|{signature}|{rules_lang(lang)}\x1f".encode("utf-8"))
+        h.update(text.encode("utf-8", "surrogatepass"))
+        return h.hexdigest()
+
+
+    # -------------------------
+    # Encoding
+    # -------------------------
+    @staticmethod
+    def _encode(doc: Dict[str, Any], chunks: Sequence[Tuple[Any, Dict[str, Any]]],
+                spans: Optional[Sequence[Sequence[Span]]] = None) -> Tuple:
+        text = doc.get("text", "")
+        doc_values = {field: doc.get(field) for field in _DOC_FIELDS if isinstance(doc.get(field), str) and doc.get(field)}
+        nspans, flat, tokens, flags, templates = array("I"), array("I"), array("i"), array("B"), array("I")
+        metas: List[str] = []
+        meta_index: Dict[str, int] = {}
+        literals: Dict[int, str] = {}
+
+        for idx, (chunk, meta) in enumerate(chunks):
+            meta = dict(meta or {})
+            chunk_spans = spans[idx] if spans is not None else _chunk_spans(chunk, meta, text)
+            if chunk_spans:
+                nspans.append(len(chunk_spans))
+                for s, e in chunk_spans:
+                    flat.extend((s, e))
+            else:
+                nspans.append(0)
+                literals[idx] = str(chunk)
+            f = 0
+            if chunk_spans and meta.get("start_char") == chunk_spans[0][0] and meta.get("end_char") == chunk_spans[-1][1]:
+                del meta["start_char"], meta["end_char"]
+                f |= _HAS_SPAN
+            if type(meta.get("token_count")) is int:
+                tokens.append(meta.pop("token_count"))
+                f |= _HAS_TOKENS
+            else:
+                tokens.append(-1)
+            if "chunk_id" in meta and meta["chunk_id"] == make_chunk_id(meta.get("doc_id"), idx, meta.get("language")):
+                del meta["chunk_id"]
+                f |= _DERIVED_ID
+            flags.append(f)
+
+            for k, v in meta.items():
+                if not isinstance(v, str) or not v:
+                    continue
+                field = next((field for field, value in doc_values.items() if value == v), None)
+                if field is not None:
+                    meta[k] = {"$doc": field}
+                elif k == "doc_id" and not doc.get("doc_id") and _is_uuid(v):
+                    meta[k] = {"$doc": "doc_id"}
+            encoded = json.dumps(meta)
+            t = meta_index.get(encoded)
+            if t is None:
+                t = meta_index[encoded] = len(metas)
+                metas.append(encoded)
+            templates.append(t)
+
+        return (len(nspans), nspans.tobytes(), flat.tobytes(), tokens.tobytes(), flags.tobytes(), templates.tobytes(),
+                "[" + ",".join(metas) + "]", json.dumps(literals) if literals else "")
+
+    @staticmethod
+    def _decode(doc: Dict[str, Any], row: Tuple, views: bool) -> List[Tuple[Any, Dict[str, Any]]]:
+        n, nspans_b, spans_b, tokens_b, flags_b, templates_b, metas_s, literals_s = row
+        text = doc.get("text", "")
+        nspans, flat, tokens, flags, templates = (array("I"), array("I"), array("i"), array("B"), array("I"))
+        for arr, blob in ((nspans, nspans_b), (flat, spans_b), (tokens, tokens_b), (flags, flags_b), (templates, templates_b)):
+            arr.frombytes(blob)
+        literals = {int(k): v for k, v in json.loads(literals_s).items()} if literals_s else {}
+        minted: List[str] = []
+
+        def _resolve(value: Any) -> Any:
+            if not isinstance(value, dict):
+                return value
+            field = value.get("$doc")
+            if field == "doc_id" and not doc.get("doc_id"):
+                if not minted:
+                    minted.append(str(uuid.uuid4()))
+                return minted[0]
+            return doc.get(field)
+
+        metas = [{k: _resolve(v) for k, v in m.items()} for m in json.loads(metas_s)]
+        out = []
+        pos = 0
+        for idx in range(n):
+            k = nspans[idx]
+            chunk_spans = [(flat[pos + 2 * j], flat[pos + 2 * j + 1]) for j in range(k)]
+            pos += 2 * k
+            if k:
+                chunk = _join(text, chunk_spans, views)
+            else:
+                chunk = ChunkView(literals[idx]) if views else literals[idx]
+            meta = dict(metas[templates[idx]])
+            f = flags[idx]
+            if f & _DERIVED_ID:
+                meta["chunk_id"] = make_chunk_id(meta.get("doc_id"), idx, meta.get("language"))
+            if f & _HAS_SPAN:
+                meta["start_char"], meta["end_char"] = chunk_spans[0][0], chunk_spans[-1][1]
+            if f & _HAS_TOKENS:
+                meta["token_count"] = tokens[idx]
+            out.append((chunk, meta))
+        return out
+
+
+    # -------------------------
+    # Lookups / writes
+    # -------------------------
+    def get_many(self, docs: Sequence[Dict[str, Any]], signature: str,
+                 views: bool = False) -> List[Optional[List[Tuple[Any, Dict[str, Any]]]]]:
+        """Cached chunks of each doc (None on a miss), rebuilt over the doc's own text; `views`: as `chunk_views()`."""
+        keys = [self.key_for(d.get("text", ""), signature, d.get("language")) for d in docs]
+        rows: Dict[str, Tuple] = {}
+        with self._lock:
+            for i in range(0, len(keys), 500):
+                part = keys[i:i + 500]
+                marks = ",".join("?" * len(part))
+                for row in self._conn.execute(
+                        f"SELECT key, n, nspans, spans, tokens, flags, templates, metas, literals FROM chunks WHERE key IN ({marks})", part):
+                    rows[row[0]] = row[1:]
+        out: List[Optional[List[Tuple[Any, Dict[str, Any]]]]] = []
+        for doc, key in zip(docs, keys):
+            row = rows.get(key)
+            out.append(self._decode(doc, row, views) if row is not None else None)
+        found = sum(1 for r in out if r is not None)
+        self.hits += found
+        self.misses += len(out) - found
+        return out
+
+    def get(self, doc: Dict[str, Any], signature: str, views: bool = False) -> Optional[List[Tuple[Any, Dict[str, Any]]]]:
+        return self.get_many([doc], signature, views)[0]
+
+    def put(self, doc: Dict[str, Any], signature: str, chunks: Sequence[Tuple[Any, Dict[str, Any]]],
+            spans: Optional[Sequence[Sequence[Span]]] = None) -> None:
+        """
+        Store the chunks of `doc` (uncommitted). `spans[i]`: the document slices chunk i joins with a space, when the
+        chunk text alone does not tell (context-aware chunks); by default taken from `ChunkView`s / start_char:end_char.
+        """
+        try:
+            row = self._encode(doc, chunks, spans)
+        except (TypeError, ValueError, OverflowError) as e:       # metadata JSON cannot hold, offsets beyond uint32
+            logger.debug("Not caching chunks of doc %s: %s", doc.get("doc_id"), e)
+            return
+        key = self.key_for(doc.get("text", ""), signature, doc.get("language"))
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO chunks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", (key,) + row)
+
+    def commit(self) -> None:
+        with self._lock:
+            self._conn.commit()
+
+
+    def iter_through(self, doc: Dict[str, Any], signature: str,
+                     chunks: Iterable[Tuple[Any, Dict[str, Any]]]) -> Iterator[Tuple[Any, Dict[str, Any]]]:
+        """Yield the chunks of a lazy chunker iterator and store them once it is exhausted (nothing if abandoned)."""
+        seen = []
+        for chunk, meta in chunks:
+            seen.append((chunk, dict(meta or {})))
+            yield chunk, meta
+        self.put(doc, signature, seen)
+        self.commit()
+
+    def chunk_many(self, docs: Sequence[Dict[str, Any]], signature: str,
+                   chunk_fn: Callable[[List[Dict[str, Any]]], List[Any]], views: bool = False) -> List[Any]:
+        """
+        Cached chunks of every doc; the misses are chunked with one `chunk_fn(miss_docs)` call (e.g. a chunker's
+        `chunk_many`) and stored. Exceptions returned by `chunk_fn` are passed through, not cached.
+        """
+        docs = list(docs)
+        results: List[Any] = self.get_many(docs, signature, views)
+        missing = [i for i, r in enumerate(results) if r is None]
+        if missing:
+            for i, chunks in zip(missing, chunk_fn([docs[i] for i in missing])):
+                if not isinstance(chunks, Exception):
+                    self.put(docs[i], signature, chunks)
+                results[i] = chunks
+            self.commit()
+        return results
+
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+
+_SHARED: Dict[Tuple[int, str], ChunkCache] = {}
+_SHARED_LOCK = threading.Lock()
+
+def shared_chunk_cache(cache_dir: str) -> ChunkCache:
+    """The process-wide `ChunkCache` of `cache_dir` (one connection per process: forked pool workers open their own)."""
+    key = (os.getpid(), cache_dir)
+    cache = _SHARED.get(key)
+    if cache is None:
+        with _SHARED_LOCK:
+            cache = _SHARED.get(key)
+            if cache is None:
+                cache = _SHARED[key] = ChunkCache.open(cache_dir)
+    return cache
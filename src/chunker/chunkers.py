@@ -6,24 +6,62 @@ Includes:
 - TokenChunker
 - SlidingWindowChunker
 - SentenceChunker
+- TokenBudgetChunker
 - ParagraphChunker
-- context_aware_chunking
+- SemanticChunker (+ semantic_chunking)
+- iter_paragraph_chunks (any chunker, one paragraph at a time)
+- context_aware_chunking (+ iter_context_aware_chunks, context_aware_chunking_many)
 - llm_based_chunking
 """
 from __future__ import annotations
+import functools
 import uuid
-from typing import List, Dict, Any, Optional, Tuple, Callable
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple, Callable
 
 from .utils import (
     make_chunk_id,
     char_spans_for_whitespace_tokens,
+    split_spans,
+    whitespace_token_spans,
     whitespace_tokens,
 )
 
+from .chunk_batch import ChunkView
 from .config import Settings
+from .parallel import chunk_many
+from .registry import TokenizerHandle, tokenizer_handle
+from .segmenter import get_segmenter, sentence_spans_many, split_sentences
 settings = Settings()
 
 
+def _tokenizer_signature(tokenizer: Any) -> str:
+    if tokenizer is None:
+        return "whitespace"
+    if isinstance(tokenizer, TokenizerHandle):
+        return str(tokenizer)
+    name = getattr(tokenizer, "name_or_path", None) or getattr(tokenizer, "lang", None)
+    return f"{type(tokenizer).__name__}:{name}" if name else type(tokenizer).__name__
+
+
+def _is_fast_hf(tokenizer: Any) -> bool:
+    """True for a HuggingFace fast tokenizer (exact char offsets from one batched call)."""
+    return bool(getattr(tokenizer, "is_fast", False)) and callable(tokenizer)
+
+
+def _encode_offsets(tokenizer: Any, texts: List[str]) -> List[List[Tuple[int, int]]]:
+    """Token -> char spans of each text from a HF fast tokenizer, in one batched call (no special tokens)."""
+    enc = tokenizer(
+        texts, add_special_tokens=False, return_offsets_mapping=True,
+        return_attention_mask=False, return_token_type_ids=False, verbose=False,
+    )
+    return enc["offset_mapping"]
+
+
+def _cut(text: str, start: int, end: int, views: bool = False):
+    """text[start:end], or a `ChunkView` of it that shares `text` (see `BaseChunker.iter_views`)."""
+    return ChunkView(text, start, end) if views else text[start:end]
+
+
 
 
 class BaseChunker:
@@ -39,12 +77,70 @@ class BaseChunker:
           'token_count', 'chunk_type', 'language', 'meta'
       If a chunk is composed of multiple non-contiguous spans, start_char/end_char
       may be -1 and precise provenance should be supplied in a `spans` list.
+    - `chunk_views()` / `iter_views()`: same chunks with the text as a `ChunkView` (document reference +
+      offsets), materialized only when needed (e.g. for the embedding call).
+    - `tokenizer` (tokenizer-aware chunkers) may be a `TokenizerHandle` from `src.chunker.registry`: it is resolved
+      to the process-wide shared tokenizer on use, and pickles as the handle (cheap to send to worker processes).
     """
+    _tokenizer: Any = None
+
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         self.config = config or {}
 
+    @property
+    def tokenizer(self) -> Any:
+        tok = self._tokenizer
+        return tok.get() if isinstance(tok, TokenizerHandle) else tok
+
+    @tokenizer.setter
+    def tokenizer(self, tokenizer: Any) -> None:
+        self._tokenizer = tokenizer
+
+    def cache_signature(self) -> str:
+        """Chunker class and parameters (scalar attributes and tokenizer); chunk caches key outputs by it."""
+        params = []
+        for name, value in sorted(vars(self).items()):
+            if name == "_tokenizer":
+                params.append(f"tokenizer={_tokenizer_signature(value)}")
+            elif not name.startswith("_") and (value is None or isinstance(value, (str, int, float, bool))):
+                params.append(f"{name}={value!r}")
+        return "|".join([type(self).__name__] + params)
+
     def chunk(self, doc: Dict[str, Any]) -> List[Dict[str, Any]]:
-        raise NotImplementedError
+        return list(self.iter_chunks(doc))
+
+    def iter_chunks(self, doc: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Yield (chunk_text, metadata) pairs one at a time, so a consumer (e.g. the indexer's embedding batches)
+        holds only the chunks it has not processed yet. Subclasses implement this (or override `chunk()`).
+        """
+        if type(self).chunk is BaseChunker.chunk:
+            raise NotImplementedError
+        yield from self.chunk(doc)
+
+    def chunk_views(self, doc: Dict[str, Any]) -> List[Tuple[ChunkView, Dict[str, Any]]]:
+        return list(self.iter_views(doc))
+
+    def iter_views(self, doc: Dict[str, Any]) -> Iterator[Tuple[ChunkView, Dict[str, Any]]]:
+        """
+        `iter_chunks` with (ChunkView, metadata) pairs. Chunkers cutting exact slices override this so the chunk
+        string is never built; by default each chunk becomes a view over the document when it is a slice of it.
+        """
+        text = doc.get("text", "")
+        for chunk_text, meta in self.iter_chunks(doc):
+            yield ChunkView.of(chunk_text, text, meta.get("start_char"), meta.get("end_char")), meta
+
+    def _chunk_fn(self, views: bool) -> Callable[[Dict[str, Any]], List[Tuple[Any, Dict[str, Any]]]]:
+        return self.chunk_views if views else self.chunk
+
+    def chunk_many(self, docs: List[Dict[str, Any]], workers: Optional[int] = None,
+                   return_exceptions: bool = False, views: bool = False) -> List[List[Dict[str, Any]]]:
+        """
+        `chunk()` every doc on a process pool (see `src.chunker.parallel.chunk_many`); one result per doc, in input order.
+        `workers=None` uses `Settings.CHUNK_WORKERS` (0 = all cores); small inputs are chunked in-process.
+        `views=True` returns `chunk_views()` results (a pool task sends each document text back once, not per chunk).
+        """
+        return chunk_many(self._chunk_fn(views), docs, workers=workers, return_exceptions=return_exceptions)
 
 
 
@@ -62,7 +158,10 @@ class TokenChunker(BaseChunker):
     Parameters
     ----------
     tokenizer : optional
-        Any tokenizer providing `tokenize()` or `encode()` (+ optional `convert_ids_to_tokens()`).
+        Any tokenizer providing `tokenize()` or `encode()` (+ optional `convert_ids_to_tokens()`), or a registry
+        `TokenizerHandle` of one.
+        HuggingFace fast tokenizers (`is_fast`) are called with `return_offsets_mapping=True`: windows and
+        exact character spans come from the offsets (no special tokens), and `chunk_many` batch-encodes docs.
         If omitted a whitespace-based tokenizer is used.
     chunk_size : int
         Number of tokens per chunk.
@@ -102,11 +201,12 @@ class TokenChunker(BaseChunker):
         self.min_tokens = int(min_tokens)
         self.chunk_type = chunk_type
 
-    def _tokenize(self, text: str) -> Tuple[List[str], Optional[List[Tuple[int, int]]]]:
+    def _tokenize(self, text: str) -> Tuple[Optional[List[str]], Optional[List[Tuple[int, int]]]]:
         if self.tokenizer is None:
-            tokens = whitespace_tokens(text)
-            spans = char_spans_for_whitespace_tokens(text, tokens)
-            return tokens, spans
+            return None, whitespace_token_spans(text)
+
+        elif _is_fast_hf(self.tokenizer):           # HuggingFace fast tokenizers: exact offsets, token strings not needed
+            return None, _encode_offsets(self.tokenizer, [text])[0]
 
         elif hasattr(self.tokenizer, "tokenizer"):  # spaCy, NLTK, SentencePiece-style wrappers
             # print("✅Entered the Spacy Tokenizer")
@@ -125,23 +225,56 @@ class TokenChunker(BaseChunker):
                 return [str(x) for x in enc], None
 
         else:
-            tokens = whitespace_tokens(text)
-            spans = char_spans_for_whitespace_tokens(text, tokens)
-            return tokens, spans
-
-    def chunk(self, doc: Dict[str, Any]) -> List[Dict[str, Any]]:
+            return None, whitespace_token_spans(text)
+
+    def chunk_many(self, docs: List[Dict[str, Any]], workers: Optional[int] = None,
+                   return_exceptions: bool = False, views: bool = False) -> List[List[Dict[str, Any]]]:
+        """
+        With a HF fast tokenizer, docs are batch-encoded in-process, `TOKENIZE_BATCH_SIZE` per tokenizer call
+        (the Rust tokenizer encodes a batch on all cores itself); other tokenizers use the process pool.
+        """
+        if not _is_fast_hf(self.tokenizer):
+            return super().chunk_many(docs, workers=workers, return_exceptions=return_exceptions, views=views)
+
+        docs = list(docs)
+        results: List[Any] = []
+        for i in range(0, len(docs), settings.TOKENIZE_BATCH_SIZE):
+            batch = docs[i:i + settings.TOKENIZE_BATCH_SIZE]
+            try:
+                offsets = _encode_offsets(self.tokenizer, [d.get("text", "") for d in batch])
+            except Exception:
+                # let the docs fail (or succeed) one by one
+                results.extend(chunk_many(self._chunk_fn(views), batch, workers=1, return_exceptions=return_exceptions))
+                continue
+            for doc, spans in zip(batch, offsets):
+                try:
+                    results.append(list(self._iter_windows(doc, None, spans, views)))
+                except Exception as e:
+                    if not return_exceptions:
+                        raise
+                    results.append(e)
+        return results
+
+    def iter_chunks(self, doc: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        tokens, spans = self._tokenize(doc.get("text", ""))
+        yield from self._iter_windows(doc, tokens, spans)
+
+    def iter_views(self, doc: Dict[str, Any]) -> Iterator[Tuple[ChunkView, Dict[str, Any]]]:
+        tokens, spans = self._tokenize(doc.get("text", ""))
+        yield from self._iter_windows(doc, tokens, spans, views=True)
+
+    def _iter_windows(self, doc: Dict[str, Any], tokens: Optional[List[str]],
+                      spans: Optional[List[Tuple[int, int]]], views: bool = False) -> Iterator[Tuple[Any, Dict[str, Any]]]:
+        """Token windows of a tokenized doc (`tokens` may be None when `spans` are given); `views`: see `iter_views`."""
         doc_id = doc.get("doc_id")      # or str(uuid.uuid4())  # to make it repeatable
         text = doc.get("text", "")
         # meta = doc.get("meta", {})
         lang = doc.get("language")
 
-        tokens, spans = self._tokenize(text)
-        total = len(tokens)
+        total = len(tokens) if tokens is not None else len(spans)
         if total == 0:
-            return []
+            return
 
-        chunks: List[Dict[str, Any]] = []
-        metadatas = []
         index = 0
         idx_chunk_id = 0
         while index < total:
@@ -154,27 +287,27 @@ class TokenChunker(BaseChunker):
             end = min(index + self.chunk_size, total)
             if end - index < self.min_tokens and end < total:
                 end = min(index + max(self.min_tokens, self.chunk_size), total)
-            chunk_tokens = tokens[index:end]
 
             if spans is not None and len(spans) == total:
                 start_char = spans[index][0]
                 end_char = spans[end - 1][1]
-                chunk_text = text[start_char:end_char]
+                chunk_text = _cut(text, start_char, end_char, views)
             else:
-                chunk_text = " ".join(chunk_tokens)
+                chunk_text = " ".join(tokens[index:end])
+                if views:
+                    chunk_text = ChunkView(chunk_text)
                 start_char = -1
                 end_char = -1
 
-            chunks.append(chunk_text)
-            metadatas.append({
+            yield chunk_text, {
                 "doc_id": doc_id,
                 "chunk_id": chunk_id,
                 "start_char": start_char,
                 "end_char": end_char,
-                "token_count": len(chunk_tokens),
+                "token_count": end - index,
                 "chunk_type": self.chunk_type,
                 "language": lang,
-            })
+            }
             idx_chunk_id +=1
 
             if self.stride <= 0:
@@ -182,8 +315,6 @@ class TokenChunker(BaseChunker):
             else:
                 index = index + self.chunk_size - self.stride
 
-        return list(zip(chunks, metadatas))
-
 
 
 
@@ -217,23 +348,21 @@ class SlidingWindowChunker(TokenChunker):
 
 
 
-import re
-_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?。！？])\s+|(?<=\n)\s*")
-
 class SentenceChunker(BaseChunker):
     """
     Sentence-level chunker with short-sentence merging.
-    - Uses a sentence-splitting regex to find sentence boundaries.
+    - Sentence boundaries come from the multilingual segmenter (`src.chunker.segmenter`, rules of the doc's
+      'language'; every newline also ends a sentence).
     - Optionally merges adjacent sentences until a minimum token count (`min_tokens`)
       is achieved. This prevents many very-short single-sentence chunks.
-    - Attempts to compute `start_char`/`end_char` by searching the document text
-      for the merged sentence text. If not found, offsets are -1.
+    - Single pass: each sentence is tokenized once and merged counts are running totals;
+      `start_char`/`end_char` come from the segmenter's offsets.
 
     Parameters
     ----------
     tokenizer : optional
-        Tokenizer used only for token counting when computing `min_tokens`. If omitted,
-        a whitespace-based token counter is used.
+        Tokenizer (or registry `TokenizerHandle`) used only for token counting when computing `min_tokens`.
+        If omitted, a whitespace-based token counter is used.
     min_tokens : int
         Minimum tokens per returned sentence chunk; short sentences are merged forward.
     chunk_type : str
@@ -241,17 +370,18 @@ class SentenceChunker(BaseChunker):
 
     Output fields
     -------------
-    - 'text' contains the sentence or merged-sentence block
-    - 'start_char'/'end_char' assigned when the substring can be located
+    - 'text' contains the sentence or merged-sentence block (merged sentences joined by a single space)
+    - 'start_char'/'end_char' exact offsets of the first/last sentence in the document
+      (`text[start_char:end_char]` equals 'text' up to the whitespace between merged sentences)
     - 'token_count' is derived from the tokenizer or whitespace tokenization
 
     Caveats
     -------
-    - The regex-based splitter is language-agnostic for many scripts but may miss tricky
-      abbreviations or newline-only punctuation cases; consider a proper sentence tokenizer
+    - The segmenter is rule-based (per-language abbreviation lists, no model): unlisted abbreviations
+      followed by an uppercase word still end a sentence; consider a trained sentence tokenizer
       for high-precision needs.
-    - Using `.find()` to compute offsets is simple but may produce the first occurrence
-      in repeated text. For robust provenance, prefer tokenizers that provide token->char spans.
+    - Merged token counts are the sum of the per-sentence counts (special tokens that an
+      `encode()` tokenizer adds per call are counted once per chunk).
     """
     def __init__(
         self, tokenizer: Optional[Any] = None, min_tokens: int = settings.DEFAULT_MIN_TOKENS_SENTENCE, 
@@ -261,6 +391,7 @@ class SentenceChunker(BaseChunker):
         self.tokenizer = tokenizer
         self.min_tokens = int(min_tokens)
         self.chunk_type = chunk_type
+        self._call_overhead: Optional[int] = None
 
     def _count_tokens(self, text: str) -> int:
         if self.tokenizer is None:
@@ -271,36 +402,54 @@ class SentenceChunker(BaseChunker):
             return len(self.tokenizer.tokenize(text))
         return len(whitespace_tokens(text))
 
-    def chunk(self, doc: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _count_overhead(self) -> int:
+        """Tokens `_count_tokens` adds per call regardless of the text (e.g. [CLS]/[SEP] from `encode()`)."""
+        if self._call_overhead is None:
+            try:
+                self._call_overhead = self._count_tokens("") if self.tokenizer is not None else 0
+            except Exception:
+                self._call_overhead = 0
+        return self._call_overhead
+
+    @staticmethod
+    def _sentence_spans(doc: Dict[str, Any]) -> List[Tuple[int, int]]:
+        return get_segmenter(doc.get("language"), line_breaks=True).spans(doc.get("text", ""))
+
+    @staticmethod
+    def _sentence_spans_many(docs: List[Dict[str, Any]]) -> List[List[Tuple[int, int]]]:
+        return sentence_spans_many([d.get("text", "") for d in docs], [d.get("language") for d in docs], line_breaks=True)
+
+    def iter_chunks(self, doc: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        yield from self._iter_merged(doc)
+
+    def iter_views(self, doc: Dict[str, Any]) -> Iterator[Tuple[ChunkView, Dict[str, Any]]]:
+        yield from self._iter_merged(doc, views=True)
+
+    def _iter_merged(self, doc: Dict[str, Any], views: bool = False) -> Iterator[Tuple[Any, Dict[str, Any]]]:
         doc_id = doc.get("doc_id") or str(uuid.uuid4())
         text = doc.get("text", "")
         lang = doc.get("language")
 
-        parts = [p.strip() for p in re.split(_SENTENCE_SPLIT_RE, text) if p and p.strip()]
-        chunks: List[Dict[str, Any]] = []
-        metadatas = []
+        spans = self._sentence_spans(doc)
+        counts = [self._count_tokens(text[s:e]) for s, e in spans]
+        overhead = self._count_overhead() if len(spans) > 1 else 0
 
         i = 0
         merged_idx = 0
-        while i < len(parts):
-            curr = parts[i]
-            token_count = self._count_tokens(curr)
+        while i < len(spans):
+            token_count = counts[i]
             j = i + 1
-            while token_count < self.min_tokens and j < len(parts):
-                curr = curr + " " + parts[j]
-                token_count = self._count_tokens(curr)
+            while token_count < self.min_tokens and j < len(spans):
+                token_count += counts[j] - overhead
                 j += 1
 
-            start = text.find(curr)
-            if start == -1:
-                start = -1
-                end = -1
+            start, end = spans[i][0], spans[j - 1][1]
+            if j - i > 1:
+                curr = " ".join(text[s:e] for s, e in spans[i:j])
+                curr = ChunkView.of(curr, text, start, end) if views else curr
             else:
-                end = start + len(curr)
-
-            chunks.append(curr)
-
-            metadatas.append({
+                curr = _cut(text, start, end, views)
+            yield curr, {
                 "doc_id": doc_id,
                 "chunk_id": make_chunk_id(doc_id, merged_idx, lang),
                 "start_char": start,
@@ -308,12 +457,163 @@ class SentenceChunker(BaseChunker):
                 "token_count": token_count,
                 "chunk_type": self.chunk_type,
                 "language": lang,
-            })
+            }
 
             merged_idx += 1
             i = j
 
-        return list(zip(chunks, metadatas))
+
+
+
+
+class TokenBudgetChunker(SentenceChunker):
+    """
+    Sentence-packing chunker sized in an embedding model's own tokens.
+
+    - Sentences (SentenceChunker splitter) are packed greedily while the chunk stays within `max_tokens` minus the
+      special tokens the tokenizer adds per input ([CLS]/[SEP], <s>/</s>), so chunks fill the model's input window
+      without being truncated by it.
+    - A sentence longer than the budget is cut into budget-sized token windows.
+    - HF fast tokenizers (`is_fast`) count all sentences of a doc in one call (`chunk_many`: `TOKENIZE_BATCH_SIZE`
+      docs per call) and give exact windows from their offsets; other tokenizers count like SentenceChunker,
+      without a tokenizer whitespace tokens are counted.
+
+    Parameters
+    ----------
+    tokenizer : optional
+        The embedding model's tokenizer (e.g. `SentenceTransformer.tokenizer`).
+    max_tokens : int
+        The model's max input length (`max_seq_length`), special tokens included.
+    chunk_type : str
+        Stored on the chunk (default 'model_token_chunks').
+
+    Output fields
+    -------------
+    - 'text' is the exact document slice from the first to the last packed sentence (or window)
+    - 'start_char'/'end_char' exact offsets; 'token_count' the sum of the packed sentences' counts (no special tokens)
+    """
+    def __init__(self, tokenizer: Optional[Any] = None, max_tokens: int = settings.DEFAULT_TOKEN_BUDGET,
+                 chunk_type: str = "model_token_chunks", **kwargs):
+        super().__init__(tokenizer=tokenizer, chunk_type=chunk_type, **kwargs)
+        self.max_tokens = int(max_tokens)
+        self._special: Optional[int] = None
+
+    @property
+    def budget(self) -> int:
+        """Content tokens per chunk: `max_tokens` minus the special tokens added per input."""
+        if self._special is None:
+            count = getattr(self.tokenizer, "num_special_tokens_to_add", None)
+            try:
+                self._special = int(count(pair=False)) if callable(count) else self._count_overhead()
+            except Exception:
+                self._special = self._count_overhead()
+        return max(1, self.max_tokens - self._special)
+
+    def _sentence_offsets(self, text: str, spans: List[Tuple[int, int]]) -> Optional[List[List[Tuple[int, int]]]]:
+        if not spans or not _is_fast_hf(self.tokenizer):
+            return None
+        return _encode_offsets(self.tokenizer, [text[s:e] for s, e in spans])
+
+    def iter_chunks(self, doc: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        text = doc.get("text", "")
+        spans = self._sentence_spans(doc)
+        offsets = self._sentence_offsets(text, spans)
+        yield from self._iter_packed(doc, spans, offsets)
+
+    def iter_views(self, doc: Dict[str, Any]) -> Iterator[Tuple[ChunkView, Dict[str, Any]]]:
+        text = doc.get("text", "")
+        spans = self._sentence_spans(doc)
+        offsets = self._sentence_offsets(text, spans)
+        yield from self._iter_packed(doc, spans, offsets, views=True)
+
+    def chunk_many(self, docs: List[Dict[str, Any]], workers: Optional[int] = None,
+                   return_exceptions: bool = False, views: bool = False) -> List[List[Dict[str, Any]]]:
+        """
+        With a HF fast tokenizer, the sentences of `TOKENIZE_BATCH_SIZE` docs are encoded per tokenizer call,
+        in-process; other tokenizers use the process pool.
+        """
+        if not _is_fast_hf(self.tokenizer):
+            return super().chunk_many(docs, workers=workers, return_exceptions=return_exceptions, views=views)
+
+        docs = list(docs)
+        results: List[Any] = []
+        for i in range(0, len(docs), settings.TOKENIZE_BATCH_SIZE):
+            batch = docs[i:i + settings.TOKENIZE_BATCH_SIZE]
+            all_spans = self._sentence_spans_many(batch)
+            try:
+                sentences = [d.get("text", "")[s:e] for d, spans in zip(batch, all_spans) for s, e in spans]
+                offsets = _encode_offsets(self.tokenizer, sentences) if sentences else []
+            except Exception:
+                # let the docs fail (or succeed) one by one
+                results.extend(chunk_many(self._chunk_fn(views), batch, workers=1, return_exceptions=return_exceptions))
+                continue
+            pos = 0
+            for doc, spans in zip(batch, all_spans):
+                try:
+                    results.append(list(self._iter_packed(doc, spans, offsets[pos:pos + len(spans)], views)))
+                except Exception as e:
+                    if not return_exceptions:
+                        raise
+                    results.append(e)
+                pos += len(spans)
+        return results
+
+    def _units(self, text: str, spans: List[Tuple[int, int]],
+               offsets: Optional[List[List[Tuple[int, int]]]]) -> Iterator[Tuple[int, int, int]]:
+        """(start, end, token_count) of each sentence, oversized sentences cut into windows of at most `budget` tokens."""
+        budget = self.budget
+        overhead = self._count_overhead()
+        for k, (s, e) in enumerate(spans):
+            if offsets is not None:
+                tokens = [(s + a, s + b) for a, b in offsets[k]]
+                count = len(tokens)
+            else:
+                tokens = None
+                count = self._count_tokens(text[s:e]) - (overhead if self.tokenizer is not None else 0)
+            if count <= budget:
+                yield s, e, count
+                continue
+
+            if tokens is None:
+                tokens = [(s + a, s + b) for a, b in whitespace_token_spans(text[s:e])]
+            exact = offsets is not None or self.tokenizer is None
+            # other tokenizers: windows of as many words as fit the budget on average
+            step = budget if exact else max(1, budget * len(tokens) // max(count, 1))
+            for w in range(0, len(tokens), step):
+                window = tokens[w:w + step]
+                ws, we = window[0][0], window[-1][1]
+                yield ws, we, len(window) if exact else self._count_tokens(text[ws:we]) - overhead
+
+    def _iter_packed(self, doc: Dict[str, Any], spans: List[Tuple[int, int]],
+                     offsets: Optional[List[List[Tuple[int, int]]]], views: bool = False) -> Iterator[Tuple[Any, Dict[str, Any]]]:
+        doc_id = doc.get("doc_id") or str(uuid.uuid4())
+        text = doc.get("text", "")
+        lang = doc.get("language")
+        budget = self.budget
+
+        def _chunk(start: int, end: int, token_count: int, idx: int):
+            return _cut(text, start, end, views), {
+                "doc_id": doc_id,
+                "chunk_id": make_chunk_id(doc_id, idx, lang),
+                "start_char": start,
+                "end_char": end,
+                "token_count": token_count,
+                "chunk_type": self.chunk_type,
+                "language": lang,
+            }
+
+        start = end = None
+        token_count = idx = 0
+        for s, e, count in self._units(text, spans, offsets):
+            if start is not None and token_count + count > budget:
+                yield _chunk(start, end, token_count, idx)
+                start, idx = None, idx + 1
+            if start is None:
+                start, token_count = s, 0
+            end = e
+            token_count += count
+        if start is not None:
+            yield _chunk(start, end, token_count, idx)
 
 
 
@@ -351,14 +651,12 @@ class ParagraphChunker(BaseChunker):
         self.min_chars = int(min_chars)
         self.chunk_type = chunk_type
 
-    def chunk(self, doc: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def iter_chunks(self, doc: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
         doc_id = doc.get("doc_id") or str(uuid.uuid4())
         text = doc.get("text", "")
         lang = doc.get("language")
 
         parts = [p.strip() for p in re.split(_PARAGRAPH_SPLIT_RE, text) if p and p.strip()]
-        chunks: List[Dict[str, Any]] = []
-        metadatas = []
         i = 0
         idx = 0
         while i < len(parts):
@@ -375,8 +673,7 @@ class ParagraphChunker(BaseChunker):
             else:
                 end = start + len(curr)
 
-            chunks.append(curr)
-            metadatas.append({
+            yield curr, {
                 "doc_id": doc_id,
                 "chunk_id": make_chunk_id(doc_id, idx, lang),
                 "start_char": start,
@@ -384,33 +681,198 @@ class ParagraphChunker(BaseChunker):
                 "token_count": len(whitespace_tokens(curr)),
                 "chunk_type": self.chunk_type,
                 "language": lang,
-            })
+            }
             idx += 1
             i = j
 
-        return list(zip(chunks, metadatas))
+
+def iter_paragraph_chunks(doc: Dict[str, Any], chunk_fn: Callable[[Dict[str, Any]], Iterable[Tuple[Any, Dict[str, Any]]]]
+                          ) -> Iterator[Tuple[Any, Dict[str, Any]]]:
+    """
+    Chunk `doc` one paragraph (`_PARAGRAPH_SPLIT_RE`) at a time with `chunk_fn(paragraph_doc)`, so no chunk crosses
+    a paragraph break and editing one paragraph leaves the chunks of the others unchanged (incremental indexing).
+    Offsets are shifted to the document, chunk_ids renumbered across it, and `ChunkView`s rebased onto its text.
+    """
+    text = doc.get("text", "")
+    idx = 0
+    for ps, pe in split_spans(text, _PARAGRAPH_SPLIT_RE):
+        paragraph = dict(doc, text=text[ps:pe])
+        for chunk, meta in chunk_fn(paragraph):
+            meta = dict(meta or {})
+            start, end = meta.get("start_char"), meta.get("end_char")
+            if type(start) is int and type(end) is int and start >= 0:
+                meta["start_char"], meta["end_char"] = start + ps, end + ps
+            if "chunk_id" in meta:
+                meta["chunk_id"] = make_chunk_id(meta.get("doc_id"), idx, meta.get("language"))
+            if isinstance(chunk, ChunkView) and chunk.source is paragraph["text"]:
+                chunk = ChunkView(text, chunk.start + ps, chunk.end + ps)
+            yield chunk, meta
+            idx += 1
 
 
 
 
-def semantic_chunking(text, model, provider, threshold=0.8):
+class SemanticChunker(SentenceChunker):
     """
-        Minimum unit is a Sentence. More than 1 sentences are added in the same chunk if they have similar meaning.
+    Embedding-based sentence chunker.
+
+    - Splits the text into sentences (same splitter as SentenceChunker) and embeds all of them in one
+      `embed_documents` call; `chunk_many` embeds the sentences of all docs in a single call.
+    - Cosine similarities of adjacent sentences are computed with NumPy; a chunk ends where the similarity
+      drops below `threshold`, or where the next sentence would take it over `max_tokens`.
+    - Embedding providers are shared per (provider, model) through `src.chunker.registry.get_embedding_provider`.
+
+    Parameters
+    ----------
+    model, provider : str, optional
+        Embedding model / provider (default `SEMANTIC_CHUNKING_MODEL` / `SEMANTIC_CHUNKING_PROVIDER` of the retrieval config).
+    threshold : float, optional
+        Minimum adjacent-sentence cosine similarity to stay in the same chunk (default `SEMANTIC_CHUNKING_THRESHOLD`).
+    max_tokens : int
+        Token budget per chunk, counted like SentenceChunker (`tokenizer` or whitespace). A single sentence longer
+        than the budget becomes its own chunk.
+    tokenizer : optional
+        Token counter; defaults to the registry's HF tokenizer `SEMANTIC_TOKENIZER` when that is set.
+    embedder : optional
+        Object with `embed_documents(list[str])`, used instead of a registry provider.
+
+    Output fields
+    -------------
+    - 'text' is the exact document slice from the first to the last sentence of the chunk
+    - 'start_char'/'end_char', 'token_count', 'chunk_type' ('semantic_chunks'), 'language' as SentenceChunker
     """
-    import re
-    from sklearn.metrics.pairwise import cosine_similarity
-    sentences = re.split(r'(?<=[.!?]) +', text)    # Split by sentence
+    def __init__(
+        self, model: Optional[str] = None, provider: Optional[str] = None, threshold: Optional[float] = None,
+        max_tokens: int = settings.SEMANTIC_MAX_TOKENS, tokenizer: Optional[Any] = None, embedder: Optional[Any] = None,
+        chunk_type: str = "semantic_chunks", **kwargs
+    ):
+        if tokenizer is None and settings.SEMANTIC_TOKENIZER:
+            tokenizer = tokenizer_handle("hf", settings.SEMANTIC_TOKENIZER)
+        super().__init__(tokenizer=tokenizer, chunk_type=chunk_type, **kwargs)
+        if model is None or provider is None or threshold is None:
+            from src.retrieval.config import Settings as RetrievalSettings
+            retrieval_settings = RetrievalSettings()
+            model = model or retrieval_settings.SEMANTIC_CHUNKING_MODEL
+            provider = provider or retrieval_settings.SEMANTIC_CHUNKING_PROVIDER
+            threshold = retrieval_settings.SEMANTIC_CHUNKING_THRESHOLD if threshold is None else threshold
+        self.model = model
+        self.provider = provider
+        self.threshold = float(threshold)
+        self.max_tokens = int(max_tokens)
+        self.embedder = embedder
+
+    def _embed(self, sentences: List[str]):
+        import numpy as np
+
+        if self.embedder is None:
+            from .registry import get_embedding_provider
+            self.embedder = get_embedding_provider(self.provider, self.model)
+        vectors = np.asarray(self.embedder.embed_documents(sentences) if sentences else [], dtype=np.float32)
+        if vectors.shape[0] != len(sentences):
+            raise RuntimeError(f"Embedding provider returned {vectors.shape[0]} vectors for {len(sentences)} sentences")
+        return vectors
+
+    @staticmethod
+    def adjacent_similarities(vectors) -> "np.ndarray":
+        """Cosine similarity of each row with the next one (length n - 1)."""
+        import numpy as np
+
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(vectors), -1)
+        norms = np.linalg.norm(vectors, axis=1)
+        unit = vectors / np.maximum(norms, 1e-12)[:, None]
+        return np.einsum("ij,ij->i", unit[:-1], unit[1:])
+
+    def iter_chunks(self, doc: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        text = doc.get("text", "")
+        spans = self._sentence_spans(doc)
+        vectors = self._embed([text[s:e] for s, e in spans])
+        yield from self._iter_groups(doc, spans, vectors)
+
+    def iter_views(self, doc: Dict[str, Any]) -> Iterator[Tuple[ChunkView, Dict[str, Any]]]:
+        text = doc.get("text", "")
+        spans = self._sentence_spans(doc)
+        vectors = self._embed([text[s:e] for s, e in spans])
+        yield from self._iter_groups(doc, spans, vectors, views=True)
+
+    def chunk_many(self, docs: List[Dict[str, Any]], workers: Optional[int] = None,
+                   return_exceptions: bool = False, views: bool = False) -> List[List[Dict[str, Any]]]:
+        """
+        Chunk many docs with a single embedding call over all their sentences (in-process: the embedding
+        model is not copied into worker processes, `workers` is ignored).
+        """
+        docs = list(docs)
+        all_spans = self._sentence_spans_many(docs)
+        try:
+            vectors = self._embed([d.get("text", "")[s:e] for d, spans in zip(docs, all_spans) for s, e in spans])
+        except Exception:
+            # let the docs fail (or succeed) one by one
+            return chunk_many(self._chunk_fn(views), docs, workers=1, return_exceptions=return_exceptions)
+
+        results: List[Any] = []
+        offset = 0
+        for doc, spans in zip(docs, all_spans):
+            try:
+                results.append(list(self._iter_groups(doc, spans, vectors[offset:offset + len(spans)], views)))
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                results.append(e)
+            offset += len(spans)
+        return results
+
+    def _iter_groups(self, doc: Dict[str, Any], spans: List[Tuple[int, int]], vectors,
+                     views: bool = False) -> Iterator[Tuple[Any, Dict[str, Any]]]:
+        """Merge consecutive sentences of one doc into chunks (similarity threshold + token budget)."""
+        doc_id = doc.get("doc_id") or str(uuid.uuid4())
+        text = doc.get("text", "")
+        lang = doc.get("language")
+        if not spans:
+            return
+
+        sims = self.adjacent_similarities(vectors).tolist() if len(spans) > 1 else []
+        counts = [self._count_tokens(text[s:e]) for s, e in spans]
+        overhead = self._count_overhead() if len(spans) > 1 else 0
+
+        def _chunk(i: int, j: int, token_count: int, idx: int):
+            start, end = spans[i][0], spans[j - 1][1]
+            return _cut(text, start, end, views), {
+                "doc_id": doc_id,
+                "chunk_id": make_chunk_id(doc_id, idx, lang),
+                "start_char": start,
+                "end_char": end,
+                "token_count": token_count,
+                "chunk_type": self.chunk_type,
+                "language": lang,
+            }
+
+        first, token_count, idx = 0, counts[0], 0
+        for j in range(1, len(spans)):
+            merged = token_count + counts[j] - overhead
+            if sims[j - 1] < self.threshold or merged > self.max_tokens:
+                yield _chunk(first, j, token_count, idx)
+                first, token_count, idx = j, counts[j], idx + 1
+            else:
+                token_count = merged
+        yield _chunk(first, len(spans), token_count, idx)
 
-    if provider == "sentence_transformers":
-        from src.indexing.embeddings import SentenceTransformersProvider
-        embeddings = [SentenceTransformersProvider(model).embed_documents(sentences)]
-    elif provider == "cohere":
-        from src.indexing.embeddings import CohereAIEmbeddingProvider
-        embeddings = [CohereAIEmbeddingProvider(model).embed_documents(sentences)]
-    elif provider == "openai":
-        from src.indexing.embeddings import OpenAIEmbeddingProvider
-        embeddings = [OpenAIEmbeddingProvider(model).embed_documents(sentences)]
 
+_SEMANTIC_CHUNKERS: Dict[Tuple[Optional[str], Optional[str], Optional[float], Optional[TokenizerHandle]], SemanticChunker] = {}
+
+def semantic_chunking(text, model: Optional[str] = None, provider: Optional[str] = None,
+                      threshold: Optional[float] = None, tokenizer: Optional[TokenizerHandle] = None
+                      ) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Minimum unit is a Sentence. More than 1 sentences are added in the same chunk if they have similar meaning.
+    `text` is a string or a doc dict; returns `SemanticChunker(model, provider, threshold, tokenizer=...).chunk(...)`
+    (chunkers, and so their embedding providers, are cached per configuration; tokenizers are registry handles).
+    """
+    doc = text if isinstance(text, dict) else {"text": text or ""}
+    key = (model, provider, threshold, tokenizer)
+    chunker = _SEMANTIC_CHUNKERS.get(key)
+    if chunker is None:
+        chunker = _SEMANTIC_CHUNKERS.setdefault(key, SemanticChunker(model=model, provider=provider, threshold=threshold,
+                                                                     tokenizer=tokenizer))
+    return chunker.chunk(doc)
 
 
 
@@ -423,8 +885,7 @@ def llm_based_chunking(text, model_name):
     tokenizer = AutoTokenizer.from_pretrained(model_name)
     model = AutoModelForCausalLM.from_pretrained(model_name)
 
-    import re
-    sentences = re.split(r'(?<=[.!?]) +', text)  # Split by sentence
+    sentences = split_sentences(text)  # Split by sentence
     chunks = []
     
     # Feed sentences or chunks to the Mistral model for dynamic chunking
@@ -443,6 +904,69 @@ def llm_based_chunking(text, model_name):
 
 
 
+def iter_context_aware_spans(text: str, max_chars: int, overlap_sentences: int,
+                             lang: Optional[str] = None) -> Iterator[List[Tuple[int, int]]]:
+    """
+    Character spans of the chunks built by `context_aware_chunking`, yielded one chunk at a time,
+    without materializing any string.
+
+    Each chunk is a list of (start, end) offsets into `text`: the sentences it joins (with a single space),
+    or a single `max_chars` slice of an oversized sentence. Sentences are located once (segmenter rules of
+    `lang`, paragraph breaks end sentences), and the chunk length is kept as a running total, so the whole
+    pass is linear in the document length.
+    """
+    if max_chars < 1:
+        raise ValueError(f"max_chars must be >= 1, got {max_chars}")
+
+    # --- 1./2. Paragraph and sentence split (one segmenter scan) ---
+    sentences = get_segmenter(lang).spans(text)
+
+    current: List[Tuple[int, int]] = []
+    current_len = 0         # len(" ".join(current)), current spans are whitespace-stripped
+    fresh = False           # current holds a sentence added since the last emitted chunk (not only overlap)
+    i = 0
+    n = len(sentences)
+    start, end = sentences[0] if sentences else (0, 0)
+    while i < n:
+        sent_len = end - start
+        candidate_len = current_len + 1 + sent_len if current else sent_len
+
+        if candidate_len > max_chars:   # If adding this sentence exceeds budget → finalize current chunk
+            if current and fresh:
+                yield current
+                # prepare next chunk with overlap
+                current = current[-overlap_sentences:] if overlap_sentences > 0 else []
+                current_len = sum(e - s for s, e in current) + max(len(current) - 1, 0)
+                fresh = False
+            elif current:
+                # the overlap alone leaves no room for the sentence → start the next chunk without it
+                current, current_len = [], 0
+            else:
+                # If sentence itself too large → force split, continue with the remainder
+                yield [(start, start + max_chars)]
+                start += max_chars
+        else:   # Adds normally
+            if not current and text[start].isspace():       # a force-split remainder may start with whitespace
+                start = end - len(text[start:end].lstrip())
+            current.append((start, end))
+            current_len = candidate_len if len(current) > 1 else end - start
+            fresh = True
+            i += 1
+            if i < n:
+                start, end = sentences[i]
+
+    # Adds last chunk
+    if current and fresh:
+        yield current
+
+
+def context_aware_spans(text: str, max_chars: int, overlap_sentences: int,
+                        lang: Optional[str] = None) -> List[List[Tuple[int, int]]]:
+    """List of `iter_context_aware_spans`."""
+    return list(iter_context_aware_spans(text, max_chars, overlap_sentences, lang))
+
+
+
 def context_aware_chunking(doc: Dict[str, Any], max_chars: int, overlap_sentences: int):
     """
     Structure-based not Semantic.
@@ -451,17 +975,21 @@ def context_aware_chunking(doc: Dict[str, Any], max_chars: int, overlap_sentence
     while ensuring a maximum character budget per chunk (approximate).
 
     - Split the document into paragraphs (double newlines or similar).
-    - For each paragraph, split into sentences using a lightweight heuristic.
+    - For each paragraph, split into sentences with the segmenter rules of the doc's 'language'.
     - Accumulate sentences into `current` until adding another sentence would
       exceed `max_chars`. When limit is hit:
         - Emit the current chunk (with metadata)
         - Optionally keep `overlap_sentences` at the end of the current chunk
-          to add as the start of the next chunk (sliding overlap).
+          to add as the start of the next chunk (sliding overlap). If the overlap
+          leaves no room for the next sentence, the next chunk starts without it.
     - Edge cases:
         * If a single sentence is longer than `max_chars`, force-split the sentence
           into a substring of length `max_chars` and continue with the remainder.
         * The function returns a list of pairs: (chunk_text, metadata dict)
 
+    Chunk boundaries are computed by `iter_context_aware_spans` (running lengths, exact offsets) and
+    chunk strings are built once per emitted chunk; `iter_context_aware_chunks` yields the same pairs lazily.
+
     Parameters
     ----------
     doc : dict-like
@@ -479,63 +1007,37 @@ def context_aware_chunking(doc: Dict[str, Any], max_chars: int, overlap_sentence
     
     metadata : Dict contains at least {'context_title': title}.
     """
+    return list(iter_context_aware_chunks(doc, max_chars, overlap_sentences))
+
+
+def iter_context_aware_chunks(doc: Dict[str, Any], max_chars: int, overlap_sentences: int,
+                              views: bool = False, spans: Optional[Iterable[List[Tuple[int, int]]]] = None
+                              ) -> Iterator[Tuple[Any, Dict[str, Any]]]:
+    """
+    Generator form of `context_aware_chunking`: (chunk_text, metadata) pairs, one chunk at a time.
+    `views=True` yields `ChunkView`s (single-sentence chunks then share the document text).
+    `spans`: precomputed `context_aware_spans` of the doc (e.g. kept for a chunk cache).
+    """
     text = doc["text"]
     title = doc["title"]
 
     if not text:
-        return [], []
-
-    import re
-    # --- 1. Paragraph split ---
-    paragraphs = [p.strip() for p in re.split(r"\n\s*\n+", text) if p.strip()]
+        return
 
-    # --- 2. Sentence split (simple heuristic) ---
-    def split_sentences(p):
-        pattern = r'(?<=[\.\!\?])\s+(?=[A-Z0-9"])'
-        sents = re.split(pattern, p)
-        return [s.strip() for s in sents if s.strip()]
-
-    sentences = []
-    for p in paragraphs:
-        s = split_sentences(p)
-        if not s:
-            s = [p]  # fallback
-        sentences.extend(s)
-
-    chunks = []
-    metadatas = []
-
-    current = []
-    i = 0
-    n = len(sentences)
-
-    def join_current():
-        return " ".join(current).strip()
-
-    while i < n:
-        sent = sentences[i]
-        candidate = (join_current() + " " + sent).strip() if current else sent
+    if spans is None:
+        spans = iter_context_aware_spans(text, max_chars, overlap_sentences, doc.get("language"))
+    for chunk_spans in spans:
+        if len(chunk_spans) == 1:
+            chunk_text = _cut(text, chunk_spans[0][0], chunk_spans[0][1], views)
+        else:
+            chunk_text = " ".join(text[s:e] for s, e in chunk_spans)
+            chunk_text = ChunkView(chunk_text) if views else chunk_text
+        yield chunk_text, {"context_title": title}
 
-        if len(candidate) > max_chars:  # If adding this sentence exceeds budget → finalize current chunk
-            if current:
-                chunks.append(join_current())
-                metadatas.append({"context_title": title})
-                # prepare next chunk with overlap
-                current = current[-overlap_sentences:] if overlap_sentences > 0 else []
-                continue
-            else:
-                # If sentence itself too large → force split
-                chunks.append(sent[:max_chars])
-                metadatas.append({"context_title": title})
-                sentences[i] = sent[max_chars:]
-                continue
-        else:   # Adds normally
-            current.append(sent)
-            i += 1
 
-    # Adds last chunk
-    if current:
-        chunks.append(join_current())
-        metadatas.append({"context_title": title})
 
-    return list(zip(chunks, metadatas))
\ No newline at end of file
+def context_aware_chunking_many(docs: List[Dict[str, Any]], max_chars: int, overlap_sentences: int,
+                                workers: Optional[int] = None, return_exceptions: bool = False):
+    """`context_aware_chunking` of every doc on a process pool; one list of (chunk_text, metadata) per doc, in input order."""
+    fn = functools.partial(context_aware_chunking, max_chars=max_chars, overlap_sentences=overlap_sentences)
+    return chunk_many(fn, docs, workers=workers, return_exceptions=return_exceptions)
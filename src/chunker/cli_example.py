@@ -7,9 +7,9 @@ Demonstrates how to apply different chunking strategies (Token, Sliding Window,
 provided documents be in a certain format.
 """
 
-import spacy
-
 from src.chunker import (
+    get_spacy_tokenizer,
+    tokenizer_memory_report,
     TokenChunker,
     SlidingWindowChunker,
     SentenceChunker,
@@ -55,12 +55,14 @@ if __name__ == "__main__":
 
     # Token-based chunking
     token_chunker = TokenChunker(
-        tokenizer=spacy.load("en_core_web_sm", disable=["parser", "ner", "tagger"]),
+        tokenizer=get_spacy_tokenizer("en"),     # shared, loaded once per process
         chunk_size=10,
         stride=1
     )
     token_chunks = token_chunker.chunk(DOCUMENT)
     print_chunks("\nTokenChunker", token_chunks)
+    for name, stats in tokenizer_memory_report().items():
+        print(f"Tokenizer {name}: loaded in {stats['load_seconds']}s, RSS +{stats['rss_bytes']} bytes")
 
     # Sliding window chunking
     sliding_chunker = SlidingWindowChunker(chunk_size=12, overlap=4)
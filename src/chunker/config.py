@@ -9,4 +9,17 @@ class Settings:
     DEFAULT_SLIDING_OVERLAP: int = 128
     DEFAULT_MIN_TOKENS_SENTENCE: int = 12
     DEFAULT_MIN_PARAGRAPH_CHARS: int = 150
-    DEFAULT_CHUNKER_LANGUAGE: str = "en"
\ No newline at end of file
+    DEFAULT_CHUNKER_LANGUAGE: str = "en"
+    DEFAULT_TOKEN_BUDGET: int = 256             # TokenBudgetChunker max_tokens when the model's max_seq_length is unknown
+    SEMANTIC_MAX_TOKENS: int = 256              # SemanticChunker budget (max_seq_length of all-MiniLM-L6-v2)
+    # HF tokenizer (src/chunker/registry.py) counting SemanticChunker tokens, e.g. "sentence-transformers/all-MiniLM-L6-v2";
+    # None counts whitespace tokens
+    SEMANTIC_TOKENIZER: Optional[str] = None
+
+    # spaCy pipelines whose tokenizer is used per language (src/chunker/registry.py); others use spacy.blank(lang)
+    SPACY_MODELS: Dict[str, str] = field(default_factory=lambda: {"en": "en_core_web_sm"})
+
+    # BaseChunker.chunk_many / context_aware_chunking_many (src/chunker/parallel.py)
+    CHUNK_WORKERS: int = 0                      # worker processes, 0 = os.cpu_count()
+    CHUNK_PARALLEL_MIN_CHARS: int = 200_000     # smaller inputs are chunked in-process (pool start-up would dominate)
+    TOKENIZE_BATCH_SIZE: int = 64               # docs per HF fast-tokenizer call in TokenChunker.chunk_many
@@ -0,0 +1,145 @@
+"""
+Process-pool execution of chunkers over many documents (`BaseChunker.chunk_many`, `context_aware_chunking_many`).
+
+Chunking is pure Python and CPU bound, so threads do not help; documents are spread over worker processes instead.
+- Scheduling is size aware: documents are packed into `TASKS_PER_WORKER * workers` tasks by text length
+  (longest first, each into the lightest task) and the heaviest tasks are submitted first, so one long
+  article does not leave the other workers idle at the end of a buffer.
+- Workers are spawned, not forked: the parent may hold a loaded embedding model (torch/CUDA) and open SQLite
+  connections that must not be duplicated into the children.
+- `chunk_pool(workers)` keeps one pool for every `chunk_many` call of a block (e.g. one indexing run, called once
+  per document buffer), started on first use; outside such a block each call starts and stops its own pool.
+  The chunk function travels with each task, so calls with different chunkers share the pool.
+- Results come back in input order. Small inputs (below `CHUNK_PARALLEL_MIN_CHARS`) are chunked in-process.
+"""
+from __future__ import annotations
+
+import contextlib
+import heapq
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .config import Settings
+
+logger = logging.getLogger(__name__)
+settings = Settings()
+
+TASKS_PER_WORKER = 4
+
+_ACTIVE = threading.local()     # .pool: the ChunkPool of the innermost `chunk_pool` block of this thread
+
+
+
+def _chunk_one(chunk_fn: Callable[[Dict[str, Any]], Any], doc: Dict[str, Any], return_exceptions: bool):
+    try:
+        return chunk_fn(doc)
+    except Exception as e:
+        if return_exceptions:
+            return e
+        raise
+
+
+def _run_task(chunk_fn: Callable[[Dict[str, Any]], Any], task: List[Tuple[int, Dict[str, Any]]],
+              return_exceptions: bool) -> List[Tuple[int, Any]]:
+    return [(idx, _chunk_one(chunk_fn, doc, return_exceptions)) for idx, doc in task]
+
+
+
+def resolve_workers(workers: Optional[int] = None) -> int:
+    """Number of processes for `workers` (None -> `Settings.CHUNK_WORKERS`, 0 -> all cores)."""
+    workers = settings.CHUNK_WORKERS if workers is None else workers
+    return max(1, int(workers) or os.cpu_count() or 1)
+
+
+class ChunkPool:
+    """Spawn-context process pool of `workers` processes, started on the first `get()` (see `chunk_pool`)."""
+    def __init__(self, workers: int):
+        self.workers = int(workers)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def get(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+@contextlib.contextmanager
+def chunk_pool(workers: Optional[int] = None) -> Iterator[ChunkPool]:
+    """
+    Share one process pool between the `chunk_many` calls of this thread inside the block (None -> `CHUNK_WORKERS`,
+    0 -> all cores). The pool starts on the first call that needs it and is shut down when the block exits.
+    """
+    pool = ChunkPool(resolve_workers(workers))
+    outer = getattr(_ACTIVE, "pool", None)
+    _ACTIVE.pool = pool
+    try:
+        yield pool
+    finally:
+        _ACTIVE.pool = outer
+        pool.close()
+
+
+def plan_tasks(sizes: Sequence[int], n_tasks: int) -> List[List[int]]:
+    """
+    Pack document indices into at most `n_tasks` tasks of similar total size (longest-processing-time first).
+    Tasks are returned heaviest first; indices inside a task keep their input order.
+    """
+    n_tasks = max(1, min(int(n_tasks), len(sizes)))
+    heap = [(0, t) for t in range(n_tasks)]
+    tasks: List[List[int]] = [[] for _ in range(n_tasks)]
+    loads = [0] * n_tasks
+    for idx in sorted(range(len(sizes)), key=lambda i: sizes[i], reverse=True):
+        load, t = heapq.heappop(heap)
+        tasks[t].append(idx)
+        loads[t] = load + sizes[idx]
+        heapq.heappush(heap, (loads[t], t))
+    order = sorted(range(n_tasks), key=lambda t: loads[t], reverse=True)
+    return [sorted(tasks[t]) for t in order if tasks[t]]
+
+
+def chunk_many(chunk_fn: Callable[[Dict[str, Any]], Any], docs: Sequence[Dict[str, Any]], workers: Optional[int] = None,
+               return_exceptions: bool = False, min_chars: Optional[int] = None) -> List[Any]:
+    """
+    Apply `chunk_fn` (picklable: a module-level function, `functools.partial` of one, or a chunker's bound
+    `chunk`) to every doc on a process pool; returns one result per doc, in input order.
+
+    - workers: processes (None -> `Settings.CHUNK_WORKERS`, 0 -> all cores); 1 chunks in-process. Inside a
+      `chunk_pool` block the block's pool is used (with at most its number of processes)
+    - return_exceptions: put a doc's exception in its result slot instead of raising it
+    - min_chars: total text size below which the docs are chunked in-process (default `CHUNK_PARALLEL_MIN_CHARS`)
+    """
+    docs = list(docs)
+    workers = min(resolve_workers(workers), len(docs))
+    sizes = [len(d.get("text") or "") for d in docs]
+    min_chars = settings.CHUNK_PARALLEL_MIN_CHARS if min_chars is None else min_chars
+    if workers <= 1 or sum(sizes) < min_chars:
+        return [_chunk_one(chunk_fn, d, return_exceptions) for d in docs]
+
+    shared = getattr(_ACTIVE, "pool", None)
+    pool = shared if shared is not None else ChunkPool(workers)
+    workers = min(workers, pool.workers)
+    results: List[Any] = [None] * len(docs)
+    tasks = plan_tasks(sizes, workers * TASKS_PER_WORKER)
+    try:
+        executor = pool.get()
+        futures = [executor.submit(_run_task, chunk_fn, [(i, docs[i]) for i in task], return_exceptions) for task in tasks]
+        for fut in futures:
+            for idx, res in fut.result():
+                results[idx] = res
+    except BrokenProcessPool:
+        pool.close()            # a shared pool restarts on its next use
+        raise
+    finally:
+        if pool is not shared:
+            pool.close()
+    return results
@@ -0,0 +1,254 @@
+"""
+Process-wide registry of tokenizers, token chunkers and embedding providers for XRAG+.
+
+`spacy.load(...)` / `AutoTokenizer.from_pretrained(...)` take hundreds of milliseconds and tens to hundreds of MB,
+so components living in the same process (chunkers, the Reranker, the semantic chunker, the CLI examples) must not
+each load their own copy. The registry loads every tokenizer once per process, keyed by (kind, name, language):
+
+- "spacy": tokenizer-only pipeline. Languages with a configured model (`Settings.SPACY_MODELS`) load it with
+  parser/ner/tagger disabled; other languages (or a missing model package) use `spacy.blank(lang)`, and unknown
+  languages `spacy.blank("xx")`.
+- "hf": HuggingFace fast tokenizer (`AutoTokenizer.from_pretrained(name, use_fast=True)`).
+- "whitespace": the regex whitespace tokenizer chunkers fall back to without a tokenizer (nothing to load).
+
+`tokenizer_handle(...)` returns a `TokenizerHandle`: a small picklable reference that every chunker accepts in
+place of a tokenizer. It resolves through the registry on first use, so chunkers shipped to worker processes
+carry the handle instead of a pickled pipeline and each process loads the tokenizer once.
+`preload_tokenizers(...)` loads handles ahead of the first request; `tokenizer_memory_report()` gives what each loaded
+tokenizer cost (process RSS growth while loading, measured with psutil when installed).
+One `TokenChunker` per (language, chunk_size, stride) and one embedding provider per (provider, model) are shared the same way.
+
+- Loading is guarded by a lock; returned objects are shared and must be treated as read-only.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+
+from .config import Settings
+from .utils import whitespace_tokens
+
+if TYPE_CHECKING:
+    from .chunkers import TokenChunker
+
+logger = logging.getLogger(__name__)
+settings = Settings()
+
+TOKENIZER_KINDS = ("spacy", "hf", "whitespace")
+
+_LOCK = threading.Lock()
+_TOKENIZERS: Dict[Tuple[str, Optional[str], Optional[str]], Any] = {}
+_TOKENIZER_STATS: Dict[Tuple[str, Optional[str], Optional[str]], Dict[str, Any]] = {}
+_TOKEN_CHUNKERS: Dict[Tuple[str, int, int], "TokenChunker"] = {}
+_EMBEDDING_PROVIDERS: Dict[Tuple[str, str], Any] = {}
+
+
+
+class WhitespaceTokenizer:
+    """Tokenizer of the "whitespace" kind: `whitespace_tokens`, the chunkers' fallback tokenization."""
+    def tokenize(self, text: str) -> List[str]:
+        return whitespace_tokens(text)
+
+    def __repr__(self) -> str:
+        return "WhitespaceTokenizer()"
+
+
+
+@dataclass(frozen=True)
+class TokenizerHandle:
+    """
+    Picklable reference to a registry tokenizer (build it with `tokenizer_handle`).
+    `get()` returns the shared tokenizer, loading it in this process on first use.
+    """
+    kind: str
+    name: Optional[str] = None
+    lang: Optional[str] = None
+
+    @property
+    def key(self) -> Tuple[str, Optional[str], Optional[str]]:
+        return (self.kind, self.name, self.lang)
+
+    @property
+    def loaded(self) -> bool:
+        return self.key in _TOKENIZERS
+
+    def get(self):
+        tok = _TOKENIZERS.get(self.key)
+        return tok if tok is not None else _load_tokenizer(self)
+
+    def __str__(self) -> str:
+        return ":".join(part for part in self.key if part)
+
+
+
+def tokenizer_handle(kind: str = "spacy", name: Optional[str] = None, lang: Optional[str] = None) -> TokenizerHandle:
+    """
+    Handle of the tokenizer `kind` ("spacy", "hf", "whitespace").
+    - spacy: `lang` (default DEFAULT_CHUNKER_LANGUAGE) and optional model `name` (default `SPACY_MODELS[lang]`)
+    - hf: model `name` (required); `lang` is ignored
+    - whitespace: takes no arguments
+    """
+    if kind == "spacy":
+        lang = (lang or settings.DEFAULT_CHUNKER_LANGUAGE).lower()
+        return TokenizerHandle("spacy", name or settings.SPACY_MODELS.get(lang), lang)
+    if kind == "hf":
+        if not name:
+            raise ValueError("A HuggingFace tokenizer handle needs a model name")
+        return TokenizerHandle("hf", name)
+    if kind == "whitespace":
+        return TokenizerHandle("whitespace")
+    raise ValueError(f"Unknown tokenizer kind: {kind}. Supported: {', '.join(TOKENIZER_KINDS)}.")
+
+
+def resolve_tokenizer(tokenizer: Any) -> Any:
+    """The tokenizer behind a `TokenizerHandle`; any other object (or None) is returned as is."""
+    return tokenizer.get() if isinstance(tokenizer, TokenizerHandle) else tokenizer
+
+
+
+def _load_spacy(lang: str, model: Optional[str] = None):
+    import spacy
+
+    if model:
+        try:
+            # only the tokenizer is used by the chunkers
+            return spacy.load(model, disable=["parser", "ner", "tagger"])
+        except (OSError, ImportError) as e:
+            logger.warning("spaCy model %s not available for '%s' (%s); using spacy.blank", model, lang, e)
+    try:
+        return spacy.blank(lang)
+    except Exception:
+        logger.warning("spaCy has no language '%s'; using the multi-language tokenizer", lang)
+        return spacy.blank("xx")
+
+
+def _load_hf(name: str):
+    from transformers import AutoTokenizer
+
+    return AutoTokenizer.from_pretrained(name, use_fast=True)
+
+
+def _rss() -> Optional[int]:
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss
+
+
+def _load_tokenizer(handle: TokenizerHandle):
+    with _LOCK:
+        tok = _TOKENIZERS.get(handle.key)
+        if tok is not None:
+            return tok
+        logger.info("Loading %s tokenizer %s", handle.kind, handle)
+        rss, started = _rss(), time.perf_counter()
+        if handle.kind == "spacy":
+            tok = _load_spacy(handle.lang, handle.name)
+        elif handle.kind == "hf":
+            tok = _load_hf(handle.name)
+        else:
+            tok = WhitespaceTokenizer()
+        seconds = time.perf_counter() - started
+        after = _rss() if rss is not None else None
+        _TOKENIZER_STATS[handle.key] = {
+            "kind": handle.kind,
+            "name": handle.name,
+            "language": handle.lang,
+            "load_seconds": round(seconds, 3),
+            "rss_bytes": max(0, after - rss) if after is not None else None,
+        }
+        _TOKENIZERS[handle.key] = tok
+    return tok
+
+
+
+def get_tokenizer(kind: str = "spacy", name: Optional[str] = None, lang: Optional[str] = None):
+    """Shared tokenizer of `tokenizer_handle(kind, name, lang)` (loaded on first use)."""
+    return tokenizer_handle(kind, name, lang).get()
+
+
+def get_spacy_tokenizer(lang: str = settings.DEFAULT_CHUNKER_LANGUAGE):
+    """Shared tokenizer-only spaCy pipeline for `lang` (loaded on first use)."""
+    return get_tokenizer("spacy", lang=lang)
+
+
+def get_hf_tokenizer(name: str):
+    """Shared HuggingFace fast tokenizer of model `name` (loaded on first use)."""
+    return get_tokenizer("hf", name)
+
+
+
+def preload_tokenizers(handles: Iterable[TokenizerHandle]) -> List[TokenizerHandle]:
+    """Load `handles` now (e.g. at start-up, before the first request); returns the ones that failed to load."""
+    failed = []
+    for handle in handles:
+        try:
+            handle.get()
+        except Exception as e:
+            logger.warning("Failed to preload %s tokenizer %s: %s", handle.kind, handle, e)
+            failed.append(handle)
+    return failed
+
+
+def tokenizer_memory_report() -> Dict[str, Dict[str, Any]]:
+    """
+    Every tokenizer loaded in this process, keyed by `str(handle)`: kind, name, language, load_seconds and
+    rss_bytes (process RSS growth while it loaded; None without psutil).
+    """
+    with _LOCK:
+        return {str(TokenizerHandle(*key)): dict(stats) for key, stats in _TOKENIZER_STATS.items()}
+
+
+
+def get_token_chunker(lang: str = settings.DEFAULT_CHUNKER_LANGUAGE, chunk_size: int = settings.DEFAULT_TOKEN_CHUNK_SIZE,
+                      stride: int = 0) -> "TokenChunker":
+    """Shared `TokenChunker` over the spaCy tokenizer of `lang` (held as a handle: cheap to ship to worker processes)."""
+    from .chunkers import TokenChunker
+
+    handle = tokenizer_handle("spacy", lang=lang)
+    key = (handle.lang, int(chunk_size), int(stride))
+    chunker = _TOKEN_CHUNKERS.get(key)
+    if chunker is None:
+        with _LOCK:
+            chunker = _TOKEN_CHUNKERS.setdefault(key, TokenChunker(tokenizer=handle, chunk_size=chunk_size, stride=stride))
+    return chunker
+
+
+
+def _load_embedding_provider(provider: str, model_name: str):
+    if provider == "sentence_transformers":
+        from src.indexing.embeddings import SentenceTransformersProvider
+        return SentenceTransformersProvider(model_name)
+    elif provider == "cohere":
+        from src.indexing.embeddings import CohereAIEmbeddingProvider
+        return CohereAIEmbeddingProvider(model_name)
+    elif provider == "openai":
+        from src.indexing.embeddings import OpenAIEmbeddingProvider
+        return OpenAIEmbeddingProvider(model=model_name)
+    raise ValueError(f"Unknown embedding provider: {provider}. Supported: sentence_transformers, cohere, openai.")
+
+
+def get_embedding_provider(provider: str, model_name: str):
+    """Shared `src.indexing.embeddings` provider for (provider, model) (loaded on first use)."""
+    key = (provider, model_name)
+    prov = _EMBEDDING_PROVIDERS.get(key)
+    if prov is None:
+        with _LOCK:
+            prov = _EMBEDDING_PROVIDERS.get(key)
+            if prov is None:
+                logger.info("Loading embedding model %s (%s)", model_name, provider)
+                prov = _load_embedding_provider(provider, model_name)
+                _EMBEDDING_PROVIDERS[key] = prov
+    return prov
+
+
+
+def warm(langs: Iterable[str], chunk_size: int = settings.DEFAULT_TOKEN_CHUNK_SIZE, stride: int = 0) -> None:
+    """Load the tokenizers/chunkers of `langs` ahead of the first request."""
+    for lang in langs:
+        get_token_chunker(lang, chunk_size=chunk_size, stride=stride)
+        tokenizer_handle("spacy", lang=lang).get()
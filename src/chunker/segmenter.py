@@ -0,0 +1,212 @@
+"""
+Multilingual sentence segmenter shared by the XRAG+ chunkers and the summarizer.
+
+One compiled regex per (language, mode) finds candidate boundaries in a single scan: a run of sentence-final
+punctuation (`. ! ? …`, the Devanagari danda `।` / `॥` for Hindi, `。！？`) followed by optional closing
+quotes/brackets and whitespace, or a line / paragraph break. Each candidate is then checked against the
+language's rules in O(1) — the sentence must not continue in lowercase, and a single period must not end an
+abbreviation (`Dr.`, `z.B.`, `Sra.`, `т.е.`, `डॉ.`), an initial (`J. Smith`) or, in German, an ordinal (`3. Oktober`)
+— before it becomes a boundary. A line break (`line_breaks=True`) or a paragraph break always ends a sentence.
+
+Sentences are returned as (start, end) offsets into the text, whitespace-stripped (`text[s:e]` is the sentence):
+nothing is copied, so chunkers cut slices or `ChunkView`s from the spans.
+
+Rules exist for en, de, es, ru and hi; other languages (or none) use the default rules, English abbreviations with
+every terminator. Language codes are normalized (`"en-US"`, `"EN"` -> `"en"`).
+
+Caveats
+-------
+- Dotted abbreviations (`U.S.`, `e.g.`) never end a sentence, even at the end of one.
+- A sentence starting with a lowercase letter is merged with the previous one (e.g. lowercase-only text).
+"""
+from __future__ import annotations
+
+import functools
+import re
+from dataclasses import dataclass
+from typing import FrozenSet, List, Optional, Sequence, Tuple, Union
+
+
+SEGMENTER_VERSION = 1       # bump when the rules change: indexes built with other boundaries re-chunk their documents
+
+_TERMINATORS = ".!?…。！？"
+_DANDA = "।॥"
+_CLOSERS = "\"'”’»)\\]"
+_OPENERS = "\"'“‘«([¿¡"
+
+
+@dataclass(frozen=True)
+class SegmentationRules:
+    """Sentence-boundary rules of one language."""
+    lang: str
+    terminators: str = _TERMINATORS
+    abbreviations: FrozenSet[str] = frozenset()     # lowercase, without the final period
+    sentence_final: FrozenSet[str] = frozenset()    # dotted abbreviations that usually end a sentence ("т.д.")
+    ordinals: bool = False                          # "3." (one or two digits) is an ordinal, not a sentence end
+
+
+_EN_ABBREVIATIONS = frozenset(
+    "mr mrs ms dr prof sr jr st mt vs approx dept est fig figs vol vols ch pp inc ltd co corp gen gov lt col sgt capt"
+    .split()
+)
+
+RULES = {
+    "en": SegmentationRules("en", abbreviations=_EN_ABBREVIATIONS),
+    "de": SegmentationRules(
+        "de",
+        abbreviations=frozenset("dr prof hr fr nr str bzw ca vgl evtl ggf inkl abs abb bd hrsg jh mio mrd st".split()),
+        ordinals=True,
+    ),
+    "es": SegmentationRules(
+        "es",
+        abbreviations=frozenset("sr sra srta dr dra ud uds lic ing prof av avda pág núm aprox gral dña d".split()),
+    ),
+    "ru": SegmentationRules(
+        "ru",
+        abbreviations=frozenset("г гг др им см ул стр рис проф акад тыс млн млрд руб коп ок".split()),
+        sentence_final=frozenset(("т.д", "т.п")),
+    ),
+    "hi": SegmentationRules(
+        "hi", terminators=_TERMINATORS + _DANDA,
+        abbreviations=frozenset("डॉ प्रो श्री श्रीमती सं पृ".split()) | frozenset(("dr", "mr", "mrs", "prof")),
+    ),
+    "default": SegmentationRules("default", terminators=_TERMINATORS + _DANDA, abbreviations=_EN_ABBREVIATIONS),
+}
+
+
+def rules_lang(lang: Optional[str]) -> str:
+    """Key of the rules used for a language code (`"default"` for unknown or missing languages)."""
+    if not lang:
+        return "default"
+    code = str(lang).strip().lower().replace("_", "-").split("-")[0]
+    return code if code in RULES else "default"
+
+
+
+class SentenceSegmenter:
+    """
+    Sentence segmenter of one language (see the module docstring).
+
+    Parameters
+    ----------
+    lang : optional
+        Language code; unknown codes use the default rules.
+    line_breaks : bool
+        True: every newline ends a sentence (SentenceChunker and its subclasses). False: only paragraph breaks
+        (a blank line) do, single newlines inside a paragraph are whitespace (context-aware chunking, summarizer).
+
+    Use `get_segmenter()` for the shared, already compiled instances.
+    """
+    def __init__(self, lang: Optional[str] = None, line_breaks: bool = False):
+        self.rules = RULES[rules_lang(lang)]
+        self.line_breaks = bool(line_breaks)
+        term = re.escape(self.rules.terminators)
+        # the leading class lets re skip ahead to candidate characters; group 1 = separator after punctuation
+        brk = r"(?<=\n)\s*" if self.line_breaks else r"(?<=\n)[^\S\n]*\n\s*"
+        self.pattern = re.compile(rf"[{term}\n](?:(?<=[{term}])[{term}]*[{_CLOSERS}]*(\s+)|{brk})")
+        self._min_newlines = 1 if self.line_breaks else 2
+
+    @property
+    def lang(self) -> str:
+        return self.rules.lang
+
+    def __repr__(self) -> str:
+        return f"SentenceSegmenter(lang={self.lang!r}, line_breaks={self.line_breaks})"
+
+    def _is_abbreviation(self, text: str, dot: int) -> bool:
+        """True if the word ending at the period `text[dot]` is an abbreviation, an initial or a (German) ordinal."""
+        lo = dot - 24 if dot > 24 else 0
+        ws = max(text.rfind(" ", lo, dot), text.rfind("\n", lo, dot), text.rfind("\t", lo, dot))
+        if ws < 0 < lo:                 # longer than any abbreviation
+            return False
+        word = text[ws + 1:dot].lstrip(_OPENERS)
+        if not word:
+            return False
+        rules = self.rules
+        if len(word) == 1:              # initial ("J. Smith"), a one-letter abbreviation ("г.") or a digit
+            return word.isupper() or word in rules.abbreviations or (rules.ordinals and word.isdigit())
+        word = word.lower()
+        if word in rules.abbreviations:
+            return True
+        if "." in word:
+            return word not in rules.sentence_final and all(0 < len(p) <= 3 and p.isalpha() for p in word.split("."))
+        return rules.ordinals and len(word) == 2 and word.isdigit()
+
+    def spans(self, text: str) -> List[Tuple[int, int]]:
+        """(start, end) offsets of the sentences of `text`, whitespace-stripped and non-empty."""
+        spans: List[Tuple[int, int]] = []
+        if not text:
+            return spans
+        n = len(text)
+        start = 0
+        for m in self.pattern.finditer(text):
+            sep_start, sep_end = m.span(1)
+            if sep_start < 0:           # line / paragraph break
+                sep_start, sep_end = m.span()
+            elif (sep_end < n and text[sep_end].islower()
+                  or text[m.start()] == "." and m.start(1) == m.start() + 1 and self._is_abbreviation(text, m.start())):
+                if text.count("\n", sep_start, sep_end) < self._min_newlines:
+                    continue
+            end = sep_start
+            if start < end and (text[start].isspace() or text[end - 1].isspace()):
+                part = text[start:end]
+                stripped = part.strip()
+                if stripped:
+                    start += len(part) - len(part.lstrip())
+                    end = start + len(stripped)
+                else:
+                    end = start
+            if start < end:
+                spans.append((start, end))
+            start = sep_end
+        if start < n:
+            part = text[start:]
+            stripped = part.strip()
+            if stripped:
+                start += len(part) - len(part.lstrip())
+                spans.append((start, start + len(stripped)))
+        return spans
+
+    def spans_many(self, texts: Sequence[str]) -> List[List[Tuple[int, int]]]:
+        """`spans()` of every text, in input order."""
+        return [self.spans(t) for t in texts]
+
+    def sentences(self, text: str) -> List[str]:
+        """The sentence strings of `text` (copies; prefer `spans()` in chunkers)."""
+        return [text[s:e] for s, e in self.spans(text)]
+
+
+
+@functools.lru_cache(maxsize=None)
+def _segmenter(lang: str, line_breaks: bool) -> SentenceSegmenter:
+    return SentenceSegmenter(lang, line_breaks)
+
+
+def get_segmenter(lang: Optional[str] = None, line_breaks: bool = False) -> SentenceSegmenter:
+    """Process-wide compiled segmenter for a language code and mode."""
+    return _segmenter(rules_lang(lang), bool(line_breaks))
+
+
+def sentence_spans(text: str, lang: Optional[str] = None, line_breaks: bool = False) -> List[Tuple[int, int]]:
+    """Sentence (start, end) offsets of `text` with the rules of `lang`."""
+    return get_segmenter(lang, line_breaks).spans(text)
+
+
+def sentence_spans_many(texts: Sequence[str], langs: Union[None, str, Sequence[Optional[str]]] = None,
+                        line_breaks: bool = False) -> List[List[Tuple[int, int]]]:
+    """
+    Batch `sentence_spans`: `langs` is one language for all texts or one per text. Texts are segmented per
+    language with a single compiled segmenter each.
+    """
+    texts = list(texts)
+    if langs is None or isinstance(langs, str):
+        return get_segmenter(langs, line_breaks).spans_many(texts)
+    langs = list(langs)
+    if len(langs) != len(texts):
+        raise ValueError(f"Got {len(langs)} languages for {len(texts)} texts")
+    return [get_segmenter(lang, line_breaks).spans(t) for t, lang in zip(texts, langs)]
+
+
+def split_sentences(text: str, lang: Optional[str] = None, line_breaks: bool = False) -> List[str]:
+    """Sentence strings of `text` with the rules of `lang`."""
+    return get_segmenter(lang, line_breaks).sentences(text)
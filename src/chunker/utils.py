@@ -2,7 +2,8 @@ from __future__ import annotations
 
 
 import re
-from typing import List, Tuple, Dict, Any
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 
 
@@ -44,6 +45,31 @@ def char_spans_for_whitespace_tokens(text: str, tokens: List[str]) -> List[Tuple
 
 
 
+def split_spans(text: str, pattern: "re.Pattern") -> List[Tuple[int, int]]:
+    """Character spans of the non-empty, whitespace-stripped parts of `pattern.split(text)`.
+
+    Same parts as `[p.strip() for p in re.split(pattern, text) if p and p.strip()]` (for a pattern without
+    groups), but as exact offsets taken from the match positions: `text[s:e]` is the stripped part.
+    If a match has a matched group, the last one is the separator instead of the whole match, so a pattern
+    may consume context that stays in the parts (e.g. sentence-final punctuation for a faster scan).
+    """
+    bounds = [m.span(m.lastindex or 0) for m in pattern.finditer(text)]
+    spans: List[Tuple[int, int]] = []
+    for start, end in zip([0] + [e for _, e in bounds], [s for s, _ in bounds] + [len(text)]):
+        if start >= end:
+            continue
+        if text[start].isspace() or text[end - 1].isspace():
+            part = text[start:end]
+            stripped = part.strip()
+            if not stripped:
+                continue
+            start += len(part) - len(part.lstrip())
+            end = start + len(stripped)
+        spans.append((start, end))
+    return spans
+
+
+
 _WHITESPACE_TOKEN_RE = re.compile(r"\S+")
 
 def whitespace_tokens(text: str) -> List[str]:
@@ -51,6 +77,46 @@ def whitespace_tokens(text: str) -> List[str]:
 
 
 
+class TokenSpans:
+    """
+    Token -> char spans as two parallel `array('q')` (start, end offsets): ~16 bytes per token instead of
+    a tuple plus two ints (~120 bytes). Indexes and iterates like a list of (start, end) tuples.
+    """
+    __slots__ = ("starts", "ends")
+
+    def __init__(self, starts: Optional[array] = None, ends: Optional[array] = None):
+        self.starts = starts if starts is not None else array("q")
+        self.ends = ends if ends is not None else array("q")
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return TokenSpans(self.starts[i], self.ends[i])
+        return self.starts[i], self.ends[i]
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        return zip(self.starts, self.ends)
+
+    def tokens(self, text: str) -> List[str]:
+        """Token strings of `text` (materialized only on request)."""
+        return [text[s:e] for s, e in zip(self.starts, self.ends)]
+
+
+def whitespace_token_spans(text: str) -> TokenSpans:
+    """Whitespace tokenization in a single `finditer` pass: the spans of the `whitespace_tokens(text)` tokens
+    (same as `char_spans_for_whitespace_tokens(text, whitespace_tokens(text))`, without the second scan)."""
+    spans = TokenSpans()
+    starts_append, ends_append = spans.starts.append, spans.ends.append
+    for m in _WHITESPACE_TOKEN_RE.finditer(text):
+        start, end = m.span()
+        starts_append(start)
+        ends_append(end)
+    return spans
+
+
+
 def print_chunks(title: str, chunks: List[Tuple[str, Dict[str, Any]]]):
     """Pretty Print Chunks"""
     print(f"\n\n\n=== {title} ===")
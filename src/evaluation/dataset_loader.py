@@ -21,9 +21,9 @@ Unified output example:
 """
 
 
-from typing import List, Dict, Any, Optional
-import os, warnings
-from src.evaluation.utils import _read_json, _read_jsonl
+from typing import List, Dict, Any, Iterator, Optional
+import itertools, os, warnings
+from src.evaluation.utils import _iter_json, _iter_jsonl
 
 
 
@@ -35,7 +35,7 @@ class DatasetLoader:
       dataset_name  : one of `['mlqa', 'mkqa', 'tydiqa', 'xquad', 'ccnews', 'wiki']`
       file_path     : path to the dataset file or directory. If directory, loader will try to find language-specific files.
       lang          : optional language code filter `(e.g., 'en','hi','de','es','ru')`. For MKQA, selects the language variant.
-      max_examples  : optional cap for memory-limited quick tests.
+      max_examples  : optional cap for memory-limited quick tests (`iter_examples()` stops reading once reached).
     """
 
     def __init__(self, dataset_name: str, file_path: str, lang: Optional[str] = None, max_examples: Optional[int] = None):
@@ -51,25 +51,40 @@ class DatasetLoader:
         ....
 
         Load and normalize into list of examples (canonical schema).
+        Materializes `iter_examples()`; prefer the generator for large datasets.
+        """
+        return list(self.iter_examples())
+
+
+    def iter_examples(self) -> Iterator[Dict[str, Any]]:
+        """
+        Streaming entry point: yield normalized examples (canonical schema) as they are parsed.
+
+        Files are read one at a time (JSONL line by line) and iteration stops after `max_examples`,
+        so memory stays bounded by the current file instead of the whole dataset.
         """
         if self.dataset_name == "mlqa":
-            return self._load_mlqa(self.file_path, lang=self.lang)
+            examples = self._iter_mlqa(self.file_path, lang=self.lang)
         elif self.dataset_name == "mkqa":
-            return self._load_mkqa_jsonl(self.file_path, lang=self.lang)
+            examples = self._iter_mkqa_jsonl(self.file_path, lang=self.lang)
         elif self.dataset_name == "tydiqa":
-            return self._load_tydiqa(self.file_path, lang=self.lang)
+            examples = self._iter_tydiqa(self.file_path, lang=self.lang)
         elif self.dataset_name == "xquad" or self.dataset_name == "squad":
-            return self._load_squad(self.file_path, lang=self.lang)
+            examples = self._iter_squad(self.file_path, lang=self.lang)
 
         elif self.dataset_name in ("ccnews", "wiki", "corpus"):
-            return self._load_corpus(self.file_path, max_examples=self.max_examples, lang=self.lang)
+            examples = self._iter_corpus(self.file_path, lang=self.lang)
+        else:
+            raise ValueError(f"Unknown dataset: {self.dataset_name}. Supported: mlqa, mkqa, tydiqa, xquad, squad, ccnews, wiki.")
+
+        return itertools.islice(examples, self.max_examples) if self.max_examples else examples
 
 
     # ---------------------------
     # Format-specific loaders
     # ---------------------------
 
-    def _load_mlqa(self, path: str, lang: Optional[str] = "en") -> List[Dict[str, Any]]:
+    def _iter_mlqa(self, path: str, lang: Optional[str] = "en") -> Iterator[Dict[str, Any]]:
         """
         Load MLQA-style JSON.
         ...
@@ -97,16 +112,15 @@ class DatasetLoader:
           ]
         }
         """
-        file_data = _read_json(path + '/test', max_examples=self.max_examples)
-        examples: List[Dict[str, Any]] = []
+        n = 0
         # Some MLQA dumps include 'language' at top-level or file naming encodes language. Try to detect.
         detected_lang = lang
-        for article in file_data:
+        for article in _iter_json(path + '/test'):
             title = article.get("title", "")
             for paragraph in article.get("paragraphs", []):
                 context = paragraph.get("context", "")
                 for qa in paragraph.get("qas", []):
-                    qid = qa.get("id") or qa.get("qid") or f"{title}_{len(examples)}"
+                    qid = qa.get("id") or qa.get("qid") or f"{title}_{n}"
                     question_text = qa.get("question") or qa.get("query") or ""
                     answers = []
                     for a in qa.get("answers", []):
@@ -114,7 +128,8 @@ class DatasetLoader:
                         if txt:
                             answers.append(txt)
                     # Some MLQA golds have 'answers' absent -> unanswerable
-                    examples.append({
+                    n += 1
+                    yield {
                         "id": str(qid),
                         "title": title,
                         "question": question_text,
@@ -122,14 +137,10 @@ class DatasetLoader:
                         "context": context,
                         "lang": detected_lang,
                         "relevant_doc_ids": qa.get("relevant_doc_ids", []) or []
-                    })
-                    if self.max_examples and len(examples) >= self.max_examples:
-                        return examples
-        # print(examples[-1])
-        return examples
+                    }
 
 
-    def _load_mkqa_jsonl(self, path: str, lang: str = None) -> List[Dict[str, Any]]:
+    def _iter_mkqa_jsonl(self, path: str, lang: str = None) -> Iterator[Dict[str, Any]]:
         """
         MKQA is distributed as JSONL where each line is an example:
         {
@@ -141,10 +152,8 @@ class DatasetLoader:
         Creates one normalized example for the requested language (self.lang) if provided,
         else default to 'en' fallback.
         """
-        examples: List[Dict[str, Any]] = []
-        items = _read_jsonl(path + "/ext")
         requested_lang = lang or "en"
-        for it in items:
+        for n, it in enumerate(_iter_jsonl(path + "/ext")):
             ex_id = it.get("example_id") or it.get("id") or None
             # prefer queries[field] if available
             q_map = it.get("queries") or {}
@@ -167,19 +176,16 @@ class DatasetLoader:
                     for ent in it.get("answers", []):
                         if isinstance(ent, dict) and "text" in ent:
                             answers_list.append(ent["text"])
-            examples.append({
-                "id": str(ex_id) if ex_id is not None else f"mkqa_{len(examples)}",
+            yield {
+                "id": str(ex_id) if ex_id is not None else f"mkqa_{n}",
                 "question": question,
                 "answers": answers_list,
                 "context": "",   # MKQA typically doesn't include a context passage
                 "lang": requested_lang
-            })
-            if self.max_examples and len(examples) >= self.max_examples:
-                break
-        return examples
+            }
 
 
-    def _load_tydiqa(self, path: str, lang: Optional[str] = None) -> List[Dict[str, Any]]:
+    def _iter_tydiqa(self, path: str, lang: Optional[str] = None) -> Iterator[Dict[str, Any]]:
         """
         TyDiQA loader.
 
@@ -205,10 +211,7 @@ class DatasetLoader:
         }
         data -> paragraphs -> qas.
         """
-        article_list = _read_jsonl(path)
-        examples: List[Dict[str, Any]] = []
-
-        for idx, art in enumerate(article_list):
+        for idx, art in enumerate(_iter_jsonl(path)):
             context = art.get("document_plaintext", "")
             question = art.get("question_text", "")
             qid = f"tydi_{idx}"
@@ -250,22 +253,17 @@ class DatasetLoader:
 
             detected_lang = (lang or art.get("language") or self._infer_lang_from_path(path))
 
-            examples.append({
+            yield {
                 "id": qid,
                 "question": question,
                 "answers": answers,
                 "context": context,
                 "lang": detected_lang,
                 "relevant_doc_ids": []
-            })
-
-            if self.max_examples and len(examples) >= self.max_examples:
-                break
-
-        return examples
+            }
 
 
-    def _load_squad(self, path: str, lang: Optional[str] = None) -> List[Dict[str, Any]]:
+    def _iter_squad(self, path: str, lang: Optional[str] = None) -> Iterator[Dict[str, Any]]:
         """
         Load SQuAD-like JSON (used by XQuAD).
         {
@@ -280,20 +278,14 @@ class DatasetLoader:
             } ]
         }
         """
-        data_list = _read_json(path, max_examples=self.max_examples)
-        # from pprint import pprint
-        # # pprint(data_list[0]['paragraphs'], width=150, depth=10)
-        # pprint(data_list[0], width=150, depth=10)
-        # print(type(data_list), len(data_list[0]["paragraphs"]))
-        # exit()
-        examples: List[Dict[str, Any]] = []
+        n = 0
         detected_lang = lang or self._infer_lang_from_path(path)
-        for article in data_list:
+        for article in _iter_json(path):
             title = article.get("title", "")
             for para in article.get("paragraphs", []):
                 context = para.get("context", "")
                 for qa in para.get("qas", []):
-                    qid = qa.get("id") or qa.get("qid") or f"s(x)quad_{len(examples)}"
+                    qid = qa.get("id") or qa.get("qid") or f"s(x)quad_{n}"
                     question_text = qa.get("question") or ""
                     answers = []
                     for a in qa.get("answers", []):
@@ -301,7 +293,8 @@ class DatasetLoader:
                             answers.append(a["text"])
                         elif isinstance(a, str):
                             answers.append(a)
-                    examples.append({
+                    n += 1
+                    yield {
                         "id": str(qid),
                         "title": title,
                         "question": question_text,
@@ -309,40 +302,26 @@ class DatasetLoader:
                         "context": context,
                         "lang": detected_lang,
                         "relevant_doc_ids": []
-                    })
-                    if self.max_examples and len(examples) >= self.max_examples:
-                        return examples
-        return examples
+                    }
 
 
-    def _load_corpus(self, path: str, max_examples: Optional[int] = None, lang: Optional[str] = None) -> List[Dict[str, Any]]:
+    def _iter_corpus(self, path: str, lang: Optional[str] = None) -> Iterator[Dict[str, Any]]:
         """
-        Load corpus (wiki/ccnews) as documents (no QA). Returns entries with empty 'question' and 'answers'.
-        If 'path' is a directory, load all files inside.
+        Load corpus (wiki/ccnews) as documents (no QA). Yields entries with empty 'question' and 'answers'.
+        If 'path' is a directory, all files inside are read one after another.
         """
-        docs = []
-        if os.path.isdir(path):
-            docs = _read_json(path, max_examples)
-            examples = []
-            for i in range(len(docs)):  # article in docs:
-                article = docs[i]
-                examples.append({
-                    "id": article["id"] if article.get("id") is not None else article.get("_global_idx", ""),
-                    'publish_date': article.get("date_publish", ""),
-                    "title": article.get("title", ""),
-                    "text": article.get("text", ""),
-                    "lang": lang or self.lang,
-                    "url": article.get("url", ""),
-                })
-
-                if len(examples) >= max_examples:
-                    return examples
-
-        else:
+        if not os.path.exists(path):
             warnings.warn(f"Corpus path {path} does not exist.")
-        if max_examples:
-            return examples[:max_examples]
-        return examples
+            return
+        for article in _iter_json(path):
+            yield {
+                "id": article["id"] if article.get("id") is not None else article.get("_global_idx", ""),
+                'publish_date': article.get("date_publish", ""),
+                "title": article.get("title", ""),
+                "text": article.get("text", ""),
+                "lang": lang or self.lang,
+                "url": article.get("url", ""),
+            }
 
 
     # ---------------------------
@@ -1,10 +1,10 @@
 # src/evaluation/utils.py
-import time, json, warnings, os
+import time, json, warnings, os, itertools
 import psutil
 import functools
 from statistics import median
 import numpy as np
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from src.evaluation.config import DATA_DIR
 
@@ -100,112 +100,104 @@ def load_documents(lang: str) -> List[Dict]:
 # JSON Readers
 # -------------------------------------------------
 
-def _read_json(path: str, max_examples: int = None) -> List[Dict]:
+def _iter_json(path: str) -> Iterator[Dict]:
     """
-    Read JSON file or all JSON files inside a directory.
+    Lazily yield examples from a JSON file or from all JSON files inside a directory (sorted by name).
 
     Behaviour:
-      - If `path` is a directory, iterate all .json files inside and aggregate results.
-      - If a file contains a list -> extend results with that list.
-      - If a file contains a dict and has 'data' or 'documents' keys -> extend with that list.
-      - If a file contains a dict with other keys -> append the dict as a single example.
-      - If json.load fails (file appears to be JSONL inside a .json) -> fallback to line-wise parsing.
-    Returns a list of dict-like examples.
+      - If `path` is a directory, iterate all .json files inside, one file at a time.
+      - If a file contains a list -> yield its items (non-dict items are wrapped as {"value": item}).
+      - If a file contains a dict and has 'data' or 'documents' keys -> yield items of that list.
+      - If a file contains a dict with other keys -> yield the dict as a single example.
+      - If json.load fails (file appears to be JSONL inside a .json) -> fallback to line-wise parsing (streamed).
     """
     path = os.path.normpath(path)
-    results: List[Dict] = []
 
-    # Directory case: load *all* .json files in the directory
+    # Directory case: iterate the .json files in the directory
     if os.path.isdir(path):
         files = sorted([f for f in os.listdir(path) if f.endswith(".json")])
         if not files:
             raise RuntimeError(f"No JSON files found in directory: {path}")
         for file_name in files:
-            file_path = os.path.join(path, file_name)
-            results.extend(_read_json(file_path, max_examples))
-
-            if len(results) >= max_examples:
-                return results[:max_examples]
-
-        return results
+            yield from _iter_json(os.path.join(path, file_name))
+        return
 
     # File case
     try:
-        with open(path, "r", encoding="utf-8") as fh:
-            try:
-                obj = json.load(fh)
-            except json.JSONDecodeError:
-                # Fallback: maybe file is JSONL with .json extension
-                fh.seek(0)
-                items = []
-                for line in fh:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        items.append(json.loads(line))
-                    except Exception:
-                        warnings.warn(f"Skipping bad JSON line in {path}: {line[:80]}")
-
-                return items
-
+        fh = open(path, "r", encoding="utf-8")
     except Exception as e:
         raise RuntimeError(f"Failed to open/read JSON file {path}: {e}")
-
-    # Normalize loaded object to list of dicts
+    with fh:
+        try:
+            obj = json.load(fh)
+        except json.JSONDecodeError:
+            # Fallback: maybe file is JSONL with .json extension
+            fh.seek(0)
+            yield from _iter_json_lines(fh, path)
+            return
+
+    # Normalize loaded object to dicts
     if isinstance(obj, list):
-        # List of objects
+        # List of objects; wrap non-dict items into dict
         for it in obj:
-            if isinstance(it, dict):
-                results.append(it)
-            else:
-                # wrap non-dict items into dict
-                results.append({"value": it})
-        return results
-
-    if isinstance(obj, dict):
+            yield it if isinstance(it, dict) else {"value": it}
+    elif isinstance(obj, dict):
         # Common patterns: {"data": [...]} or {"documents": [...]} or SQuAD-style
         if "data" in obj and isinstance(obj["data"], list):
-            # e.g., SQuAD / xquad style
-            return obj["data"]
-        if "documents" in obj and isinstance(obj["documents"], list):
-            return obj["documents"]
-        # If it's a single dict representing one example, return as single item list
-        return [obj]
+            yield from obj["data"]      # e.g., SQuAD / xquad style
+        elif "documents" in obj and isinstance(obj["documents"], list):
+            yield from obj["documents"]
+        else:
+            yield obj       # a single dict representing one example
+    # otherwise, unknown type — nothing to yield
+
+
+
+def _read_json(path: str, max_examples: int = None) -> List[Dict]:
+    """
+    Read JSON file or all JSON files inside a directory (see `_iter_json`), stopping after `max_examples` items.
+    Returns a list of dict-like examples.
+    """
+    return list(itertools.islice(_iter_json(path), max_examples))
 
-    # otherwise, unknown type — return empty
-    return results
 
 
+def _iter_json_lines(fh, path: str) -> Iterator[Dict]:
+    for line in fh:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except Exception:
+            warnings.warn(f"Skipping bad JSON line in {path}: {line[:80]}")
+
 
-def _read_jsonl(path: str) -> List[Dict]:
+
+def _iter_jsonl(path: str) -> Iterator[Dict]:
     """
-    Read JSONL data from file OR directory.
+    Lazily yield JSONL records from a file OR a directory (files sorted by name), one line at a time.
     Supports .jsonl and JSONL-style .json files.
     """
-    items = []
-
     # ---------- Directory case ----------
     if os.path.isdir(path):
-        for fname in os.listdir(path):
+        for fname in sorted(os.listdir(path)):
             if fname.endswith((".jsonl", ".json")):
-                fpath = os.path.join(path, fname)
-                items.extend(_read_jsonl(fpath))
-        return items
+                yield from _iter_jsonl(os.path.join(path, fname))
+        return
 
     # ---------- File case ----------
     with open(path, "r", encoding="utf-8") as fh:
-        for line in fh:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                items.append(json.loads(line))
-            except Exception:
-                warnings.warn(
-                    f"Skipping bad JSON line in {path}: {line[:80]}"
-                )
-        return items
+        yield from _iter_json_lines(fh, path)
+
+
+
+def _read_jsonl(path: str, max_examples: int = None) -> List[Dict]:
+    """
+    Read JSONL data from file OR directory, stopping after `max_examples` records.
+    Supports .jsonl and JSONL-style .json files.
+    """
+    return list(itertools.islice(_iter_jsonl(path), max_examples))
 
 
 # -------------------------------------------------
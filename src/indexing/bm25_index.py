@@ -0,0 +1,320 @@
+"""
+Persistent BM25 inverted index for XRAG+ keyword retrieval.
+
+`Retriever.retrieve_keyword` used to pull every document of a collection into Python and count
+substrings on each query. The indexer now maintains one inverted index per collection, next to
+its checksum store:
+
+    <CHROMA_PERSIST_DIRECTORY>/<INDEX_STATE_DIRNAME>/<collection_name>/bm25.sqlite3
+
+    terms     term -> term_id
+    docs      doc (int) -> chunk id, length (tokens), source, language
+    postings  (term_id, doc) -> tf, doc length      clustered by term: one range scan per query term
+
+A query only touches the postings of its own terms, so the cost grows with the matching postings,
+not with the size of the collection. `where` filters on `source` / `language` are answered by joining
+the postings with `docs`.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from collections import Counter
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+
+import numpy as np
+
+logger = logging.getLogger("xr.indexer")
+
+_TOKEN_RE = re.compile(r"\w+")
+FILTER_FIELDS = ("source", "language")      # metadata fields stored with each doc (usable in `where`)
+
+
+def bm25_tokenize(text: str) -> List[str]:
+    """Lowercased word tokens; used for both indexing and queries."""
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+
+def where_to_filters(where: Optional[Dict[str, Any]]) -> Optional[Dict[str, List[str]]]:
+    """
+    Translate a Chroma `where` clause into {field: allowed values} for the BM25 index.
+    Supports equality, `$eq`, `$in` and `$and` on `source` / `language`.
+    Returns None when the clause uses anything else (the caller must fall back to a scan).
+    """
+    if not where:
+        return {}
+    filters: Dict[str, List[str]] = {}
+    clauses = where["$and"] if list(where.keys()) == ["$and"] else [{k: v} for k, v in where.items()]
+    for clause in clauses:
+        if not isinstance(clause, dict) or len(clause) != 1:
+            return None
+        (field_name, cond), = clause.items()
+        if field_name not in FILTER_FIELDS:
+            return None
+        if isinstance(cond, dict):
+            if list(cond.keys()) == ["$eq"]:
+                values = [cond["$eq"]]
+            elif list(cond.keys()) == ["$in"]:
+                values = list(cond["$in"])
+            else:
+                return None
+        else:
+            values = [cond]
+        values = [str(v) for v in values]
+        # several clauses on one field: intersect
+        filters[field_name] = [v for v in filters[field_name] if v in values] if field_name in filters else values
+    return filters
+
+
+
+class BM25Index:
+    """
+    SQLite-backed BM25 inverted index of a single Chroma collection.
+
+    - path: sqlite file to use. If None, the index lives in memory only (no persistence).
+    - `add_many` has upsert semantics: re-adding a chunk id replaces its previous postings.
+    - Safe to share between threads (a single lock guards the connection).
+    """
+    FILENAME = "bm25.sqlite3"
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        if path:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS terms (term TEXT PRIMARY KEY, term_id INTEGER NOT NULL UNIQUE) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS docs (doc INTEGER PRIMARY KEY, chunk_id TEXT NOT NULL UNIQUE,
+                                             length INTEGER NOT NULL, source TEXT, language TEXT);
+            CREATE TABLE IF NOT EXISTS postings (term_id INTEGER, doc INTEGER, tf INTEGER, dl INTEGER,
+                                                 PRIMARY KEY (term_id, doc)) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS postings_by_doc ON postings (doc);
+            CREATE TABLE IF NOT EXISTS index_meta (key TEXT PRIMARY KEY, value TEXT);
+        """)
+        self._conn.commit()
+
+
+    @classmethod
+    def for_collection(cls, state_dir: Optional[str]) -> "BM25Index":
+        """Open the index kept inside a collection's state directory (in-memory if `state_dir` is None)."""
+        return cls(os.path.join(state_dir, cls.FILENAME) if state_dir else None)
+
+    @classmethod
+    def exists_for_collection(cls, state_dir: Optional[str]) -> bool:
+        return bool(state_dir) and os.path.exists(os.path.join(state_dir, cls.FILENAME))
+
+
+    # -------------------------
+    # Metadata
+    # -------------------------
+    def _meta(self, key: str, default: str = "0") -> str:
+        row = self._conn.execute("SELECT value FROM index_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_meta(self, key: str, value) -> None:
+        self._conn.execute("INSERT OR REPLACE INTO index_meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return int(self._meta("n_docs"))
+
+    @property
+    def bootstrapped(self) -> bool:
+        """True once the index is known to mirror its collection (fresh collection or one-time scan done)."""
+        with self._lock:
+            return self._meta("bootstrapped") == "1"
+
+    def mark_bootstrapped(self) -> None:
+        with self._lock:
+            self._set_meta("bootstrapped", 1)
+            self._conn.commit()
+
+
+    # -------------------------
+    # Writes
+    # -------------------------
+    def _term_ids(self, terms: Iterable[str]) -> Dict[str, int]:
+        terms = list(terms)
+        ids: Dict[str, int] = {}
+        for i in range(0, len(terms), 500):     # stay below SQLite's bound-variable limit
+            part = terms[i:i + 500]
+            ids.update(self._conn.execute(
+                f"SELECT term, term_id FROM terms WHERE term IN ({','.join('?' * len(part))})", part))
+        missing = [t for t in terms if t not in ids]
+        if missing:
+            next_id = int(self._meta("next_term_id"))
+            new = {t: next_id + n for n, t in enumerate(missing)}
+            self._conn.executemany("INSERT INTO terms (term, term_id) VALUES (?, ?)", new.items())
+            self._set_meta("next_term_id", next_id + len(new))
+            ids.update(new)
+        return ids
+
+    def _remove_locked(self, chunk_ids: Sequence[str]) -> Tuple[int, int]:
+        removed, removed_len = 0, 0
+        for i in range(0, len(chunk_ids), 500):
+            part = list(chunk_ids[i:i + 500])
+            rows = self._conn.execute(
+                f"SELECT doc, length FROM docs WHERE chunk_id IN ({','.join('?' * len(part))})", part).fetchall()
+            if not rows:
+                continue
+            self._conn.executemany("DELETE FROM postings WHERE doc = ?", [(r[0],) for r in rows])
+            self._conn.executemany("DELETE FROM docs WHERE doc = ?", [(r[0],) for r in rows])
+            removed += len(rows)
+            removed_len += sum(r[1] for r in rows)
+        return removed, removed_len
+
+    def add_many(self, chunk_ids: Sequence[str], texts: Sequence[str],
+                 metadatas: Optional[Sequence[Dict[str, Any]]] = None) -> None:
+        """Index (or re-index) chunks. `metadatas` provide the `source` / `language` used by filters."""
+        if not chunk_ids:
+            return
+        # keep the last occurrence of a repeated id, like an upsert would
+        latest = {cid: i for i, cid in enumerate(chunk_ids)}
+        order = sorted(latest.values())
+        counts = [Counter(bm25_tokenize(texts[i])) for i in order]
+
+        with self._lock:
+            n_removed, len_removed = self._remove_locked([chunk_ids[i] for i in order])
+            term_ids = self._term_ids({t for c in counts for t in c})
+            next_doc = int(self._meta("next_doc"))
+            n_docs = int(self._meta("n_docs")) - n_removed
+            total_len = int(self._meta("total_len")) - len_removed
+
+            doc_rows, posting_rows = [], []
+            for n, (i, tf) in enumerate(zip(order, counts)):
+                doc = next_doc + n
+                length = sum(tf.values())
+                meta = (metadatas[i] if metadatas else None) or {}
+                doc_rows.append((doc, chunk_ids[i], length,
+                                 *(str(meta[f]) if meta.get(f) is not None else None for f in FILTER_FIELDS)))
+                posting_rows.extend((term_ids[t], doc, c, length) for t, c in tf.items())
+                total_len += length
+
+            self._conn.executemany("INSERT INTO docs (doc, chunk_id, length, source, language) VALUES (?, ?, ?, ?, ?)", doc_rows)
+            self._conn.executemany("INSERT INTO postings (term_id, doc, tf, dl) VALUES (?, ?, ?, ?)", posting_rows)
+            self._set_meta("next_doc", next_doc + len(order))
+            self._set_meta("n_docs", n_docs + len(order))
+            self._set_meta("total_len", total_len)
+            self._conn.commit()
+
+    def remove_many(self, chunk_ids: Sequence[str]) -> int:
+        """Drop chunks from the index. Returns the number of chunks removed."""
+        with self._lock:
+            n_removed, len_removed = self._remove_locked(list(chunk_ids))
+            if n_removed:
+                self._set_meta("n_docs", int(self._meta("n_docs")) - n_removed)
+                self._set_meta("total_len", int(self._meta("total_len")) - len_removed)
+                self._conn.commit()
+        return n_removed
+
+    def clear(self) -> None:
+        """Forget every chunk, e.g. after the collection was deleted/rebuilt."""
+        with self._lock:
+            for table in ("postings", "docs", "terms", "index_meta"):
+                self._conn.execute(f"DELETE FROM {table}")
+            self._conn.commit()
+
+
+    def bootstrap_from_collection(self, col, page_size: int = 2000) -> int:
+        """
+        One-time migration for collections indexed before the BM25 index existed:
+        page through the collection's documents and index them. Returns the number of chunks indexed.
+        """
+        loaded = 0
+        offset = 0
+        while True:
+            page = col.get(include=["documents", "metadatas"], limit=page_size, offset=offset)
+            ids = page.get("ids", []) if isinstance(page, dict) else []
+            if not ids:
+                break
+            self.add_many(ids, [d or "" for d in page.get("documents") or [""] * len(ids)], page.get("metadatas"))
+            loaded += len(ids)
+            if len(ids) < page_size:
+                break
+            offset += page_size
+        self.mark_bootstrapped()
+        return loaded
+
+
+    # -------------------------
+    # Queries
+    # -------------------------
+    def search(self, query: str, k: int = 5, filters: Optional[Dict[str, List[str]]] = None,
+               require_all_terms: bool = False, k1: float = 1.2, b: float = 0.75) -> List[Tuple[str, float]]:
+        """
+        Top-k (chunk_id, bm25 score) for `query`, best first.
+        - filters: {field: allowed values} on `source` / `language` (see `where_to_filters`)
+        - require_all_terms: only chunks containing every query term are returned
+        """
+        terms = list(dict.fromkeys(bm25_tokenize(query)))
+        if not terms or k <= 0:
+            return []
+
+        filter_sql, filter_args = "", []
+        for f, values in (filters or {}).items():
+            if f not in FILTER_FIELDS:
+                raise ValueError(f"Unsupported BM25 filter field: {f}. Supported: {', '.join(FILTER_FIELDS)}")
+            if not values:
+                return []
+            filter_sql += f" AND d.{f} IN ({','.join('?' * len(values))})"
+            filter_args.extend(values)
+
+        with self._lock:
+            n_docs = int(self._meta("n_docs"))
+            if n_docs == 0:
+                return []
+            avgdl = int(self._meta("total_len")) / n_docs
+            term_ids = dict(self._conn.execute(
+                f"SELECT term, term_id FROM terms WHERE term IN ({','.join('?' * len(terms))})", terms).fetchall())
+            if require_all_terms and len(term_ids) < len(terms):
+                return []
+
+            doc_parts, score_parts = [], []
+            for term in terms:
+                if term not in term_ids:
+                    continue
+                # df over the whole collection (independent of filters, like Lucene)
+                df = self._conn.execute("SELECT COUNT(*) FROM postings WHERE term_id = ?", (term_ids[term],)).fetchone()[0]
+                if filter_sql:
+                    rows = self._conn.execute(
+                        "SELECT p.doc, p.tf, p.dl FROM postings p JOIN docs d ON d.doc = p.doc "
+                        f"WHERE p.term_id = ?{filter_sql}", [term_ids[term], *filter_args]).fetchall()
+                else:
+                    rows = self._conn.execute("SELECT doc, tf, dl FROM postings WHERE term_id = ?", (term_ids[term],)).fetchall()
+                if not rows:
+                    if require_all_terms:
+                        return []
+                    continue
+                arr = np.array(rows, dtype=np.float64)
+                idf = math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+                tf, dl = arr[:, 1], arr[:, 2]
+                doc_parts.append(arr[:, 0].astype(np.int64))
+                score_parts.append(idf * tf * (k1 + 1.0) / (tf + k1 * (1.0 - b + b * dl / avgdl)))
+
+            if not doc_parts:
+                return []
+            docs, inverse = np.unique(np.concatenate(doc_parts), return_inverse=True)
+            scores = np.bincount(inverse, weights=np.concatenate(score_parts))
+            if require_all_terms:
+                matched = np.bincount(inverse, minlength=len(docs))
+                keep = matched == len(terms)
+                docs, scores = docs[keep], scores[keep]
+                if not len(docs):
+                    return []
+
+            top = np.argpartition(-scores, k - 1)[:k] if len(docs) > k else np.arange(len(docs))
+            top = top[np.argsort(-scores[top], kind="stable")]
+            doc_to_chunk = dict(self._conn.execute(
+                f"SELECT doc, chunk_id FROM docs WHERE doc IN ({','.join('?' * len(top))})",
+                [int(d) for d in docs[top]]).fetchall())
+        return [(doc_to_chunk[int(docs[i])], float(scores[i])) for i in top]
+
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
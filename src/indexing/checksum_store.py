@@ -0,0 +1,127 @@
+"""
+Persistent per-collection checksum store for XRAG+ indexing.
+
+`ChromaIndexer` deduplicates chunks by the sha1 checksum of their text. Instead of
+re-reading every metadata row of a collection on each `index_documents` call, the
+checksums are kept in a small SQLite file next to the Chroma persist directory:
+
+    <CHROMA_PERSIST_DIRECTORY>/<INDEX_STATE_DIRNAME>/<collection_name>/checksums.sqlite3
+
+The store is loaded once into an in-memory set, updated incrementally after every
+upserted batch and cleared when its collection is rebuilt or deleted.
+"""
+
+from typing import Iterable, Optional
+import os
+import sqlite3
+import threading
+import logging
+
+logger = logging.getLogger("xr.indexer")
+
+
+
+class ChecksumStore:
+    """
+    SQLite-backed set of chunk checksums for a single Chroma collection.
+
+    - path: sqlite file to use. If None, the store lives in memory only (no persistence).
+    - Membership checks hit the in-memory set; writes go to both the set and SQLite.
+    - Safe to share between threads (a single lock guards the connection).
+    """
+    FILENAME = "checksums.sqlite3"
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        if path:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS checksums (checksum TEXT PRIMARY KEY) WITHOUT ROWID")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._conn.commit()
+        self._checksums = {row[0] for row in self._conn.execute("SELECT checksum FROM checksums")}
+
+
+    @classmethod
+    def for_collection(cls, state_dir: Optional[str]) -> "ChecksumStore":
+        """Open the store kept inside a collection's state directory (in-memory if `state_dir` is None)."""
+        return cls(os.path.join(state_dir, cls.FILENAME) if state_dir else None)
+
+
+    def __contains__(self, checksum: str) -> bool:
+        return checksum in self._checksums
+
+    def __len__(self) -> int:
+        return len(self._checksums)
+
+
+    @property
+    def bootstrapped(self) -> bool:
+        """True once the store is known to mirror its collection (fresh collection or one-time scan done)."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM store_meta WHERE key = 'bootstrapped'").fetchone()
+        return bool(row and row[0] == "1")
+
+    def mark_bootstrapped(self) -> None:
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO store_meta (key, value) VALUES ('bootstrapped', '1')")
+            self._conn.commit()
+
+
+    def add_many(self, checksums: Iterable[str]) -> None:
+        new = [c for c in set(checksums) if c not in self._checksums]
+        if not new:
+            return
+        with self._lock:
+            self._conn.executemany("INSERT OR IGNORE INTO checksums (checksum) VALUES (?)", [(c,) for c in new])
+            self._conn.commit()
+            self._checksums.update(new)
+
+    def discard_many(self, checksums: Iterable[str]) -> None:
+        gone = [c for c in set(checksums) if c in self._checksums]
+        if not gone:
+            return
+        with self._lock:
+            self._conn.executemany("DELETE FROM checksums WHERE checksum = ?", [(c,) for c in gone])
+            self._conn.commit()
+            self._checksums.difference_update(gone)
+
+    def clear(self) -> None:
+        """Forget every checksum, e.g. after the collection was deleted/rebuilt."""
+        with self._lock:
+            self._conn.execute("DELETE FROM checksums")
+            self._conn.execute("DELETE FROM store_meta")
+            self._conn.commit()
+            self._checksums.clear()
+
+
+    def bootstrap_from_collection(self, col, page_size: int = 5000) -> int:
+        """
+        One-time migration for collections indexed before the store existed:
+        page through the collection's metadatas and record their checksums.
+        Returns the number of checksums loaded.
+        """
+        loaded = 0
+        offset = 0
+        while True:
+            page = col.get(include=["metadatas"], limit=page_size, offset=offset)
+            metadatas = page.get("metadatas", []) if isinstance(page, dict) else []
+            # Some clients return nested lists: normalize
+            if metadatas and isinstance(metadatas[0], list):
+                metadatas = metadatas[0]
+            if not metadatas:
+                break
+            checksums = [m["checksum"] for m in metadatas if isinstance(m, dict) and "checksum" in m]
+            self.add_many(checksums)
+            loaded += len(checksums)
+            if len(metadatas) < page_size:
+                break
+            offset += page_size
+        self.mark_bootstrapped()
+        return loaded
+
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -71,6 +71,14 @@ class Settings:
     # Max tokens per chunk (approx).
     CHUNK_MAX_CHARS: int = 300
     CHUNK_OVERLAP_SENTENCES: int = 1
+    # `index_documents` chunks CHUNK_BUFFER_DOCS docs at a time with `chunk_many` on CHUNK_WORKERS processes (0 = all cores)
+    # (one spawned pool per call: scripts that index large inputs need an `if __name__ == "__main__":` guard)
+    CHUNK_WORKERS: int = 0
+    CHUNK_BUFFER_DOCS: int = 256
+    CHUNK_STREAM_MIN_CHARS: int = 1_000_000     # larger docs are chunked lazily in-process, straight into embedding batches
+    # chunking_method="model_token_chunking": chunks packed up to the embedding model's max_seq_length in its own tokens
+    CHUNK_MODEL_MAX_TOKENS: int = 0             # cap on the model's max_seq_length (0 = use it as is)
+    CHUNK_FALLBACK_MAX_TOKENS: int = 256        # budget when the provider reports no max_seq_length
 
     # -------------------------
     # Indexing runtime parameters
@@ -84,14 +92,50 @@ class Settings:
     # Deduplication strategy - "checksum" : compute sha1 of chunk text and compare with collection metadata (simple)
     DEDUP_METHOD: str = "checksum"
 
-    # TODO: To implement caching inside the same Directory.
-    # # Enable a simple on-disk cache of embeddings keyed by checksum to avoid re-embedding identical chunks
-    # EMBEDDING_CACHE_ENABLED: bool = True
-    # EMBEDDING_CACHE_DIR: str = "./chromadb_persist/embedding_cache"
+    # Side-car state (checksum store, ...) is kept per collection under <CHROMA_PERSIST_DIRECTORY>/<INDEX_STATE_DIRNAME>/
+    INDEX_STATE_DIRNAME: str = "xrag_index_state"
+
+    # On-disk cache of embeddings keyed by chunk checksum, one namespace per (provider, model), to avoid
+    # re-embedding identical chunks across runs, chunking methods and persist directories (src/indexing/embedding_cache.py).
+    # Opt-in: the directory is shared by every indexer that enables it (writers serialize on its SQLite index)
+    EMBEDDING_CACHE_ENABLED: bool = False
+    EMBEDDING_CACHE_DIR: str = "./.embedding_cache"
+    EMBEDDING_CACHE_SHARD_ROWS: int = 65536     # vectors per memory-mapped shard file
+
+    # On-disk cache of chunker outputs keyed by (document text hash, chunker class + parameters), shared across
+    # embedding models, collection prefixes and persist directories: re-runs skip chunking (src/chunker/chunk_cache.py);
+    # documents of CHUNK_STREAM_MIN_CHARS or more are streamed and never cached.
+    # Opt-in, like the embedding cache: the directory is shared across runs and has to be asked for
+    CHUNK_CACHE_ENABLED: bool = False
+    CHUNK_CACHE_DIR: str = "./.chunk_cache"
 
     # # Upsert behavior: try add(), if fails fallback to upsert()
     # UPSERT_ON_CONFLICT: bool = True
 
+    # Maintain a BM25 inverted index per collection (in its state directory) for keyword retrieval
+    BM25_INDEX_ENABLED: bool = True
+
+    # Near-duplicate filter: skip chunks whose word 3-shingles have an estimated Jaccard similarity of NEAR_DUP_THRESHOLD
+    # or more with an indexed chunk of the same collection (MinHash LSH, src/indexing/near_dup.py); chunks under
+    # NEAR_DUP_MIN_TOKENS words are kept. NUM_PERM / BANDS must stay fixed for an existing index.
+    # Opt-in: skipped chunks are not stored at all, so only enable it where dropping near-identical text is wanted
+    NEAR_DUP_ENABLED: bool = False
+    NEAR_DUP_THRESHOLD: float = 0.7
+    NEAR_DUP_NUM_PERM: int = 64
+    NEAR_DUP_BANDS: int = 16                # 4 rows per band: ~99% of pairs at the threshold become candidates
+    NEAR_DUP_SHINGLE: int = 3
+    NEAR_DUP_MIN_TOKENS: int = 10
+
+    # Incremental re-indexing (src/indexing/doc_state.py): a content hash and the owned chunk ids of every document are
+    # kept per collection; unchanged documents are skipped, changed ones re-chunked paragraph by paragraph (only new
+    # chunks embedded) and their stale chunks deleted. Documents are keyed by 'doc_id' / id_field when they have one.
+    # Opt-in: it changes what a run writes (unchanged documents skipped, stale chunks deleted)
+    DOC_STATE_ENABLED: bool = False
+
+    # Pipelined indexing (src/indexing/pipeline.py, used by `index_wiki_ccnews --workers N` with N > 1)
+    PIPELINE_QUEUE_SIZE: int = 8            # max items waiting between two stages (backpressure)
+    PIPELINE_EMBED_BATCH_SIZE: int = 64     # chunks handed to the embedding provider per call
+
     # Verbosity / logging
     VERBOSE: bool = True
     LOG_LEVEL: str = "INFO"
@@ -108,12 +152,31 @@ class Settings:
             "LANG_EMBEDDING_MAP": self.LANG_EMBEDDING_MAP,
             "CHUNK_MAX_CHARS": self.CHUNK_MAX_CHARS,
             "CHUNK_OVERLAP_SENTENCES": self.CHUNK_OVERLAP_SENTENCES,
+            "CHUNK_WORKERS": self.CHUNK_WORKERS,
+            "CHUNK_BUFFER_DOCS": self.CHUNK_BUFFER_DOCS,
+            "CHUNK_STREAM_MIN_CHARS": self.CHUNK_STREAM_MIN_CHARS,
+            "CHUNK_MODEL_MAX_TOKENS": self.CHUNK_MODEL_MAX_TOKENS,
+            "CHUNK_FALLBACK_MAX_TOKENS": self.CHUNK_FALLBACK_MAX_TOKENS,
             "EMBEDDING_BATCH_SIZE": self.EMBEDDING_BATCH_SIZE,
             "DEDUP_ENABLED": self.DEDUP_ENABLED,
             "DEDUP_METHOD": self.DEDUP_METHOD,
-            # "EMBEDDING_CACHE_ENABLED": self.EMBEDDING_CACHE_ENABLED,
-            # "EMBEDDING_CACHE_DIR": self.EMBEDDING_CACHE_DIR,
+            "INDEX_STATE_DIRNAME": self.INDEX_STATE_DIRNAME,
+            "EMBEDDING_CACHE_ENABLED": self.EMBEDDING_CACHE_ENABLED,
+            "EMBEDDING_CACHE_DIR": self.EMBEDDING_CACHE_DIR,
+            "EMBEDDING_CACHE_SHARD_ROWS": self.EMBEDDING_CACHE_SHARD_ROWS,
+            "CHUNK_CACHE_ENABLED": self.CHUNK_CACHE_ENABLED,
+            "CHUNK_CACHE_DIR": self.CHUNK_CACHE_DIR,
             # "UPSERT_ON_CONFLICT": self.UPSERT_ON_CONFLICT,
+            "BM25_INDEX_ENABLED": self.BM25_INDEX_ENABLED,
+            "NEAR_DUP_ENABLED": self.NEAR_DUP_ENABLED,
+            "NEAR_DUP_THRESHOLD": self.NEAR_DUP_THRESHOLD,
+            "NEAR_DUP_NUM_PERM": self.NEAR_DUP_NUM_PERM,
+            "NEAR_DUP_BANDS": self.NEAR_DUP_BANDS,
+            "NEAR_DUP_SHINGLE": self.NEAR_DUP_SHINGLE,
+            "NEAR_DUP_MIN_TOKENS": self.NEAR_DUP_MIN_TOKENS,
+            "DOC_STATE_ENABLED": self.DOC_STATE_ENABLED,
+            "PIPELINE_QUEUE_SIZE": self.PIPELINE_QUEUE_SIZE,
+            "PIPELINE_EMBED_BATCH_SIZE": self.PIPELINE_EMBED_BATCH_SIZE,
             "VERBOSE": self.VERBOSE,
             "LOG_LEVEL": self.LOG_LEVEL,
             "REQUIRED_METADATA_FIELDS": self.REQUIRED_METADATA_FIELDS,
@@ -0,0 +1,256 @@
+"""
+Persistent per-document state for incremental XRAG+ indexing.
+
+Chunk checksums only avoid re-embedding chunks that come out byte-identical; a one-word edit near the top of
+an article shifts every following token window, and the chunks of the old version stay in the collection.
+`DocStateStore` remembers, per collection, a content hash of every indexed document and the chunk ids it owns:
+
+    <CHROMA_PERSIST_DIRECTORY>/<INDEX_STATE_DIRNAME>/<collection_name>/doc_state.sqlite3
+
+- unchanged document (same hash): skipped before chunking
+- changed document: re-chunked paragraph by paragraph (see `iter_paragraph_chunks`), chunks whose checksum it
+  already owns are kept (no re-embedding), only new chunks are embedded, and its stale chunk ids are deleted
+  from the collection and the side-car state once the new chunks are written
+- chunks skipped because another document already stored the same checksum (syndicated copies) are recorded as
+  references of the skipping document: a stale chunk whose checksum another document references is handed over
+  to that document instead of being deleted, and a checksum stays in the checksum store while it is referenced
+
+`DocUpdate` tracks one document through a run until its chunks are written (`ChromaIndexer.finish_doc_update`).
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+import os
+import sqlite3
+import threading
+import logging
+
+logger = logging.getLogger("xr.indexer")
+
+
+
+class DocStateStore:
+    """
+    SQLite-backed map document key -> (content hash, doc_id, {chunk_id: checksum}, referenced checksums) for a
+    single Chroma collection. A reference carries the chunk id once a chunk was handed over to the document.
+
+    - path: sqlite file to use. If None, the store lives in memory only (no persistence).
+    - `record` writes are uncommitted until `commit()` (called once the recorded documents' chunks are stored).
+    - Safe to share between threads (a single lock guards the connection).
+    """
+    FILENAME = "doc_state.sqlite3"
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        if path:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS documents (doc_key TEXT PRIMARY KEY, content_hash TEXT NOT NULL, doc_id TEXT) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS doc_chunks (doc_key TEXT, chunk_id TEXT, checksum TEXT,
+                                                   PRIMARY KEY (doc_key, chunk_id)) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS doc_refs (doc_key TEXT, checksum TEXT, chunk_id TEXT,
+                                                 PRIMARY KEY (doc_key, checksum)) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS doc_chunks_checksum ON doc_chunks (checksum);
+            CREATE INDEX IF NOT EXISTS doc_refs_checksum ON doc_refs (checksum);
+            CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value TEXT);
+        """)
+        self._conn.commit()
+
+
+    @classmethod
+    def for_collection(cls, state_dir: Optional[str]) -> "DocStateStore":
+        """Open the store kept inside a collection's state directory (in-memory if `state_dir` is None)."""
+        return cls(os.path.join(state_dir, cls.FILENAME) if state_dir else None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+
+    @property
+    def bootstrapped(self) -> bool:
+        """
+        True when every document of the collection went through the store (it was empty when the store was
+        created, or was rebuilt). Otherwise chunks of unknown documents may already exist under their ids.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM store_meta WHERE key = 'bootstrapped'").fetchone()
+        return bool(row and row[0] == "1")
+
+    def mark_bootstrapped(self) -> None:
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO store_meta (key, value) VALUES ('bootstrapped', '1')")
+            self._conn.commit()
+
+
+    def get(self, doc_key: str) -> Optional[str]:
+        """Content hash of a known document, None if it was never recorded."""
+        with self._lock:
+            row = self._conn.execute("SELECT content_hash FROM documents WHERE doc_key = ?", (doc_key,)).fetchone()
+        return row[0] if row else None
+
+    def chunks(self, doc_key: str) -> Dict[str, str]:
+        """Chunk ids (-> checksum) a document owns in the collection, including the ones handed over to it."""
+        with self._lock:
+            rows = self._conn.execute("SELECT chunk_id, checksum FROM doc_chunks WHERE doc_key = ?", (doc_key,)).fetchall()
+            rows += self._conn.execute("SELECT chunk_id, checksum FROM doc_refs WHERE doc_key = ? AND chunk_id IS NOT NULL",
+                                       (doc_key,)).fetchall()
+        return dict(rows)
+
+    def record(self, doc_key: str, content_hash: str, doc_id: Optional[str], chunks: Dict[str, str],
+               refs: Optional[Iterable[str]] = None) -> None:
+        """
+        Replace the state of one document (uncommitted). An empty `content_hash` makes it count as changed.
+        `refs`: checksums the document references without owning their chunk (None keeps the recorded ones);
+        references of checksums it now owns are dropped.
+        """
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO documents (doc_key, content_hash, doc_id) VALUES (?, ?, ?)",
+                               (doc_key, content_hash, doc_id))
+            self._conn.execute("DELETE FROM doc_chunks WHERE doc_key = ?", (doc_key,))
+            self._conn.executemany("INSERT OR REPLACE INTO doc_chunks (doc_key, chunk_id, checksum) VALUES (?, ?, ?)",
+                                   [(doc_key, chunk_id, checksum) for chunk_id, checksum in chunks.items()])
+            owned = set(chunks.values())
+            keep = None if refs is None else set(refs) - owned
+            stale = [(doc_key, checksum) for checksum, chunk_id in
+                     self._conn.execute("SELECT checksum, chunk_id FROM doc_refs WHERE doc_key = ?", (doc_key,))
+                     if checksum in owned or chunk_id in chunks or (keep is not None and checksum not in keep)]
+            self._conn.executemany("DELETE FROM doc_refs WHERE doc_key = ? AND checksum = ?", stale)
+            if keep:
+                self._conn.executemany("INSERT OR IGNORE INTO doc_refs (doc_key, checksum) VALUES (?, ?)",
+                                       [(doc_key, checksum) for checksum in keep])
+
+    def add_ref(self, doc_key: str, checksum: str) -> None:
+        """Record that a document references a chunk stored by another document (uncommitted)."""
+        with self._lock:
+            self._conn.execute("INSERT OR IGNORE INTO doc_refs (doc_key, checksum) VALUES (?, ?)", (doc_key, checksum))
+
+    def heirs(self, doc_key: str, chunks: Dict[str, str]) -> Dict[str, str]:
+        """
+        For chunks `doc_key` gives up: chunk id -> another document that references its checksum and has no chunk
+        of it yet (the chunk must stay in the collection for that document).
+        """
+        heirs: Dict[str, str] = {}
+        taken = set()
+        with self._lock:
+            for chunk_id, checksum in chunks.items():
+                for (other,) in self._conn.execute(
+                        "SELECT doc_key FROM doc_refs WHERE checksum = ? AND doc_key != ? AND chunk_id IS NULL",
+                        (checksum, doc_key)):
+                    if (other, checksum) not in taken:
+                        taken.add((other, checksum))
+                        heirs[chunk_id] = other
+                        break
+        return heirs
+
+    def hand_over(self, heirs: Dict[str, str], chunks: Dict[str, str]) -> None:
+        """Make each chunk of `heirs` (id -> document) owned by its heir, through its reference (uncommitted)."""
+        with self._lock:
+            self._conn.executemany("UPDATE doc_refs SET chunk_id = ? WHERE doc_key = ? AND checksum = ?",
+                                   [(chunk_id, doc_key, chunks[chunk_id]) for chunk_id, doc_key in heirs.items()])
+
+    def referenced(self, checksums: Iterable[str], doc_key: str) -> Set[str]:
+        """The `checksums` a document other than `doc_key` owns or references."""
+        found = set()
+        with self._lock:
+            for checksum in set(checksums):
+                if (self._conn.execute("SELECT 1 FROM doc_chunks WHERE checksum = ? AND doc_key != ? LIMIT 1",
+                                       (checksum, doc_key)).fetchone()
+                        or self._conn.execute("SELECT 1 FROM doc_refs WHERE checksum = ? AND doc_key != ? LIMIT 1",
+                                              (checksum, doc_key)).fetchone()):
+                    found.add(checksum)
+        return found
+
+    def commit(self) -> None:
+        with self._lock:
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """Forget every document, e.g. after the collection was deleted/rebuilt."""
+        with self._lock:
+            for table in ("documents", "doc_chunks", "doc_refs", "store_meta"):
+                self._conn.execute(f"DELETE FROM {table}")
+            self._conn.commit()
+
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+
+class DocUpdate:
+    """
+    New chunk set of one new or changed document during an indexing run.
+
+    - prev: chunk ids (-> checksum) the document owned; chunks of the new version with one of these checksums are
+      kept under their old id (`keep`), the others not in the new set are stale once the document is finished
+    - by_paragraph: the document is known and changed, so it is re-chunked paragraph by paragraph
+    - adopt: the collection predates the store; chunks skipped as existing checksums (`candidates`) may already be
+      this document's own and are adopted if their ids exist
+    - refs: checksums of chunks skipped because another document already stored them
+    - outstanding / sealed: chunks handed to the embedding batches and not written yet / all chunks produced;
+      the update is `done` when both are settled (a failed write or chunking keeps the old chunks, see `chunk_ids`)
+    """
+    __slots__ = ("key", "content_hash", "doc_id", "prev", "by_paragraph", "adopt", "kept", "kept_metas",
+                 "written", "candidates", "refs", "outstanding", "sealed", "failed", "_by_checksum")
+
+    def __init__(self, key: str, content_hash: str, prev: Optional[Dict[str, str]] = None,
+                 by_paragraph: bool = False, adopt: bool = False):
+        self.key = key
+        self.content_hash = content_hash
+        self.doc_id: Optional[str] = None
+        self.prev: Dict[str, str] = prev or {}
+        self.by_paragraph = by_paragraph
+        self.adopt = adopt
+        self.kept: Dict[str, str] = {}
+        self.kept_metas: List[Tuple[str, Dict[str, Any]]] = []
+        self.written: Dict[str, str] = {}
+        self.candidates: Dict[str, str] = {}
+        self.refs: Set[str] = set()
+        self.outstanding = 0
+        self.sealed = False
+        self.failed = False
+        self._by_checksum: Optional[Dict[str, List[str]]] = None
+
+    def keep(self, checksum: str) -> Optional[str]:
+        """Id of a not yet kept previous chunk with this checksum (now kept), None if the chunk is new."""
+        if not self.prev:
+            return None
+        if self._by_checksum is None:
+            self._by_checksum = {}
+            for chunk_id, c in self.prev.items():
+                self._by_checksum.setdefault(c, []).append(chunk_id)
+        ids = self._by_checksum.get(checksum)
+        if not ids:
+            return None
+        chunk_id = ids.pop()
+        self.kept[chunk_id] = checksum
+        return chunk_id
+
+    def resolve(self, chunk_ids: Iterable[str], checksums: Iterable[str], ok: bool) -> None:
+        """Settle chunks handed to a batch: written (`ok`) or lost with the batch."""
+        for chunk_id, checksum in zip(chunk_ids, checksums):
+            self.outstanding -= 1
+            if ok:
+                self.written[chunk_id] = checksum
+            else:
+                self.failed = True
+
+    @property
+    def done(self) -> bool:
+        return self.sealed and self.outstanding <= 0
+
+    def chunk_ids(self) -> Dict[str, str]:
+        """Chunks the document owns once finished; after a failure the previous ones are kept as well."""
+        chunks = dict(self.prev) if self.failed else {}
+        chunks.update(self.kept)
+        chunks.update(self.written)
+        return chunks
+
+    def stale(self) -> Dict[str, str]:
+        """Previous chunks to delete (none after a failure: the document is retried on the next run)."""
+        if self.failed:
+            return {}
+        return {chunk_id: c for chunk_id, c in self.prev.items() if chunk_id not in self.kept}
@@ -0,0 +1,223 @@
+"""
+Content-addressed on-disk embedding cache for XRAG+ indexing.
+
+Identical chunks are re-embedded whenever the corpus is re-indexed with another chunking method or
+into a new persist directory. `EmbeddingCache` stores every computed vector once per
+(provider, model), keyed by the sha1 checksum of the chunk text (same as `ChromaIndexer._checksum`):
+
+    <EMBEDDING_CACHE_DIR>/<provider>__<model>/index.sqlite3       key -> (shard, row)
+    <EMBEDDING_CACHE_DIR>/<provider>__<model>/shard_00000.f32     raw float32 rows, read via np.memmap
+
+`CachedEmbeddingProvider` wraps any `EmbeddingProvider` so only cache misses reach the model, and keeps
+hit/miss counters for reporting.
+
+Several processes may share a cache directory (e.g. the en and de runs that both use all-MiniLM): `put_many`
+appends to the shard and inserts the index rows inside one `BEGIN IMMEDIATE` transaction, which SQLite holds
+exclusively against other writers, so row positions taken from the shard size are never raced.
+"""
+
+from typing import Dict, List, Optional, Sequence
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+
+import numpy as np
+
+from .embeddings import EmbeddingProvider
+
+logger = logging.getLogger("xr.indexer")
+
+
+
+class EmbeddingCache:
+    """
+    float32 vectors in append-only memory-mapped shards, with a SQLite index file.
+
+    - cache_dir: root directory of the cache (shared by all models)
+    - provider_name / model_name: namespace of the vectors (a model's vectors never mix with another's)
+    - shard_rows: rows per shard file before a new shard is started
+    """
+    def __init__(self, cache_dir: str, provider_name: str, model_name: str, shard_rows: int = 65536):
+        self.provider_name = str(provider_name)
+        self.model_name = str(model_name)
+        self.shard_rows = int(shard_rows)
+        self.path = os.path.join(cache_dir, f"{self.provider_name}__{self.model_name.replace('/', '_')}")
+        os.makedirs(self.path, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(self.path, "index.sqlite3"), timeout=60, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS vectors (key TEXT PRIMARY KEY, shard INTEGER, row INTEGER) WITHOUT ROWID")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS cache_meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._conn.commit()
+        row = self._conn.execute("SELECT value FROM cache_meta WHERE key = 'dim'").fetchone()
+        self.dim: Optional[int] = int(row[0]) if row else None
+        self._maps: Dict[int, np.memmap] = {}   # shard -> read-only memmap (re-opened when the shard grows)
+
+        self.hits = 0
+        self.misses = 0
+
+
+    @staticmethod
+    def key_for(text: str) -> str:
+        """Cache key of a chunk: sha1 of its text, identical to `ChromaIndexer._checksum`."""
+        return hashlib.sha1(text.encode("utf8")).hexdigest()
+
+
+    def _shard_path(self, shard: int) -> str:
+        return os.path.join(self.path, f"shard_{shard:05d}.f32")
+
+    def _shard_rows_on_disk(self, shard: int) -> int:
+        p = self._shard_path(shard)
+        return os.path.getsize(p) // (4 * self.dim) if os.path.exists(p) else 0
+
+    def _align_shard(self, shard: int) -> None:
+        """Drop a partial trailing row (a writer killed mid-append), so appended rows land at whole-row offsets."""
+        p = self._shard_path(shard)
+        if os.path.exists(p):
+            size = os.path.getsize(p)
+            if size % (4 * self.dim):
+                with open(p, "r+b") as fh:
+                    fh.truncate(size - size % (4 * self.dim))
+
+    def _shard_map(self, shard: int, row: int) -> np.memmap:
+        mm = self._maps.get(shard)
+        if mm is None or row >= mm.shape[0]:
+            mm = np.memmap(self._shard_path(shard), dtype=np.float32, mode="r",
+                           shape=(self._shard_rows_on_disk(shard), self.dim))
+            self._maps[shard] = mm
+        return mm
+
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        """Return {key: float32 vector} for the keys present in the cache and count hits/misses."""
+        found: Dict[str, np.ndarray] = {}
+        if self.dim is not None and keys:
+            uniq = list(dict.fromkeys(keys))
+            with self._lock:
+                for i in range(0, len(uniq), 500):      # stay below SQLite's bound-variable limit
+                    part = uniq[i:i + 500]
+                    rows = self._conn.execute(
+                        f"SELECT key, shard, row FROM vectors WHERE key IN ({','.join('?' * len(part))})", part
+                    ).fetchall()
+                    for key, shard, row in rows:
+                        found[key] = np.array(self._shard_map(shard, row)[row])
+        hits = sum(1 for k in keys if k in found)
+        self.hits += hits
+        self.misses += len(keys) - hits
+        return found
+
+
+    def put_many(self, keys: Sequence[str], vectors) -> None:
+        """
+        Append vectors for keys not cached yet (duplicates within the call are stored once). The shard append and
+        the index rows form one write transaction, exclusive across processes sharing the cache.
+        """
+        arr = np.asarray(vectors, dtype=np.float32)
+        if arr.ndim != 2 or arr.shape[0] != len(keys) or not len(keys):
+            return
+        with self._lock:
+            self._conn.commit()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._put_locked(keys, arr)
+            except BaseException:
+                self._conn.rollback()
+                raise
+            self._conn.commit()
+
+    def _put_locked(self, keys: Sequence[str], arr: np.ndarray) -> None:
+        """`put_many` body, run inside the write transaction (other writers wait on it)."""
+        row = self._conn.execute("SELECT value FROM cache_meta WHERE key = 'dim'").fetchone()
+        if row:         # another process may have set it since this one opened the cache
+            self.dim = int(row[0])
+        if self.dim is None:
+            self.dim = int(arr.shape[1])
+            self._conn.execute("INSERT OR REPLACE INTO cache_meta (key, value) VALUES ('dim', ?)", (str(self.dim),))
+        elif arr.shape[1] != self.dim:
+            logger.warning("Embedding cache %s: dimension %d != cached %d, not caching batch", self.path, arr.shape[1], self.dim)
+            return
+
+        seen = set()
+        new_idx = []
+        for i, key in enumerate(keys):
+            if key in seen:
+                continue
+            seen.add(key)
+            new_idx.append(i)
+        existing = set()
+        for i in range(0, len(new_idx), 500):
+            part = [keys[j] for j in new_idx[i:i + 500]]
+            existing.update(r[0] for r in self._conn.execute(
+                f"SELECT key FROM vectors WHERE key IN ({','.join('?' * len(part))})", part))
+        new_idx = [i for i in new_idx if keys[i] not in existing]
+
+        row = self._conn.execute("SELECT MAX(shard) FROM vectors").fetchone()
+        shard = row[0] if row and row[0] is not None else 0
+        pos = 0
+        while pos < len(new_idx):
+            self._align_shard(shard)
+            rows_on_disk = self._shard_rows_on_disk(shard)
+            if rows_on_disk >= self.shard_rows:
+                shard += 1
+                continue
+            take = new_idx[pos:pos + (self.shard_rows - rows_on_disk)]
+            with open(self._shard_path(shard), "ab") as fh:
+                fh.write(np.ascontiguousarray(arr[take]).tobytes())
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO vectors (key, shard, row) VALUES (?, ?, ?)",
+                [(keys[i], shard, rows_on_disk + n) for n, i in enumerate(take)],
+            )
+            pos += len(take)
+
+
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": round(self.hit_rate(), 4)}
+
+    def close(self) -> None:
+        with self._lock:
+            self._maps.clear()
+            self._conn.close()
+
+
+
+class CachedEmbeddingProvider(EmbeddingProvider):
+    """
+    Wrap an `EmbeddingProvider` with an `EmbeddingCache`: cached chunks are served from disk and only
+    cache misses are sent to the wrapped provider (then stored). Other attributes (`provider`,
+    `model_name`/`model`, `batch_size`, ...) are delegated to the wrapped provider.
+    """
+    def __init__(self, inner: EmbeddingProvider, cache: EmbeddingCache):
+        self.inner = inner
+        self.cache = cache
+
+    def __getattr__(self, name):
+        # only called for attributes not found on the wrapper itself
+        return getattr(self.__dict__["inner"], name)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [self.cache.key_for(t) for t in texts]
+        cached = self.cache.get_many(keys)
+
+        # embed each missing text once, even if it repeats inside the batch
+        queued = set()
+        miss_keys: List[str] = []
+        miss_texts: List[str] = []
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in queued:
+                queued.add(key)
+                miss_keys.append(key)
+                miss_texts.append(text)
+
+        fresh: Dict[str, List[float]] = {}
+        if miss_texts:
+            vectors = self.inner.embed_documents(miss_texts)
+            self.cache.put_many(miss_keys, vectors)
+            fresh = {k: (v.tolist() if hasattr(v, "tolist") else list(v)) for k, v in zip(miss_keys, vectors)}
+
+        return [fresh[k] if k in fresh else cached[k].tolist() for k in keys]
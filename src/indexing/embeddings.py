@@ -7,6 +7,8 @@ Embedding providers for XRAG+ indexing.
 - CohereAIEmbeddingProvider: uses Cohere embeddings (optional)
 
 Each provider implements embed_documents(List[str]) -> List[List[float]].
+Providers also expose `max_seq_length` (max input tokens, longer inputs are truncated) and, when known,
+`tokenizer` (the model's own tokenizer); `ChromaIndexer.token_budget_chunker` sizes chunks with them.
 
 Make sure optional deps are installed in your environment when using the provider:
 - sentence-transformers: pip install sentence-transformers
@@ -47,6 +49,8 @@ class SentenceTransformersProvider(EmbeddingProvider):
 
         # load explicitly on CPU first to avoid OOM during initialization
         self.model = SentenceTransformer(model_name, device="cpu")
+        self.tokenizer = self.model.tokenizer
+        self.max_seq_length = self.model.max_seq_length
 
         if self.device != "cpu":
             # try to reduce GPU memory pressure before moving
@@ -82,6 +86,8 @@ class OpenAIEmbeddingProvider(EmbeddingProvider):
 
         self.model = model
         self.provider = "openai"
+        self.tokenizer = None
+        self.max_seq_length = 8191
         self.batch_size = 32
         api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not api_key:
@@ -116,6 +122,8 @@ class CohereAIEmbeddingProvider(EmbeddingProvider):
 
         self.model = model
         self.provider = "cohere"
+        self.tokenizer = None
+        self.max_seq_length = 512
 
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
         emb = self.co_client.embed(
@@ -10,6 +10,10 @@ python -m src.indexing.index_wiki_ccnews --base_dir "data/index/hf_ccnews_extrac
 
 python -m src.indexing.index_wiki_ccnews --base_dir "data/index/hf_datasets_extracted" --lang "en/de/ru/es/hi" --doc_batch_size 256 --workers 1 --chunking_method "token_chunking"
 
+--workers 1 (the default) indexes buffer by buffer with ChromaIndexer.index_documents. --workers N (N > 1, opt-in) runs the
+pipelined engine in src/indexing/pipeline.py: a reader thread, N chunking processes, an embedding thread
+and a single Chroma writer, connected by bounded queues; per-stage throughput is logged at the end.
+
 
 Notes:
  - CCNews files: one JSON object per line, keys include "title", "text", "url", etc.
@@ -31,17 +35,84 @@ logger = logging.getLogger("index_wiki_ccnews")
 
 
 from src.indexing.indexer import ChromaIndexer
+from src.indexing.pipeline import IndexingPipeline
 from main.main_config import MainConfig
 
 from src.indexing.utils import make_doc_from_ccnews, make_doc_from_wiki, is_ccnews_record, is_wiki_record, iter_json_lines
 
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Iterable, Iterator, Tuple
+
+
+
+
+def _index_stream(idx: ChromaIndexer, docs: Iterable[Dict], doc_batch_size: int, chunking_method: str, workers: int, language: str) -> int:
+    """Index a stream of docs: pipelined (reader / chunk processes / embedder / writer) when workers > 1,
+    otherwise buffered `index_documents` calls of `doc_batch_size` docs. Returns the number of docs seen."""
+    chunking_method = chunking_method or "context_aware_chunking"
+
+    # model_token_chunking needs the embedding model's tokenizer, which only index_documents resolves per group
+    if workers > 1 and chunking_method != "model_token_chunking":
+        pipeline = IndexingPipeline(idx, chunking_method=chunking_method, workers=workers,
+                                    doc_batch_size=doc_batch_size, language=language)
+        res = pipeline.run(docs)
+        logger.info("Pipelined indexing finished. Res: %s", res)
+        return res["docs"]
+
+    docs_buffer: List[Dict] = []
+    total_indexed = 0
+    for doc in docs:
+        docs_buffer.append(doc)
+        if len(docs_buffer) >= doc_batch_size:
+            try:
+                res = idx.index_documents(docs_buffer, chunking_method=chunking_method)
+                logger.info("Indexed batch of %d docs. Res: %s", len(docs_buffer), res)
+            except Exception as e:
+                logger.exception("Indexing batch failed: %s", e)
+            total_indexed += len(docs_buffer)
+            docs_buffer.clear()
+
+    # Final flush
+    if docs_buffer:
+        try:
+            res = idx.index_documents(docs_buffer, chunking_method=chunking_method)
+            logger.info("Indexed final batch of %d docs. Res: %s", len(docs_buffer), res)
+        except Exception as e:
+            logger.exception("Indexing final batch failed: %s", e)
+        total_indexed += len(docs_buffer)
+        docs_buffer.clear()
+    return total_indexed
+
+
+
+def iter_ccnews_docs(batch_files: List[Path], language: str) -> Iterator[Dict]:
+    """Yield normalized CCNews docs from `batch_*.json` files (one JSON object per line)."""
+    for file in batch_files:
+        logger.info("\n\n🗃️ Reading CCNews file: %s\n", file)
+        for i, obj in enumerate(iter_json_lines(file)):
+            logger.debug(f"File: {file} Json-line: {i}")
 
+            if not is_ccnews_record(obj):
+                logger.debug("Skipping non-ccnews-like record in %s", file)
+                continue
+            yield make_doc_from_ccnews(obj, language)
 
 
 
-def index_ccnews(language_dir: Path | str, doc_batch_size: int, chunking_method: str, language: str):
+def iter_wiki_docs(file_iter: List[Tuple[Path, str]]) -> Iterator[Dict]:
+    """Yield normalized Wikipedia docs from (file, language) pairs (one JSON object per line)."""
+    for file, language in file_iter:
+        logger.info("\n\n🗃️ Reading Wiki file: %s\n", file)
+        for i, obj in enumerate(iter_json_lines(file)):
+            logger.debug(f"File: {file} Json-line: {i}")
+            if not is_wiki_record(obj):
+                logger.debug("Skipping non-wiki-like record in %s", file)
+                continue
+            yield make_doc_from_wiki(obj, language)
+
+
+
+def index_ccnews(language_dir: Path | str, doc_batch_size: int, chunking_method: str, language: str, workers: int = 1):
     """Index CCNews data.
 
     This function accepts either a path pointing directly to a language folder
@@ -59,9 +130,6 @@ def index_ccnews(language_dir: Path | str, doc_batch_size: int, chunking_method:
 
     idx = ChromaIndexer(settings=indexer_settings)
 
-    docs_buffer: List[Dict] = []
-    total_indexed = 0
-
     if not language_dir.exists():
         logger.warning(f"CCNews {language} language directory does not exist: %s", language_dir)
         return
@@ -75,42 +143,13 @@ def index_ccnews(language_dir: Path | str, doc_batch_size: int, chunking_method:
                 continue
             batch_files.extend(sorted(sub.glob("batch_*.json")))
 
-    for file in batch_files:
-        logger.info("\n\n🗃️ Reading Wiki file: %s\n", file)
-        for i, obj in enumerate(iter_json_lines(file)):
-            logger.info(f"File: {file} Json-line: {i}")
-
-            if not is_ccnews_record(obj):
-                logger.debug("Skipping non-ccnews-like record in %s", file)
-                continue
-            docs_buffer.append(make_doc_from_ccnews(obj, language))
-
-            # logger.info(docs_buffer)
-            # logger.info(type(docs_buffer))
-            if len(docs_buffer) >= doc_batch_size:
-                try:
-                    res = idx.index_documents(docs_buffer, chunking_method=chunking_method)
-                    logger.info("Indexed batch of %d docs. Res: %s", len(docs_buffer), res)
-                except Exception as e:
-                    logger.exception("Indexing batch failed: %s", e)
-                total_indexed += len(docs_buffer)
-                docs_buffer.clear()
-
-    # Final flush
-    if docs_buffer:
-        try:
-            res = idx.index_documents(docs_buffer, chunking_method=chunking_method)
-            logger.info("Indexed final batch of %d docs. Res: %s", len(docs_buffer), res)
-        except Exception as e:
-            logger.exception("Indexing final batch failed: %s", e)
-        total_indexed += len(docs_buffer)
-        docs_buffer.clear()
+    total_indexed = _index_stream(idx, iter_ccnews_docs(batch_files, language), doc_batch_size, chunking_method, workers, language)
 
     logger.info("CCNews indexing complete. Total documents indexed (approx): %d", total_indexed)
 
 
 
-def index_wiki(language_dir: Path | str, doc_batch_size: int, chunking_method: str, language: str):
+def index_wiki(language_dir: Path | str, doc_batch_size: int, chunking_method: str, language: str, workers: int = 1):
     """Index Wikipedia data.
 
     Accepts either a path that directly contains language-named folders
@@ -120,7 +159,6 @@ def index_wiki(language_dir: Path | str, doc_batch_size: int, chunking_method: s
     `wikipedia` or `batch` when encountered).
     """
     language_dir = Path(language_dir)
-    docs_buffer: List[Dict] = []
 
     # indexer_settings = IndexingSettings()
     indexer_settings = MainConfig().indexer
@@ -131,8 +169,6 @@ def index_wiki(language_dir: Path | str, doc_batch_size: int, chunking_method: s
 
     idx = ChromaIndexer(settings=indexer_settings)
 
-    total_indexed = 0
-
     if not language_dir.exists():
         logger.warning("Wikipedia language directory does not exist: %s", language_dir)
         return
@@ -162,32 +198,7 @@ def index_wiki(language_dir: Path | str, doc_batch_size: int, chunking_method: s
     if direct_jsons:
         file_iter = [(f, language) for f in direct_jsons]
 
-    for file, language in file_iter:
-        logger.info("\n\n🗃️ Reading Wiki file: %s\n", file)
-        for i, obj in enumerate(iter_json_lines(file)):
-            logger.info(f"File: {file} Json-line: {i}")
-            if not is_wiki_record(obj):
-                logger.debug("Skipping non-wiki-like record in %s", file)
-                continue
-            docs_buffer.append(make_doc_from_wiki(obj, language))
-            if len(docs_buffer) >= doc_batch_size:
-                try:
-                    res = idx.index_documents(docs_buffer, chunking_method=chunking_method)
-                    logger.info("Indexed batch of %d docs. Res: %s", len(docs_buffer), res)
-                except Exception as e:
-                    logger.exception("Indexing batch failed: %s", e)
-                total_indexed += len(docs_buffer)
-                docs_buffer.clear()
-
-    # Final flush
-    if docs_buffer:
-        try:
-            res = idx.index_documents(docs_buffer, chunking_method=chunking_method)
-            logger.info("Indexed final batch of %d docs. Res: %s", len(docs_buffer), res)
-        except Exception as e:
-            logger.exception("Indexing final batch failed: %s", e)
-        total_indexed += len(docs_buffer)
-        docs_buffer.clear()
+    total_indexed = _index_stream(idx, iter_wiki_docs(file_iter), doc_batch_size, chunking_method, workers, language)
 
     logger.info("Indexing complete. Total documents indexed (approx): %d", total_indexed)
 
@@ -201,9 +212,12 @@ def parse_args():
     p.add_argument("--base_dir", type=str, help="Where to look for CCNews or Wikipedia Directory")
     p.add_argument("--lang", type=str, help="Language of the Articles to be indexed (en, de, hi, ru, es)")
     p.add_argument("--doc_batch_size", type=int, default=256, help="Number of docs to buffer before indexing")
-    p.add_argument("--workers", type=int, default=2, help="Embedding worker processes (if supported by your indexer)")
+    p.add_argument("--workers", type=int, default=1,
+                   help="Chunking worker processes (default 1: buffered index_documents). With more than 1 (opt-in), "
+                        "indexing runs as a pipeline (reader -> chunk processes -> embedder -> writer) with bounded queues.")
     p.add_argument("--chunking_method", type=str, default=None,
-                   help="Chunking method to use (token_chunking, sliding_window_chunking, paragraph_chunking, sentence_chunking). "
+                   help="Chunking method to use (token_chunking, sliding_window_chunking, paragraph_chunking, sentence_chunking, "
+                        "model_token_chunking = sentences packed up to the embedding model's max_seq_length). "
                         "If omitted, indexer default will be used.")
     return p.parse_args()
 
@@ -218,10 +232,10 @@ def main():
 
     if base_dir==Path("data/index/hf_ccnews_extracted"):
         language_dir = f"{base_dir}/{language}"
-        index_ccnews(language_dir, args.doc_batch_size, args.chunking_method, args.lang)
+        index_ccnews(language_dir, args.doc_batch_size, args.chunking_method, args.lang, workers=args.workers)
     elif base_dir==Path("data/index/hf_datasets_extracted"):
         language_dir = f"{base_dir}/wikipedia_20231101_{language}"
-        index_wiki(language_dir, args.doc_batch_size, args.chunking_method, args.lang)
+        index_wiki(language_dir, args.doc_batch_size, args.chunking_method, args.lang, workers=args.workers)
 
 if __name__ == "__main__":
     main()
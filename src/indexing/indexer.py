@@ -5,7 +5,14 @@ Features:
 - One collection per (language, source) combination
 - Per-language embedding provider configurable
 - Context-aware chunking with overlap
-- Batched upserts, deduplication by checksum
+- Batched upserts (chunks held columnar in a `ChunkBatch` until upsert), deduplication by checksum (persistent per-collection checksum store)
+- Optional on-disk embedding cache keyed by chunk checksum (see embedding_cache.py)
+- Optional on-disk chunk cache keyed by document text and chunker configuration: re-runs skip chunking
+  (see src/chunker/chunk_cache.py)
+- Persistent BM25 inverted index per collection for keyword retrieval (see bm25_index.py)
+- Near-duplicate filter (MinHash LSH) per collection for boilerplate that differs by a few characters (see near_dup.py)
+- Incremental re-indexing: unchanged documents are skipped, changed ones re-chunked paragraph by paragraph with
+  only their new chunks embedded and their stale chunks deleted (per-document content hashes, see doc_state.py)
 - Helpful metadata stored per chunk
 
 Dependencies:
@@ -13,17 +20,33 @@ Dependencies:
 - (optional) sentence-transformers, openai (see embeddings.py)
 """
 
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+import functools
 import chromadb
 import hashlib
+import os
 import time
 import math
 
-from src.chunker.chunkers import context_aware_chunking, ParagraphChunker, SentenceChunker, SlidingWindowChunker, TokenChunker
-from src.indexing.embeddings import EmbeddingProvider, SentenceTransformersProvider, CohereAIEmbeddingProvider, OpenAIEmbeddingProvider
+from src.chunker.chunk_batch import ChunkBatch
+from src.chunker.chunk_cache import shared_chunk_cache
+from src.chunker.chunkers import (
+    context_aware_chunking, context_aware_spans, iter_context_aware_chunks, iter_paragraph_chunks, ParagraphChunker, SentenceChunker,
+    SlidingWindowChunker, TokenBudgetChunker, TokenChunker
+)
+from src.chunker.parallel import chunk_many, chunk_pool
+from src.chunker.segmenter import SEGMENTER_VERSION
+from src.chunker.registry import get_embedding_provider
+from src.indexing.embeddings import EmbeddingProvider
 import logging
 from .config import Settings
 from .chroma_client import ChromaManager
+from .checksum_store import ChecksumStore
+from .bm25_index import BM25Index
+from .near_dup import NearDupIndex
+from .doc_state import DocStateStore, DocUpdate
+from .embedding_cache import EmbeddingCache, CachedEmbeddingProvider
+from .utils import collection_state_dir
 
 logger = logging.getLogger("xr.indexer")
 logger.setLevel(logging.INFO)
@@ -43,29 +66,57 @@ class ChromaIndexer:
         self.collection_prefix = self.settings.COLLECTION_PREFIX
         self.LANG_EMBEDDING_MAP = self.settings.LANG_EMBEDDING_MAP
         self.client = ChromaManager(persist_directory)
-        self._embedding_providers = {}  # key: (provider_name, lang, model_name)
+        self._embedding_providers = {}  # key: (provider_name, model_name)
+        self._checksum_stores: Dict[str, ChecksumStore] = {}  # key: collection name
+        self._bm25_indexes: Dict[str, BM25Index] = {}  # key: collection name
+        self._near_dup_indexes: Dict[str, NearDupIndex] = {}  # key: collection name
+        self._doc_states: Dict[str, DocStateStore] = {}  # key: collection name
+        self._vector_dims: Dict[str, int] = {}  # key: collection name
+        self._embedding_caches: Dict[Tuple[str, str], EmbeddingCache] = {}  # key: (provider_name, model_name)
 
 
     def get_provider_for_lang(self, lang, device="cuda"):
         """
         Return a cached provider instance for the language/provider/model combo.
-        Creates it lazily on first request.
+        The model is the process-wide instance of `src.chunker.registry.get_embedding_provider`, shared with
+        `QueryEmbedder` and the semantic chunker (loaded on first request, on cuda when available: `device` is
+        ignored once it is loaded).
         """
         provider = self.LANG_EMBEDDING_MAP.get(lang)["provider"]
         model_name = self.LANG_EMBEDDING_MAP.get(lang)["model"]
 
-        # create provider once
-        if provider == "sentence_transformers":
-            key = (provider, lang, model_name)
-            if key in self._embedding_providers:
-                return self._embedding_providers[key]
-            provider_obj = SentenceTransformersProvider(model_name=model_name, device=device, batch_size=self.settings.EMBEDDING_BATCH_SIZE)
+        # wrap the shared provider once
+        key = (provider, model_name)
+        if key in self._embedding_providers:
+            return self._embedding_providers[key]
+        provider_obj = self._with_embedding_cache(get_embedding_provider(provider, model_name), provider, model_name)
+        self._embedding_providers[key] = provider_obj
+        return provider_obj
 
-        elif provider == "cohere":  provider_obj = CohereAIEmbeddingProvider(model=model_name)
-        elif provider == "openai":  provider_obj = OpenAIEmbeddingProvider(model=model_name)
 
-        if provider =="sentence_transformers":    self._embedding_providers[key] = provider_obj
-        return provider_obj
+    def _with_embedding_cache(self, provider_obj: EmbeddingProvider, provider: str, model_name: str) -> EmbeddingProvider:
+        """Wrap a provider with the on-disk embedding cache of its (provider, model), if enabled."""
+        if not getattr(self.settings, "EMBEDDING_CACHE_ENABLED", False) or not getattr(self.settings, "EMBEDDING_CACHE_DIR", None):
+            return provider_obj
+        key = (provider, model_name)
+        cache = self._embedding_caches.get(key)
+        if cache is None:
+            cache = EmbeddingCache(self.settings.EMBEDDING_CACHE_DIR, provider, model_name,
+                                   shard_rows=getattr(self.settings, "EMBEDDING_CACHE_SHARD_ROWS", 65536))
+            self._embedding_caches[key] = cache
+        return CachedEmbeddingProvider(provider_obj, cache)
+
+
+    def chunk_cache_dir(self) -> Optional[str]:
+        """Directory of the on-disk chunk cache shared by all collections (None when CHUNK_CACHE_ENABLED is off)."""
+        if not getattr(self.settings, "CHUNK_CACHE_ENABLED", False):
+            return None
+        return getattr(self.settings, "CHUNK_CACHE_DIR", None) or None
+
+
+    def embedding_cache_stats(self) -> Dict[str, Dict[str, float]]:
+        """Hit/miss counters of every embedding cache used so far, keyed by '<provider>/<model>'."""
+        return {f"{p}/{m}": cache.stats() for (p, m), cache in self._embedding_caches.items()}
 
 
     def _collection_name(self, language: str, source: str, provider: str, model_name: str, chunking_method) -> str:
@@ -115,6 +166,289 @@ class ChromaIndexer:
         return hashlib.sha1(string.encode("utf8")).hexdigest()
 
 
+    def _state_dir(self, collection_name: str) -> Optional[str]:
+        return collection_state_dir(self.settings.CHROMA_PERSIST_DIRECTORY, self.settings.INDEX_STATE_DIRNAME, collection_name)
+
+
+    def _get_checksum_store(self, col) -> ChecksumStore:
+        """
+        Return the persistent checksum store of a collection, loaded once per indexer.
+        Collections indexed before the store existed are scanned a single time to seed it.
+        """
+        name = col.name
+        store = self._checksum_stores.get(name)
+        if store is None:
+            store = ChecksumStore.for_collection(self._state_dir(name))
+            if not store.bootstrapped:
+                loaded = store.bootstrap_from_collection(col)
+                logger.info("Seeded checksum store of %s from collection metadata (%d checksums)", name, loaded)
+            self._checksum_stores[name] = store
+        return store
+
+
+    def _get_bm25_index(self, col) -> Optional[BM25Index]:
+        """
+        Return the persistent BM25 index of a collection (None when BM25_INDEX_ENABLED is off).
+        Collections indexed before the index existed are scanned a single time to build it.
+        """
+        if not getattr(self.settings, "BM25_INDEX_ENABLED", False):
+            return None
+        name = col.name
+        index = self._bm25_indexes.get(name)
+        if index is None:
+            index = BM25Index.for_collection(self._state_dir(name))
+            if not index.bootstrapped:
+                loaded = index.bootstrap_from_collection(col)
+                logger.info("Built BM25 index of %s from collection documents (%d chunks)", name, loaded)
+            self._bm25_indexes[name] = index
+        return index
+
+
+    def _get_near_dup_index(self, col) -> Optional[NearDupIndex]:
+        """
+        Return the persistent near-duplicate index of a collection (None when NEAR_DUP_ENABLED is off).
+        Collections indexed before the index existed are scanned a single time to build it.
+        """
+        if not getattr(self.settings, "NEAR_DUP_ENABLED", False):
+            return None
+        name = col.name
+        index = self._near_dup_indexes.get(name)
+        if index is None:
+            index = self._open_near_dup_index(name)
+            if not index.bootstrapped:
+                loaded = index.bootstrap_from_collection(col)
+                logger.info("Built near-duplicate index of %s from collection documents (%d chunks)", name, loaded)
+            self._near_dup_indexes[name] = index
+        return index
+
+    def _open_near_dup_index(self, collection_name: str) -> NearDupIndex:
+        return NearDupIndex.for_collection(
+            self._state_dir(collection_name),
+            threshold=getattr(self.settings, "NEAR_DUP_THRESHOLD", 0.7),
+            num_perm=getattr(self.settings, "NEAR_DUP_NUM_PERM", 64),
+            bands=getattr(self.settings, "NEAR_DUP_BANDS", 16),
+            shingle=getattr(self.settings, "NEAR_DUP_SHINGLE", 3),
+            min_tokens=getattr(self.settings, "NEAR_DUP_MIN_TOKENS", 10),
+        )
+
+
+    def _get_doc_state(self, col) -> Optional[DocStateStore]:
+        """
+        Return the persistent document state of a collection (None when DOC_STATE_ENABLED is off).
+        A store created for an empty collection is bootstrapped; otherwise documents it does not know yet adopt
+        their already indexed chunks when they are first seen (`finish_doc_update`).
+        """
+        if not getattr(self.settings, "DOC_STATE_ENABLED", False):
+            return None
+        name = col.name
+        store = self._doc_states.get(name)
+        if store is None:
+            store = DocStateStore.for_collection(self._state_dir(name))
+            if not store.bootstrapped and not len(store):
+                try:
+                    if col.count() == 0:
+                        store.mark_bootstrapped()
+                except Exception:
+                    pass
+            self._doc_states[name] = store
+        return store
+
+
+    def chunking_signature(self, chunking_method: str) -> str:
+        """Chunking configuration that document content hashes include: changing it re-chunks every document."""
+        return (f"{chunking_method}|{self.settings.CHUNK_MAX_CHARS}|{self.settings.CHUNK_OVERLAP_SENTENCES}"
+                f"|{getattr(self.settings, 'CHUNK_MODEL_MAX_TOKENS', 0)}|seg={SEGMENTER_VERSION}")
+
+
+    def plan_doc_update(self, doc_state: DocStateStore, doc: Dict[str, Any], doc_meta: Dict[str, Any], text: str,
+                        signature: str, id_field: str = "id", adopt: bool = False) -> Optional[DocUpdate]:
+        """
+        None when `doc` is unchanged since it was last indexed into the collection of `doc_state`, else the
+        `DocUpdate` to index it with (changed documents carry the chunk ids they own and are re-chunked by paragraph).
+        """
+        key = document_key(doc, doc_meta, id_field)
+        content_hash = document_hash(doc_meta, text, signature)
+        known = doc_state.get(key)
+        if known == content_hash:
+            return None
+        if known is None:
+            upd = DocUpdate(key, content_hash, adopt=adopt)
+        else:
+            upd = DocUpdate(key, content_hash, prev=doc_state.chunks(key), by_paragraph=True)
+        upd.doc_id = doc_meta["doc_id"]
+        return upd
+
+
+    def finish_doc_update(self, col, upd: DocUpdate, doc_state: DocStateStore, store: ChecksumStore,
+                          near_dup: Optional[NearDupIndex] = None) -> int:
+        """
+        Apply a finished `DocUpdate`: adopt already indexed chunks, delete the stale chunks from the collection,
+        its checksum store, BM25 and near-duplicate indexes, refresh the metadata (offsets, chunk_index) of kept
+        chunks, and record the document in `doc_state` (uncommitted). Returns the number of chunks deleted.
+        Stale chunks whose checksum another document references are handed over to it instead of being deleted.
+        """
+        if upd.adopt and upd.candidates:
+            try:
+                found = set(col.get(ids=list(upd.candidates), include=[]).get("ids") or [])
+            except Exception as e:
+                logger.warning(f"Could not look up existing chunks of document {upd.key}: {e}")
+                found = set()
+            upd.kept.update({chunk_id: c for chunk_id, c in upd.candidates.items() if chunk_id in found})
+
+        deleted = 0
+        stale = upd.stale()
+        heirs = doc_state.heirs(upd.key, stale) if stale else {}
+        ids = [chunk_id for chunk_id in stale if chunk_id not in heirs]
+        if ids:
+            try:
+                col.delete(ids=ids)
+            except Exception as e:
+                logger.warning(f"Failed to delete {len(ids)} stale chunks of document {upd.key}: {e}")
+                upd.failed = True
+            else:
+                gone = {stale[chunk_id] for chunk_id in ids} - set(upd.chunk_ids().values())
+                store.discard_many(gone - doc_state.referenced(gone, upd.key))
+                bm25 = self._get_bm25_index(col)
+                if bm25 is not None:
+                    bm25.remove_many(ids)
+                if near_dup is not None:
+                    near_dup.discard(ids)
+                deleted = len(ids)
+
+        if heirs and not upd.failed:
+            doc_state.hand_over(heirs, stale)
+
+        if upd.kept_metas and not upd.failed:
+            try:
+                col.update(ids=[chunk_id for chunk_id, _ in upd.kept_metas], metadatas=[m for _, m in upd.kept_metas])
+            except Exception as e:
+                logger.warning(f"Failed to update metadata of kept chunks of document {upd.key}: {e}")
+
+        doc_state.record(upd.key, "" if upd.failed else upd.content_hash, upd.doc_id, upd.chunk_ids(),
+                         None if upd.failed else upd.refs)
+        return deleted
+
+
+    def near_dup_stats(self) -> Dict[str, Dict[str, int]]:
+        """Near-duplicate savings of every collection touched so far (see `NearDupIndex.stats`), keyed by collection."""
+        return {name: index.stats(self._vector_dims.get(name)) for name, index in self._near_dup_indexes.items()}
+
+
+    def _reset_collection_state(self, collection_name: str) -> None:
+        """
+        Empty the side-car state (checksum store, BM25 index, near-dup index, doc state) of a deleted/rebuilt
+        collection, without scanning it. State of a disabled feature that exists on disk is emptied as well and left
+        unbootstrapped, so neither the retriever nor a later run with the feature enabled reads the old contents.
+        """
+        state_dir = self._state_dir(collection_name)
+        sidecars = (
+            (None, ChecksumStore, self._checksum_stores, lambda: ChecksumStore.for_collection(state_dir)),
+            ("BM25_INDEX_ENABLED", BM25Index, self._bm25_indexes, lambda: BM25Index.for_collection(state_dir)),
+            ("NEAR_DUP_ENABLED", NearDupIndex, self._near_dup_indexes, lambda: self._open_near_dup_index(collection_name)),
+            ("DOC_STATE_ENABLED", DocStateStore, self._doc_states, lambda: DocStateStore.for_collection(state_dir)),
+        )
+        for flag, cls, opened, open_state in sidecars:
+            enabled = flag is None or getattr(self.settings, flag, False)
+            state = opened.get(collection_name)
+            if state is None:
+                if not enabled and not (state_dir and os.path.exists(os.path.join(state_dir, cls.FILENAME))):
+                    continue
+                state = open_state()
+            state.clear()
+            if enabled:
+                state.mark_bootstrapped()
+                opened[collection_name] = state
+            else:
+                opened.pop(collection_name, None)
+                state.close()
+
+
+    def resolve_provider(self, lang: str) -> EmbeddingProvider:
+        """Embedding provider for a language, trying cuda first and falling back to cpu."""
+        try:
+            # check if cuda actually available on provider side — providers may ignore this arg
+            return self.get_provider_for_lang(lang, device="cuda")
+        except Exception:
+            return self.get_provider_for_lang(lang, device="cpu")
+
+
+    def token_budget_chunker(self, provider: EmbeddingProvider) -> TokenBudgetChunker:
+        """
+        Chunker of `chunking_method="model_token_chunking"`: packs sentences up to the max_seq_length of `provider`'s
+        model (capped by CHUNK_MODEL_MAX_TOKENS), counted with the model's own tokenizer (whitespace if unknown).
+        """
+        tokenizer = getattr(provider, "tokenizer", None)
+        max_tokens = getattr(provider, "max_seq_length", None) or self.settings.CHUNK_FALLBACK_MAX_TOKENS
+        cap = getattr(self.settings, "CHUNK_MODEL_MAX_TOKENS", 0)
+        if cap:
+            max_tokens = min(max_tokens, cap)
+        logger.info(f"Token-budget chunking: max_tokens={max_tokens} tokenizer={type(tokenizer).__name__ if tokenizer is not None else 'whitespace'}")
+        return TokenBudgetChunker(tokenizer=tokenizer, max_tokens=max_tokens)
+
+
+    def prepare_collection(self, lang: str, src: str, provider: EmbeddingProvider, chunking_method: str, rebuild: bool = False):
+        """Ensure the collection of a (language, source) group exists, deleting and recreating it first when `rebuild=True`."""
+        col = self.ensure_collection(lang, src, provider, chunking_method)
+
+        # handle rebuild: delete collection then recreate
+        if rebuild:
+            try:
+                name = col.name
+                logger.info(f"Rebuild requested: deleting collection {name}")
+                try:
+                    self.client.delete_collection(name)
+                except Exception:
+                    pass
+                self._reset_collection_state(name)
+                col = self.ensure_collection(lang, src, provider, chunking_method)
+            except Exception as e:
+                logger.warning(f"Could not delete/recreate collection: {e}")
+        return col
+
+
+    def upsert_batch(self, col, texts: List[str], metadatas: List[Dict[str, Any]], ids: List[str], embeddings) -> None:
+        """
+        Write one embedded batch to a collection (upsert if available, else add with per-item duplicate fallback)
+        and add it to the collection's BM25 index.
+        """
+        from chromadb.errors import DuplicateIDError
+
+        # use upsert if available (idempotent and avoids duplicate id errors)
+        if hasattr(col, "upsert"):
+            col.upsert(documents=texts, metadatas=metadatas, ids=ids, embeddings=embeddings)
+        else:
+            try:
+                col.add(documents=texts, metadatas=metadatas, ids=ids, embeddings=embeddings)
+            except DuplicateIDError:
+                # fallback: attempt add per-item, skipping duplicates
+                for i in range(len(texts)):
+                    try:
+                        col.add(documents=[texts[i]], metadatas=[metadatas[i]], ids=[ids[i]], embeddings=[embeddings[i]])
+                    except Exception:
+                        # skip duplicates or failures
+                        continue
+
+        bm25 = self._get_bm25_index(col)
+        if bm25 is not None:
+            bm25.add_many(ids, texts, metadatas)
+        if len(embeddings):
+            self._vector_dims[col.name] = len(embeddings[0])
+
+
+    def persist_client(self) -> None:
+        """Persist the Chroma client if the installed version supports it (helps durability)."""
+        try:
+            if hasattr(self.client, "persist"):
+                try:
+                    self.client.persist()
+                except Exception:
+                    # some versions accept client.persist() differently
+                    pass
+            logger.info("Chroma client persisted (if supported).")
+        except Exception as e:
+            logger.warning(f"Failed to persist Chroma client: {e}")
+
+
     def index_documents(
         self,
         docs: List[Dict[str, Any]], language: Optional[str] = None,
@@ -134,18 +468,30 @@ class ChromaIndexer:
 
         Key points:
         - Streams documents group-by (language, source).
-        - Chunks each document, computes checksum, filters duplicates (using a single existing_checksums set per collection).
+        - Chunks documents CHUNK_BUFFER_DOCS at a time on a process pool (`chunk_many`, CHUNK_WORKERS processes),
+          computes checksums, filters duplicates against the collection's persistent checksum store
+          and near-duplicates against its MinHash LSH index (NEAR_DUP_ENABLED).
+        - chunking_method="model_token_chunking" packs sentences up to the max_seq_length of the group's embedding model,
+          in its own tokens (`token_budget_chunker`).
+        - Documents of CHUNK_STREAM_MIN_CHARS or more are chunked lazily (`iter_chunks`) straight into the batches,
+          without the chunk cache.
+        - With DOC_STATE_ENABLED, documents whose content hash is unchanged are skipped before chunking; changed ones
+          are re-chunked paragraph by paragraph, keep the chunks they already own, and lose their stale chunks once
+          their new chunks are written (`plan_doc_update` / `finish_doc_update`).
         - Embeds small batches (self.settings.EMBEDDING_BATCH_SIZE) and upserts them immediately.
         - Frees memory after each batch (del + gc.collect()).
         - Optionally deletes collection when `rebuild=True`.
+
+        For large corpora see `src.indexing.pipeline.IndexingPipeline`, which runs the same steps as concurrent stages.
         """
 
         import gc
         import psutil
-        from chromadb.errors import DuplicateIDError
 
         indexed = 0
         skipped = 0
+        near_duplicates = 0
+        unchanged_docs = changed_docs = kept_chunks = deleted_chunks = 0
         upserted_ids = []
 
         # Group by (language, source)
@@ -158,6 +504,14 @@ class ChromaIndexer:
         batch_size = getattr(self.settings, "EMBEDDING_BATCH_SIZE", 8) or 8
         chunk_max_chars = getattr(self.settings, "CHUNK_MAX_CHARS", 500)
         overlap_sentences = getattr(self.settings, "CHUNK_OVERLAP_SENTENCES", 1)
+        chunk_workers = getattr(self.settings, "CHUNK_WORKERS", 0)
+        chunk_buffer = max(1, getattr(self.settings, "CHUNK_BUFFER_DOCS", 256))
+        stream_min_chars = getattr(self.settings, "CHUNK_STREAM_MIN_CHARS", 1_000_000)
+        signature = self.chunking_signature(chunking_method)
+        # chunks of documents chunked before with the same configuration are read back instead of re-chunked
+        chunk_cache_dir = self.chunk_cache_dir()
+        chunk_cache = shared_chunk_cache(chunk_cache_dir) if chunk_cache_dir else None
+        cache_lookups = (chunk_cache.hits, chunk_cache.misses) if chunk_cache is not None else (0, 0)
 
         # helper to log memory
         def _log_mem(stage: str):
@@ -165,219 +519,480 @@ class ChromaIndexer:
             mem_mb = p.memory_info().rss / (1024 * 1024)
             logger.info(f"[MEM] {stage}: {mem_mb:.1f} MB")
 
-        for (lang, src), group_docs in groups.items():
-            logger.info(f"\nIndexing group: language={lang}, source={src} (#docs={len(group_docs)})")
-
-            # get embedding provider for language (try cuda then cpu)
-            device = "cuda"
-            try:
-                # check if cuda actually available on provider side — providers may ignore this arg
-                provider = self.get_provider_for_lang(lang, device=device)
-            except Exception:
-                device = "cpu"
-                provider = self.get_provider_for_lang(lang, device=device)
-
-            # ensure collection exists
-            col = self.ensure_collection(lang, src, provider, chunking_method)
-
-            # handle rebuild: delete collection then recreate
-            if rebuild:
-                try:
-                    name = col.name
-                    logger.info(f"Rebuild requested: deleting collection {name}")
+        # one spawned process pool for the chunk buffers of every group, started when a buffer needs it
+        with chunk_pool(chunk_workers):
+            for (lang, src), group_docs in groups.items():
+                logger.info(f"\nIndexing group: language={lang}, source={src} (#docs={len(group_docs)})")
+
+                # get embedding provider for language (try cuda then cpu)
+                provider = self.resolve_provider(lang)
+
+                # model-aware chunking is sized by this group's embedding model
+                budget_chunker = self.token_budget_chunker(provider) if chunking_method == "model_token_chunking" else None
+
+                def budget_iter_views(doc: Dict[str, Any]):
+                    """`budget_chunker.iter_views`, through the chunk cache when enabled (streamed docs bypass it)."""
+                    if chunk_cache is None or len(doc.get("text") or "") >= stream_min_chars:
+                        return budget_chunker.iter_views(doc)
+                    budget_signature = budget_chunker.cache_signature()
+                    cached = chunk_cache.get(doc, budget_signature, views=True)
+                    return iter(cached) if cached is not None else chunk_cache.iter_through(doc, budget_signature,
+                                                                                           budget_chunker.iter_views(doc))
+
+                def stream_iter_views(doc: Dict[str, Any]):
+                    """
+                    `iter_document_chunks` views, through the chunk cache when enabled. Documents of CHUNK_STREAM_MIN_CHARS
+                    or more bypass it: a miss is buffered whole to be stored and a hit is read back whole.
+                    """
+                    return iter_document_chunks(doc, chunking_method, chunk_max_chars, overlap_sentences, views=True,
+                                                cache_dir=chunk_cache_dir if len(doc.get("text") or "") < stream_min_chars else None)
+
+                # ensure collection exists (deleted and recreated first on rebuild)
+                col = self.prepare_collection(lang, src, provider, chunking_method, rebuild=rebuild)
+
+                # Persistent checksum store, loaded once per collection (fast de-dupe)
+                existing_checksums = self._get_checksum_store(col)
+
+                logger.info(f"Existing checksums loaded: {len(existing_checksums)}")
+                # MinHash LSH index of the collection's chunks (near-duplicate filter), None when disabled
+                near_dup = self._get_near_dup_index(col)
+                # per-document content hashes and owned chunk ids (incremental re-indexing), None when disabled
+                doc_state = self._get_doc_state(col)
+                adopt = doc_state is not None and not doc_state.bootstrapped
+                _log_mem("after-load-checksums")
+
+                # streaming buffer: chunks are kept as columns (document rows + offsets into their text); chunk
+                # strings and metadata dicts are only materialized for the embedding call / upsert.
+                # batch_updates[i] is the DocUpdate of the document of batch row i (None without doc state)
+                batch = ChunkBatch()
+                batch_updates: List[Optional[DocUpdate]] = []
+
+                def _finish_doc(upd: DocUpdate) -> None:
+                    nonlocal deleted_chunks
+                    deleted_chunks += self.finish_doc_update(col, upd, doc_state, existing_checksums, near_dup)
+
+                def _settle_docs(batch_ids: List[str], ok: bool) -> None:
+                    """Resolve the batch rows of their documents and finish the documents with nothing left to write."""
+                    settled = {}
+                    for i, upd in enumerate(batch_updates):
+                        if upd is not None:
+                            upd.resolve([batch_ids[i]], [batch.checksums[i]], ok)
+                            settled[id(upd)] = upd
+                    for upd in settled.values():
+                        if upd.done:
+                            _finish_doc(upd)
+                    doc_state.commit()
+
+                def _flush_batch():
+                    nonlocal indexed, skipped, upserted_ids, batch, batch_updates
+                    if not len(batch):
+                        return
+                    batch_ids = chunk_batch_ids(batch)
+                    ok = False
                     try:
-                        self.client.delete_collection(name)
-                    except Exception:
-                        # older chroma clients might use client.delete_collection
-                        try:
-                            self.client.delete_collection(name)
-                        except Exception:
-                            pass
-                    col = self.ensure_collection(lang, src, provider, chunking_method)
-                except Exception as e:
-                    logger.warning(f"Could not delete/recreate collection: {e}")
-
-            # Fetch existing checksums once (fast de-dupe)
-            existing_checksums = set()
-
-            # include metadatas only to reduce bandwidth
-            existing = col.get(include=["metadatas"])
-            metadatas = existing.get("metadatas", []) if isinstance(existing, dict) else []
-            # Some clients return nested lists: normalize
-            if metadatas and isinstance(metadatas[0], list):
-                flat_mds = metadatas[0]
-            else:
-                flat_mds = metadatas
-            for m in flat_mds:
-                if isinstance(m, dict) and "checksum" in m:
-                    existing_checksums.add(m["checksum"])
-
-            logger.info(f"Existing checksums loaded: {len(existing_checksums)}")
-            _log_mem("after-load-checksums")
-
-            # streaming buffers
-            batch_texts = []
-            batch_metadatas = []
-            batch_ids = []
-            batch_checksums = []
-
-            def _flush_batch():
-                nonlocal indexed, skipped, upserted_ids, batch_texts, batch_metadatas, batch_ids, batch_checksums
-                if not batch_texts:
-                    return
-                try:
-                    # embed
-                    logger.info(f"Embedding batch size = {len(batch_texts)} [Language={lang}, Source={src}]")
-                    embeddings = provider.embed_documents(batch_texts)
-
-                    # use upsert if available (idempotent and avoids duplicate id errors)
-                    if hasattr(col, "upsert"):
-                        col.upsert(documents=batch_texts, metadatas=batch_metadatas, ids=batch_ids, embeddings=embeddings)
-                    else:
-                        try:
-                            col.add(documents=batch_texts, metadatas=batch_metadatas, ids=batch_ids, embeddings=embeddings)
-                        except DuplicateIDError:
-                            # fallback: attempt add per-item, skipping duplicates
-                            for i in range(len(batch_texts)):
-                                try:
-                                    col.add(documents=[batch_texts[i]], metadatas=[batch_metadatas[i]], ids=[batch_ids[i]], embeddings=[embeddings[i]])
-                                except Exception:
-                                    # skip duplicates or failures
+                        batch_texts = batch.texts()
+                        # embed
+                        logger.info(f"Embedding batch size = {len(batch_texts)} [Language={lang}, Source={src}]")
+                        embeddings = provider.embed_documents(batch_texts)
+                        self.upsert_batch(col, batch_texts, chunk_batch_metadatas(batch), batch_ids, embeddings)
+
+                        # update counters & checksum set
+                        indexed += len(batch_texts)
+                        upserted_ids.extend(batch_ids)
+                        existing_checksums.add_many(batch.checksums)
+                        if near_dup is not None:
+                            near_dup.commit(batch_ids)
+                        ok = True
+
+                        logger.info(f"Indexed batch: +{len(batch_texts)} (total indexed={indexed})")
+                    except Exception as e:
+                        logger.warning(f"Failed to upsert/add batch to Chroma: {e}")
+                        if near_dup is not None:
+                            near_dup.discard(batch_ids)
+                    finally:
+                        if doc_state is not None:
+                            _settle_docs(batch_ids, ok)
+                        # free memory
+                        batch = ChunkBatch()
+                        batch_updates = []
+                        gc.collect()
+                        _log_mem("after-flush")
+
+                def _add_chunks(doc_idx: int, doc: Dict[str, Any], chunks, upd: Optional[DocUpdate] = None) -> None:
+                    """
+                    Add a list or a lazy iterator of chunks of one document to the embedding batch, flushing it when full.
+                    With a DocUpdate, chunks the document already owns are kept instead (not re-embedded).
+                    """
+                    nonlocal skipped, near_duplicates, kept_chunks
+                    added = 0
+                    try:
+                        doc_meta = document_meta(doc, lang, src, text_field=text_field, id_field=id_field,
+                                                 title_field=title_field, date_field=date_field)
+                        for cidx, (chunk, meta_partial) in enumerate(chunks):
+                            added += 1
+                            # chunks are ChunkViews: the string only lives while it is checked, the batch keeps offsets
+                            chunk_text = str(chunk)
+                            checksum = ChromaIndexer._checksum(chunk_text)
+                            if upd is not None:
+                                kept_id = upd.keep(checksum)
+                                if kept_id is not None:
+                                    kept_chunks += 1
+                                    if upd.by_paragraph:
+                                        meta = dict(doc_meta, chunk_index=cidx, checksum=checksum)
+                                        meta.update(meta_partial or {})
+                                        upd.kept_metas.append((kept_id, meta))
                                     continue
-
-                    # update counters & checksum set
-                    indexed += len(batch_texts)
-                    upserted_ids.extend(batch_ids)
-                    existing_checksums.update(batch_checksums)
-
-                    logger.info(f"Indexed batch: +{len(batch_texts)} (total indexed={indexed})")
-                except Exception as e:
-                    logger.warning(f"Failed to upsert/add batch to Chroma: {e}")
-                finally:
-                    # free memory
-                    del batch_texts, batch_metadatas, batch_ids, batch_checksums
-                    gc.collect()
-                    # recreate empty buffers
-                    batch_texts = []
-                    batch_metadatas = []
-                    batch_ids = []
-                    batch_checksums = []
-                    _log_mem("after-flush")
-
-            # choose chunking method
-            try:
-                if chunking_method == "paragraph_chunking":
-                    chunker = ParagraphChunker(min_chars=200)
-                elif chunking_method == "token_chunking":
-                    chunker = TokenChunker(chunk_size=512, stride=128)
-                elif chunking_method == "sliding_window_chunking":
-                    chunker = SlidingWindowChunker(chunk_size=512, overlap=128)
-                elif chunking_method == "sentence_chunking":
-                    chunker = SentenceChunker(min_tokens=5)
-
-            except Exception as e:
-                logger.warning(f"Chunking failed for doc {doc_idx} (lang={lang}): {e}")
-                # fallback single chunk
-                chunks = [(raw_text, {})]
-
-            # iterate docs and create chunks
-            for doc_idx, doc in enumerate(group_docs):
-                raw_text = doc.get(text_field, "") or doc.get("context", "")
-                if not raw_text:
-                    skipped += 1
-                    continue
-
-                title = doc.get(title_field, "")
-                url = doc.get("url", "")
-                date = doc.get(date_field, "")
-
-                # deterministic doc_id
-                raw_id = f"{raw_text[:30]}|{lang}|{doc.get(id_field, '')}"
-                doc_id = hashlib.sha1(raw_id.encode("utf-8")).hexdigest()
-
-                # choose chunking method
-                try:
-                    if chunking_method == "context_aware_chunking":
-                        chunks = context_aware_chunking(
-                            doc,
-                            max_chars=self.settings.CHUNK_MAX_CHARS,
-                            overlap_sentences=self.settings.CHUNK_OVERLAP_SENTENCES,
-                        )
-                    elif chunking_method == "paragraph_chunking":
-                        chunks = chunker.chunk(doc)
-                    elif chunking_method == "token_chunking":
-                        chunks = chunker.chunk(doc)
-                    elif chunking_method == "sliding_window_chunking":
-                        chunks = chunker.chunk(doc)
-                    elif chunking_method == "sentence_chunking":
-                        chunks = chunker.chunk(doc)
-
-                except Exception as e:
-                    logger.warning(f"Chunking failed for doc {doc_idx} (lang={lang}): {e}")
-                    # fallback single chunk
-                    chunks = [(raw_text, {})]
-
-
-                for cidx, (chunk_text, meta_partial) in enumerate(chunks):
-                    checksum = self._checksum(chunk_text)
-                    if checksum in existing_checksums:
-                        skipped += 1
-                        continue
-
-                    uid = f"{doc_id}__chunk_{cidx}__{checksum[:12]}"
-                    meta = {
-                        "doc_id": doc_id,
-                        "chunk_index": cidx,
-                        "title": title,
-                        "url": url,
-                        "language": lang,
-                        "source": src,
-                        "checksum": checksum,
-                        "date": date,
-                    }
-                    meta.update(meta_partial or {})
-
-                    # append to batch
-                    batch_texts.append(chunk_text)
-                    batch_metadatas.append(meta)
-                    batch_ids.append(uid)
-                    batch_checksums.append(checksum)
-
-                    # flush if batch full
-                    if len(batch_texts) >= batch_size:
-                        _flush_batch()
-
-                # after finishing doc, flush leftover small batch if it grew big (optional optimization)
-                # but we keep it to EMBEDDING_BATCH_SIZE threshold
-
-            # flush remaining for this group
-            _flush_batch()
-
-            # persist client if requested (helps durability)
-            if persist:
-                try:
-                    if hasattr(self.client, "persist"):
-                        try:
-                            self.client.persist()
-                        except Exception:
-                            # some versions accept client.persist() differently
-                            pass
-                    logger.info("Chroma client persisted (if supported).")
-                except Exception as e:
-                    logger.warning(f"Failed to persist Chroma client: {e}")
+                            if checksum in existing_checksums:
+                                skipped += 1
+                                if upd is not None:
+                                    if upd.adopt:
+                                        upd.candidates[chunk_uid(doc_meta["doc_id"], cidx, checksum)] = checksum
+                                    # the chunk is stored by another document: keep it while this one needs it
+                                    upd.refs.add(checksum)
+                                    doc_state.add_ref(upd.key, checksum)
+                                continue
+                            # an edited chunk near-duplicates its own stale version, which is about to be deleted
+                            if near_dup is not None and near_dup.check(chunk_uid(doc_meta["doc_id"], cidx, checksum), chunk_text,
+                                                                       ignore=upd.prev if upd is not None else ()):
+                                near_duplicates += 1
+                                continue
+
+                            # append to batch
+                            batch.add(chunk, meta_partial, source=texts[doc_idx], doc_meta=doc_meta,
+                                      ordinal=cidx, checksum=checksum)
+                            batch_updates.append(upd)
+                            if upd is not None:
+                                upd.outstanding += 1
+
+                            # flush if batch full
+                            if len(batch) >= batch_size:
+                                _flush_batch()
+                    except Exception as e:
+                        logger.warning(f"Chunking failed for doc {doc_idx} (lang={lang}): {e}")
+                        if not added:
+                            # fallback single chunk
+                            _add_chunks(doc_idx, doc, [(texts[doc_idx], {})], upd)
+                            return
+                        if upd is not None:
+                            upd.failed = True
+                    if upd is not None:
+                        upd.sealed = True
+                        if upd.done:
+                            _finish_doc(upd)
+
+                # chunk docs a buffer at a time on a process pool (results in input order); documents of
+                # CHUNK_STREAM_MIN_CHARS or more are chunked lazily in-process instead, so their chunks go
+                # straight into the embedding batches and are never all held at once
+                texts = [doc.get(text_field, "") or doc.get("context", "") for doc in group_docs]
+                skipped += sum(1 for raw_text in texts if not raw_text)
+                to_chunk = [doc_idx for doc_idx, raw_text in enumerate(texts) if raw_text]
+                for start in range(0, len(to_chunk), chunk_buffer):
+                    buffer = to_chunk[start:start + chunk_buffer]
+                    updates: Dict[int, DocUpdate] = {}
+                    if doc_state is not None:
+                        for doc_idx in buffer:
+                            doc = group_docs[doc_idx]
+                            doc_meta = document_meta(doc, lang, src, text_field=text_field, id_field=id_field,
+                                                     title_field=title_field, date_field=date_field)
+                            upd = self.plan_doc_update(doc_state, doc, doc_meta, texts[doc_idx], signature,
+                                                       id_field=id_field, adopt=adopt)
+                            if upd is None:
+                                unchanged_docs += 1
+                            else:
+                                updates[doc_idx] = upd
+                                changed_docs += upd.by_paragraph
+                        buffer = [i for i in buffer if i in updates]
+                    # changed documents are chunked paragraph by paragraph, in-process
+                    pooled = [i for i in buffer if len(texts[i]) < stream_min_chars
+                              and not (i in updates and updates[i].by_paragraph)]
+                    if budget_chunker is not None:
+                        chunk_fn = functools.partial(budget_chunker.chunk_many, workers=chunk_workers,
+                                                     return_exceptions=True, views=True)
+                        results = (chunk_cache.chunk_many([group_docs[i] for i in pooled], budget_chunker.cache_signature(),
+                                                          chunk_fn, views=True)
+                                   if chunk_cache is not None else chunk_fn([group_docs[i] for i in pooled]))
+                    else:
+                        results = chunk_documents([group_docs[i] for i in pooled], chunking_method, chunk_max_chars,
+                                                  overlap_sentences, workers=chunk_workers, views=True, cache_dir=chunk_cache_dir)
+                    chunked = dict(zip(pooled, results))
+                    for doc_idx in buffer:
+                        doc = group_docs[doc_idx]
+                        upd = updates.get(doc_idx)
+                        if doc_idx in chunked:
+                            chunks = chunked.pop(doc_idx)
+                            if isinstance(chunks, Exception):
+                                logger.warning(f"Chunking failed for doc {doc_idx} (lang={lang}): {chunks}")
+                                # fallback single chunk
+                                chunks = [(texts[doc_idx], {})]
+                        elif upd is not None and upd.by_paragraph:
+                            chunks = iter_paragraph_chunks(doc, budget_iter_views if budget_chunker is not None else stream_iter_views)
+                        elif budget_chunker is not None:
+                            chunks = budget_iter_views(doc)
+                        else:
+                            chunks = stream_iter_views(doc)
+                        _add_chunks(doc_idx, doc, chunks, upd)
+
+                # flush remaining for this group
+                _flush_batch()
+                if doc_state is not None:
+                    doc_state.commit()
+
+                # persist client if requested (helps durability)
+                if persist:
+                    self.persist_client()
 
         summary = {"indexed_chunks": int(indexed), "skipped": int(skipped), "upserted_ids_count": len(upserted_ids)}
+        if self._doc_states:
+            summary.update(unchanged_docs=unchanged_docs, changed_docs=changed_docs,
+                           kept_chunks=kept_chunks, deleted_chunks=deleted_chunks)
+            logger.info(f"[INCREMENTAL] unchanged docs={unchanged_docs} changed docs={changed_docs} "
+                        f"kept chunks={kept_chunks} deleted stale chunks={deleted_chunks}")
+        if self._near_dup_indexes:
+            summary["near_duplicates"] = int(near_duplicates)
+            summary["near_dup"] = self.near_dup_stats()
+            for name, nd in summary["near_dup"].items():
+                logger.info(f"[NEAR-DUP] {name}: skipped={nd['skipped']} saved_chars={nd['saved_chars']} "
+                            f"saved_vector_bytes={nd.get('saved_vector_bytes', 0)} (lifetime skipped={nd['total_skipped']})")
+        if self._embedding_caches:
+            summary["embedding_cache"] = self.embedding_cache_stats()
+            for name, cache_stats in summary["embedding_cache"].items():
+                logger.info(f"[EMBED-CACHE] {name}: hits={cache_stats['hits']} misses={cache_stats['misses']} "
+                            f"hit_rate={cache_stats['hit_rate']:.1%}")
+        if chunk_cache is not None:
+            hits, misses = chunk_cache.hits - cache_lookups[0], chunk_cache.misses - cache_lookups[1]
+            summary["chunk_cache"] = {"hits": hits, "misses": misses, "hit_rate": hits / (hits + misses) if hits + misses else 0.0}
+            logger.info(f"[CHUNK-CACHE] hits={hits} misses={misses} hit_rate={summary['chunk_cache']['hit_rate']:.1%}")
         return summary
 
 
     def list_collections(self) -> List[str]:
         return [c.name for c in self.client.list_collections()]
 
-    def delete_collection(self, language: str, source: str, emb_provider_obj: Optional[EmbeddingProvider] = None):
+    def delete_collection(self, language: str, source: str, emb_provider_obj: Optional[EmbeddingProvider] = None,
+                          chunking_method: str = "default"):
         provider_name = getattr(emb_provider_obj, "provider", None)
         model_name = getattr(emb_provider_obj, "model_name", None) or getattr(emb_provider_obj, "model", None)
 
-        name = self._collection_name(language, source, provider_name, model_name)
+        name = self._collection_name(language, source, provider_name, model_name, chunking_method)
         logger.info("\n🔴 Deleting collection %s", name)
 
-        return self.client.delete_collection(name)
\ No newline at end of file
+        result = self.client.delete_collection(name)
+        self._reset_collection_state(name)
+        return result
+
+
+def make_chunker(chunking_method: str):
+    """Chunker instance for the indexer's chunking-method presets (None for the functional `context_aware_chunking`)."""
+    if chunking_method == "paragraph_chunking":
+        return ParagraphChunker(min_chars=200)
+    elif chunking_method == "token_chunking":
+        return TokenChunker(chunk_size=512, stride=128)
+    elif chunking_method == "sliding_window_chunking":
+        return SlidingWindowChunker(chunk_size=512, overlap=128)
+    elif chunking_method == "sentence_chunking":
+        return SentenceChunker(min_tokens=5)
+    return None
+
+
+_CHUNKER_CACHE: Dict[str, Any] = {}
+
+def chunk_document(doc: Dict[str, Any], chunking_method: str, max_chars: int, overlap_sentences: int,
+                   views: bool = False, cache_dir: Optional[str] = None) -> List[Tuple[Any, Dict[str, Any]]]:
+    """
+    Chunk one document with the given chunking method and return (chunk_text, metadata) pairs.
+    Module-level (and chunker instances cached per process) so it can run inside process pools.
+    `views=True` returns the chunk texts as `ChunkView`s over the document (materialized at embedding time).
+    `cache_dir`: chunk cache (src/chunker/chunk_cache.py) to read the chunks from, or store them in on a miss.
+    """
+    if cache_dir:
+        cached = shared_chunk_cache(cache_dir).get(doc, chunk_cache_signature(chunking_method, max_chars, overlap_sentences), views)
+        if cached is not None:
+            return cached
+        return _chunk_and_cache(doc, chunking_method, max_chars, overlap_sentences, views, cache_dir)
+
+    if chunking_method == "context_aware_chunking":
+        if views:
+            return list(iter_context_aware_chunks(doc, max_chars=max_chars, overlap_sentences=overlap_sentences, views=True))
+        return context_aware_chunking(doc, max_chars=max_chars, overlap_sentences=overlap_sentences)
+
+    chunker = _get_chunker(chunking_method)
+    return chunker.chunk_views(doc) if views else chunker.chunk(doc)
+
+
+def _chunk_and_cache(doc: Dict[str, Any], chunking_method: str, max_chars: int, overlap_sentences: int,
+                     views: bool, cache_dir: str) -> List[Tuple[Any, Dict[str, Any]]]:
+    """`chunk_document` of a chunk-cache miss: chunk and store the result (context-aware chunks with their spans)."""
+    spans = None
+    if chunking_method == "context_aware_chunking":
+        spans = context_aware_spans(doc["text"], max_chars, overlap_sentences, doc.get("language")) if doc["text"] else []
+        chunks = list(iter_context_aware_chunks(doc, max_chars=max_chars, overlap_sentences=overlap_sentences,
+                                                views=views, spans=spans))
+    else:
+        chunks = chunk_document(doc, chunking_method, max_chars, overlap_sentences, views=views)
+    cache = shared_chunk_cache(cache_dir)
+    cache.put(doc, chunk_cache_signature(chunking_method, max_chars, overlap_sentences), chunks, spans)
+    cache.commit()
+    return chunks
+
+
+def chunk_cache_signature(chunking_method: str, max_chars: int, overlap_sentences: int) -> str:
+    """Chunker configuration a chunk cache keys the chunks of `chunking_method` by."""
+    if chunking_method == "context_aware_chunking":
+        return f"context_aware_chunking|max_chars={max_chars}|overlap={overlap_sentences}"
+    return _get_chunker(chunking_method).cache_signature()
+
+
+def _get_chunker(chunking_method: str):
+    chunker = _CHUNKER_CACHE.get(chunking_method)
+    if chunker is None:
+        chunker = make_chunker(chunking_method)
+        if chunker is None:
+            raise ValueError(f"Unknown chunking method: {chunking_method}")
+        _CHUNKER_CACHE[chunking_method] = chunker
+    return chunker
+
+
+def iter_document_chunks(doc: Dict[str, Any], chunking_method: str, max_chars: int,
+                         overlap_sentences: int, views: bool = False, cache_dir: Optional[str] = None
+                         ) -> Iterator[Tuple[Any, Dict[str, Any]]]:
+    """
+    Generator form of `chunk_document`: (chunk_text, metadata) pairs produced one at a time.
+    With `cache_dir`, a cache hit is returned as is, a miss is stored once the iterator is exhausted (both hold every
+    chunk of the document: leave `cache_dir` unset for documents that must stream).
+    """
+    if cache_dir:
+        cache = shared_chunk_cache(cache_dir)
+        signature = chunk_cache_signature(chunking_method, max_chars, overlap_sentences)
+        cached = cache.get(doc, signature, views)
+        if cached is not None:
+            return iter(cached)
+        if chunking_method == "context_aware_chunking":
+            # spans of context-aware chunks joining several sentences are not recoverable from their text
+            return iter(_chunk_and_cache(doc, chunking_method, max_chars, overlap_sentences, views, cache_dir))
+        return cache.iter_through(doc, signature, iter_document_chunks(doc, chunking_method, max_chars,
+                                                                       overlap_sentences, views=views))
+    if chunking_method == "context_aware_chunking":
+        return iter_context_aware_chunks(doc, max_chars=max_chars, overlap_sentences=overlap_sentences, views=views)
+    chunker = _get_chunker(chunking_method)
+    return chunker.iter_views(doc) if views else chunker.iter_chunks(doc)
+
+
+def chunk_documents(docs: List[Dict[str, Any]], chunking_method: str, max_chars: int, overlap_sentences: int,
+                    workers: Optional[int] = None, views: bool = False, cache_dir: Optional[str] = None) -> List[Any]:
+    """
+    `chunk_document` for many docs on a process pool (`src.chunker.parallel.chunk_many`), in input order.
+    A doc whose chunking failed gets the exception in its slot, so callers can fall back per doc.
+    With `cache_dir`, cached docs are looked up here in one query and only the misses go to the pool
+    (which stores their chunks).
+    """
+    if not cache_dir:
+        fn = functools.partial(chunk_document, chunking_method=chunking_method, max_chars=max_chars,
+                               overlap_sentences=overlap_sentences, views=views)
+        return chunk_many(fn, docs, workers=workers, return_exceptions=True)
+
+    results: List[Any] = shared_chunk_cache(cache_dir).get_many(
+        docs, chunk_cache_signature(chunking_method, max_chars, overlap_sentences), views)
+    missing = [i for i, r in enumerate(results) if r is None]
+    if missing:
+        fn = functools.partial(_chunk_and_cache, chunking_method=chunking_method, max_chars=max_chars,
+                               overlap_sentences=overlap_sentences, views=views, cache_dir=cache_dir)
+        for i, chunks in zip(missing, chunk_many(fn, [docs[i] for i in missing], workers=workers, return_exceptions=True)):
+            results[i] = chunks
+    return results
+
+
+def document_meta(
+    doc: Dict[str, Any], lang: str, src: str,
+    text_field: str = "text", id_field: str = "id", title_field: str = "title", date_field: str = "date_publish",
+) -> Dict[str, Any]:
+    """Metadata shared by all chunks of a document; the doc_id is deterministic (hash of text prefix, language, id)."""
+    raw_text = doc.get(text_field, "") or doc.get("context", "")
+    raw_id = f"{raw_text[:30]}|{lang}|{doc.get(id_field, '')}"
+    return {
+        "doc_id": hashlib.sha1(raw_id.encode("utf-8")).hexdigest(),
+        "title": doc.get(title_field, ""),
+        "url": doc.get("url", ""),
+        "language": lang,
+        "source": src,
+        "date": doc.get(date_field, ""),
+    }
+
+
+def document_key(doc: Dict[str, Any], doc_meta: Dict[str, Any], id_field: str = "id") -> str:
+    """Key of a document in its collection's doc state: its dataset id when it has one (stable across dumps), else its doc_id."""
+    return str(doc.get("doc_id") or doc.get(id_field) or doc_meta["doc_id"])
+
+
+def document_hash(doc_meta: Dict[str, Any], text: str, signature: str = "") -> str:
+    """Content hash of a document as indexed: its text, the metadata its chunks carry and the chunking configuration."""
+    h = hashlib.sha1(signature.encode("utf-8"))
+    for value in (doc_meta.get("title"), doc_meta.get("url"), doc_meta.get("date"), text):
+        h.update(b"\x1f")
+        h.update(str(value or "").encode("utf-8", "surrogatepass"))
+    return h.hexdigest()
+
+
+def chunk_uid(doc_id: str, chunk_index: int, checksum: str) -> str:
+    """Chroma id of a chunk: deterministic in the document, the chunk position and the chunk text."""
+    return f"{doc_id}__chunk_{chunk_index}__{checksum[:12]}"
+
+
+def build_chunk_records(
+    doc: Dict[str, Any], chunks: Iterable[Tuple[str, Dict[str, Any]]], lang: str, src: str,
+    text_field: str = "text", id_field: str = "id", title_field: str = "title", date_field: str = "date_publish",
+) -> List[Tuple[str, str, Dict[str, Any], str]]:
+    """
+    Turn the chunks of one document into (uid, chunk_text, metadata, checksum) records ready for Chroma.
+    The uid and doc_id are deterministic, so re-indexing the same document yields the same ids.
+    """
+    return list(iter_chunk_records(doc, chunks, lang, src, text_field=text_field, id_field=id_field,
+                                   title_field=title_field, date_field=date_field))
+
+
+def iter_chunk_records(
+    doc: Dict[str, Any], chunks: Iterable[Tuple[str, Dict[str, Any]]], lang: str, src: str,
+    text_field: str = "text", id_field: str = "id", title_field: str = "title", date_field: str = "date_publish",
+) -> Iterator[Tuple[str, str, Dict[str, Any], str]]:
+    """Generator form of `build_chunk_records`; consumes `chunks` (a list or a lazy iterator) one chunk at a time."""
+    doc_meta = document_meta(doc, lang, src, text_field=text_field, id_field=id_field,
+                             title_field=title_field, date_field=date_field)
+    doc_id = doc_meta["doc_id"]
+
+    for cidx, (chunk_text, meta_partial) in enumerate(chunks):
+        chunk_text = str(chunk_text)
+        checksum = ChromaIndexer._checksum(chunk_text)
+        uid = chunk_uid(doc_id, cidx, checksum)
+        meta = dict(doc_meta, chunk_index=cidx, checksum=checksum)
+        meta.update(meta_partial or {})
+        yield uid, chunk_text, meta, checksum
+
+
+def build_chunk_batch(
+    doc: Dict[str, Any], chunks: Iterable[Tuple[str, Dict[str, Any]]], lang: str, src: str,
+    text_field: str = "text", id_field: str = "id", title_field: str = "title", date_field: str = "date_publish",
+    batch: Optional[ChunkBatch] = None,
+) -> ChunkBatch:
+    """
+    Columnar form of `build_chunk_records`: append the chunks of one document to `batch` (a new `ChunkBatch` by
+    default). `chunk_batch_ids` / `chunk_batch_metadatas` give the same uids / metadata as the records.
+    Chunk texts may be `ChunkView`s; they are only materialized to compute their checksum.
+    """
+    batch = ChunkBatch() if batch is None else batch
+    doc_meta = document_meta(doc, lang, src, text_field=text_field, id_field=id_field,
+                             title_field=title_field, date_field=date_field)
+    raw_text = doc.get(text_field, "") or doc.get("context", "")
+    for cidx, (chunk_text, meta_partial) in enumerate(chunks):
+        batch.add(chunk_text, meta_partial, source=raw_text, doc_meta=doc_meta,
+                  ordinal=cidx, checksum=ChromaIndexer._checksum(str(chunk_text)))
+    return batch
+
+
+def chunk_batch_ids(batch: ChunkBatch) -> List[str]:
+    """Chroma ids of the chunks of a batch built from `document_meta` rows (see `build_chunk_records`)."""
+    return [chunk_uid(batch.doc_metas[batch.doc[i]]["doc_id"], batch.ordinal[i], batch.checksums[i])
+            for i in range(len(batch))]
+
+
+def chunk_batch_metadatas(batch: ChunkBatch) -> List[Dict[str, Any]]:
+    """Chroma metadatas of the chunks of a batch, built only now (see `build_chunk_records`)."""
+    return batch.metadatas(ordinal_key="chunk_index", checksum_key="checksum")
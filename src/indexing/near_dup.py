@@ -0,0 +1,335 @@
+"""
+Persistent near-duplicate filter (MinHash LSH) for XRAG+ indexing.
+
+The checksum store only catches byte-identical chunks. CC-News repeats syndicated wire stories, cookie
+banners and footers that differ by a few characters; those chunks are caught here instead:
+
+- Each chunk gets a MinHash signature (`num_perm` 32-bit values) over its word 3-shingles (lowercased `\\w+`
+  tokens, like BM25); the fraction of equal values estimates the Jaccard similarity of two chunks' shingle sets.
+- LSH: the signature is cut into `bands` bands; chunks sharing a band bucket are candidates, and a candidate
+  is a near-duplicate when the estimated Jaccard similarity is at least `threshold`.
+
+Signatures and band buckets live in SQLite, per collection, next to the checksum store (a lookup is one
+indexed query), together with cumulative savings counters:
+
+    <CHROMA_PERSIST_DIRECTORY>/<INDEX_STATE_DIRNAME>/<collection_name>/near_dup.sqlite3
+
+Chunks shorter than `min_tokens` words get no signature (too few shingles to compare) and are never skipped.
+
+Signatures of chunks that are checked but not stored yet are held in memory (pending) and only written to SQLite
+by `commit(chunk_ids)` once their batch is upserted, so a failed or still in-flight batch never reaches the file.
+"""
+
+from typing import Collection, Dict, List, Optional, Sequence, Tuple
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+
+import numpy as np
+
+logger = logging.getLogger("xr.indexer")
+
+_TOKEN_RE = re.compile(r"\w+")
+_PRIME = np.uint64((1 << 61) - 1)
+_MASK = np.uint64(0xFFFFFFFF)
+_SEED = 1
+
+
+
+def shingle_hashes(text: str, shingle: int = 3) -> np.ndarray:
+    """Stable 32-bit hashes of the distinct word `shingle`-grams of `text` (lowercased `\\w+` tokens)."""
+    words = _TOKEN_RE.findall((text or "").lower())
+    grams = {" ".join(words[i:i + shingle]) for i in range(max(1, len(words) - shingle + 1))} if words else set()
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=4).digest(), "little") for g in grams),
+        dtype=np.uint64, count=len(grams),
+    )
+
+
+
+class MinHasher:
+    """MinHash signatures with `num_perm` fixed universal hash functions (same seed -> comparable across runs)."""
+    def __init__(self, num_perm: int = 64, seed: int = _SEED):
+        rng = np.random.RandomState(seed)
+        self.num_perm = int(num_perm)
+        # a, b < 2^32 and x < 2^32: a * x + b never overflows uint64
+        self._a = rng.randint(1, 1 << 32, size=self.num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 32, size=self.num_perm, dtype=np.uint64)
+
+    def signature(self, hashes: np.ndarray) -> np.ndarray:
+        values = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % _PRIME & _MASK
+        return values.min(axis=1).astype(np.uint32)
+
+
+
+class NearDupIndex:
+    """
+    SQLite-backed MinHash LSH index of the chunks of a single Chroma collection.
+
+    - path: sqlite file to use. If None, the index lives in memory only (no persistence).
+    - `check` looks a chunk up and, if it is new, records its signature as pending (in memory); `commit` persists
+      the pending signatures of chunks once they are stored, `discard` removes recorded or persisted signatures
+      (failed batch, deleted chunks).
+    - Safe to share between threads (a single lock guards the connection).
+    """
+    FILENAME = "near_dup.sqlite3"
+
+    def __init__(self, path: Optional[str] = None, threshold: float = 0.7, num_perm: int = 64, bands: int = 16,
+                 shingle: int = 3, min_tokens: int = 10, max_candidates: int = 64):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.path = path
+        self.threshold = float(threshold)
+        self.bands = int(bands)
+        self.rows = int(num_perm) // self.bands
+        self.shingle = int(shingle)
+        self.min_tokens = int(min_tokens)
+        self.max_candidates = int(max_candidates)
+        self.hasher = MinHasher(num_perm)
+        if path:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS signatures (chunk_id TEXT PRIMARY KEY, minhash BLOB NOT NULL) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS bands (band INTEGER, bucket INTEGER, chunk_id TEXT,
+                                              PRIMARY KEY (band, bucket, chunk_id)) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS index_meta (key TEXT PRIMARY KEY, value TEXT);
+        """)
+        self._conn.commit()
+        self._lookup_sql = ("SELECT DISTINCT chunk_id FROM bands WHERE "
+                            + " OR ".join(["(band = ? AND bucket = ?)"] * self.bands) + f" LIMIT {self.max_candidates}")
+        self.session = {"checked": 0, "skipped": 0, "saved_chars": 0}
+        self._unsaved = {"skipped": 0, "saved_chars": 0}     # savings not yet added to the persisted totals
+        self._pending: Dict[str, Tuple[np.ndarray, List[int]]] = {}         # chunk_id -> (signature, buckets)
+        self._pending_buckets: Dict[Tuple[int, int], Dict[str, None]] = {}  # (band, bucket) -> chunk ids (ordered)
+
+
+    @classmethod
+    def for_collection(cls, state_dir: Optional[str], **kwargs) -> "NearDupIndex":
+        """Open the index kept inside a collection's state directory (in-memory if `state_dir` is None)."""
+        return cls(os.path.join(state_dir, cls.FILENAME) if state_dir else None, **kwargs)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._count_locked()
+
+    def _count_locked(self) -> int:
+        persisted = self._conn.execute("SELECT COUNT(*) FROM signatures").fetchone()[0]
+        return persisted + sum(1 for chunk_id in self._pending if not self._persisted_locked(chunk_id))
+
+    def _persisted_locked(self, chunk_id: str) -> bool:
+        return self._conn.execute("SELECT 1 FROM signatures WHERE chunk_id = ?", (chunk_id,)).fetchone() is not None
+
+
+    def _meta(self, key: str, default: str = "0") -> str:
+        row = self._conn.execute("SELECT value FROM index_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_meta(self, key: str, value) -> None:
+        self._conn.execute("INSERT OR REPLACE INTO index_meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    @property
+    def bootstrapped(self) -> bool:
+        """True once the index is known to mirror its collection (fresh collection or one-time scan done)."""
+        with self._lock:
+            return self._meta("bootstrapped") == "1"
+
+    def mark_bootstrapped(self) -> None:
+        with self._lock:
+            self._set_meta("bootstrapped", 1)
+            self._conn.commit()
+
+
+    # -------------------------
+    # Signatures
+    # -------------------------
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """MinHash signature of `text` (None when it has fewer than `min_tokens` words)."""
+        if len(_TOKEN_RE.findall((text or "").lower())) < max(self.min_tokens, 1):
+            return None
+        return self.hasher.signature(shingle_hashes(text, self.shingle))
+
+    def _buckets(self, sig: np.ndarray) -> List[int]:
+        r = self.rows
+        return [int.from_bytes(hashlib.blake2b(sig[b * r:(b + 1) * r].tobytes(), digest_size=8).digest(), "little", signed=True)
+                for b in range(self.bands)]
+
+    def _find_locked(self, sig: np.ndarray, buckets: List[int], exclude: Optional[str] = None,
+                     ignore: Collection[str] = ()) -> Optional[str]:
+        params = [v for band, bucket in enumerate(buckets) for v in (band, bucket)]
+        candidates = [row[0] for row in self._conn.execute(self._lookup_sql, params)
+                      if row[0] != exclude and row[0] not in ignore and row[0] not in self._pending]
+        pending = [chunk_id for chunk_id in dict.fromkeys(
+                       c for band, bucket in enumerate(buckets) for c in self._pending_buckets.get((band, bucket), ()))
+                   if chunk_id != exclude and chunk_id not in ignore][:self.max_candidates]
+        best, best_sim = None, self.threshold
+        if candidates:
+            marks = ",".join("?" * len(candidates))
+            for chunk_id, blob in self._conn.execute(f"SELECT chunk_id, minhash FROM signatures WHERE chunk_id IN ({marks})", candidates):
+                sim = float(np.mean(np.frombuffer(blob, dtype=np.uint32) == sig))
+                if sim >= best_sim:
+                    best, best_sim = chunk_id, sim
+        for chunk_id in pending:
+            sim = float(np.mean(self._pending[chunk_id][0] == sig))
+            if sim >= best_sim:
+                best, best_sim = chunk_id, sim
+        return best
+
+    def _insert_locked(self, chunk_id: str, sig: np.ndarray, buckets: List[int]) -> None:
+        self._conn.execute("INSERT OR REPLACE INTO signatures (chunk_id, minhash) VALUES (?, ?)", (chunk_id, sig.tobytes()))
+        self._conn.executemany("INSERT OR IGNORE INTO bands (band, bucket, chunk_id) VALUES (?, ?, ?)",
+                               [(band, bucket, chunk_id) for band, bucket in enumerate(buckets)])
+
+    def _add_pending_locked(self, chunk_id: str, sig: np.ndarray, buckets: List[int]) -> None:
+        self._pop_pending_locked(chunk_id)
+        self._pending[chunk_id] = (sig, buckets)
+        for band, bucket in enumerate(buckets):
+            self._pending_buckets.setdefault((band, bucket), {})[chunk_id] = None
+
+    def _pop_pending_locked(self, chunk_id: str) -> Optional[Tuple[np.ndarray, List[int]]]:
+        entry = self._pending.pop(chunk_id, None)
+        if entry is not None:
+            for band, bucket in enumerate(entry[1]):
+                ids = self._pending_buckets.get((band, bucket))
+                if ids is not None:
+                    ids.pop(chunk_id, None)
+                    if not ids:
+                        del self._pending_buckets[(band, bucket)]
+        return entry
+
+
+    # -------------------------
+    # Lookups / writes
+    # -------------------------
+    def find(self, text: str) -> Optional[str]:
+        """Chunk id of an indexed (or recorded) near-duplicate of `text`, if any."""
+        sig = self.signature(text)
+        if sig is None:
+            return None
+        with self._lock:
+            return self._find_locked(sig, self._buckets(sig))
+
+    def check(self, chunk_id: str, text: str, ignore: Collection[str] = ()) -> Optional[str]:
+        """
+        Return the chunk id `text` near-duplicates (and count the chunk as skipped), or None after recording the
+        chunk's signature as pending (so later chunks of the same run are compared against it too).
+        Chunks in `ignore` are not matched (e.g. the chunks of an older version of the same document).
+        """
+        sig = self.signature(text)
+        buckets = self._buckets(sig) if sig is not None else None
+        with self._lock:
+            self.session["checked"] += 1
+            if sig is None:
+                return None
+            match = self._find_locked(sig, buckets, exclude=chunk_id, ignore=ignore)
+            if match is not None:
+                for counters in (self.session, self._unsaved):
+                    counters["skipped"] += 1
+                    counters["saved_chars"] += len(text)
+                return match
+            self._add_pending_locked(chunk_id, sig, buckets)
+            return None
+
+    def commit(self, chunk_ids: Optional[Sequence[str]] = None) -> None:
+        """
+        Persist the pending signatures of `chunk_ids` (chunks that are now stored; None: every pending signature)
+        and the savings counters. Signatures of other in-flight batches stay pending.
+        """
+        with self._lock:
+            for chunk_id in (list(self._pending) if chunk_ids is None else chunk_ids):
+                entry = self._pop_pending_locked(chunk_id)
+                if entry is not None:
+                    self._insert_locked(chunk_id, *entry)
+            for key, value in self._unsaved.items():
+                self._set_meta(key, int(self._meta(key)) + value)
+                self._unsaved[key] = 0
+            self._conn.commit()
+
+    def discard(self, chunk_ids: Sequence[str]) -> int:
+        """
+        Remove the signatures of `chunk_ids` (pending or persisted). Returns how many were known.
+        Only persisted rows are deleted in SQLite, so committing here never persists another batch's pending signatures.
+        """
+        chunk_ids = list(chunk_ids)
+        if not chunk_ids:
+            return 0
+        with self._lock:
+            removed = 0
+            for chunk_id in chunk_ids:
+                pending = self._pop_pending_locked(chunk_id) is not None
+                row = self._conn.execute("SELECT minhash FROM signatures WHERE chunk_id = ?", (chunk_id,)).fetchone()
+                if row is None:
+                    removed += int(pending)
+                    continue
+                buckets = self._buckets(np.frombuffer(row[0], dtype=np.uint32))
+                self._conn.executemany("DELETE FROM bands WHERE band = ? AND bucket = ? AND chunk_id = ?",
+                                       [(band, bucket, chunk_id) for band, bucket in enumerate(buckets)])
+                self._conn.execute("DELETE FROM signatures WHERE chunk_id = ?", (chunk_id,))
+                removed += 1
+            self._conn.commit()
+        return removed
+
+    def clear(self) -> None:
+        """Forget every signature and counter, e.g. after the collection was deleted/rebuilt."""
+        with self._lock:
+            for table in ("signatures", "bands", "index_meta"):
+                self._conn.execute(f"DELETE FROM {table}")
+            self._conn.commit()
+            self._pending.clear()
+            self._pending_buckets.clear()
+            self.session = {"checked": 0, "skipped": 0, "saved_chars": 0}
+            self._unsaved = {"skipped": 0, "saved_chars": 0}
+
+
+    def bootstrap_from_collection(self, col, page_size: int = 2000) -> int:
+        """
+        One-time migration for collections indexed before the near-duplicate index existed:
+        page through the collection's documents and record their signatures. Returns the number of chunks seen.
+        """
+        loaded = 0
+        offset = 0
+        while True:
+            page = col.get(include=["documents"], limit=page_size, offset=offset)
+            ids = page.get("ids", []) if isinstance(page, dict) else []
+            if not ids:
+                break
+            for chunk_id, text in zip(ids, page.get("documents") or [""] * len(ids)):
+                sig = self.signature(text or "")
+                if sig is not None:
+                    with self._lock:
+                        self._insert_locked(chunk_id, sig, self._buckets(sig))
+            loaded += len(ids)
+            if len(ids) < page_size:
+                break
+            offset += page_size
+        self.commit()
+        self.mark_bootstrapped()
+        return loaded
+
+
+    def stats(self, vector_dim: Optional[int] = None) -> Dict[str, int]:
+        """
+        Savings of this session (`skipped`, `saved_chars`) and of the collection's lifetime (`total_*`).
+        With `vector_dim`, `saved_vector_bytes` estimates the float32 embedding storage that was not written.
+        """
+        with self._lock:
+            out = {
+                "signatures": self._count_locked(),
+                "checked": self.session["checked"],
+                "skipped": self.session["skipped"],
+                "saved_chars": self.session["saved_chars"],
+                "total_skipped": int(self._meta("skipped")) + self._unsaved["skipped"],
+                "total_saved_chars": int(self._meta("saved_chars")) + self._unsaved["saved_chars"],
+            }
+        if vector_dim:
+            out["saved_vector_bytes"] = out["skipped"] * int(vector_dim) * 4
+        return out
+
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
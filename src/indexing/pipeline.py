@@ -0,0 +1,496 @@
+"""
+Pipelined multi-stage indexing engine for XRAG+.
+
+`ChromaIndexer.index_documents` reads, chunks, embeds and upserts one step after another on a
+single thread. `IndexingPipeline` runs the same steps as concurrent stages connected by bounded
+queues, so JSON decoding, chunking, embedding and Chroma writes overlap:
+
+    reader (thread)  ->  chunkers (spawned process pool, `workers`)  ->  embedder (thread)  ->  writer (thread)
+
+- reader   : pulls docs from the input iterator (JSON decoding happens here), drops documents whose content hash
+             is unchanged (DOC_STATE_ENABLED, see doc_state.py) and groups the others into tasks
+- chunkers : `chunk_document` + `build_chunk_batch` in worker processes (checksums computed there too; changed
+             documents are chunked paragraph by paragraph; chunk cache hits are not re-chunked); chunks travel
+             between stages as columnar `ChunkBatch`es, metadata dicts are only built by the writer
+- embedder : keeps the chunks a changed document already owns, dedups against the per-collection checksum store
+             (and near-duplicate index) and embeds per (language, source) group
+- writer   : the only stage that talks to Chroma for writes; upserts, updates the checksum store and, once all new
+             chunks of a document are written, deletes its stale chunks and records it (`finish_doc_update`)
+
+Every queue is bounded (`PIPELINE_QUEUE_SIZE`) and the chunk stage keeps at most `2 * workers` tasks
+in flight, so a slow stage applies backpressure to the ones before it instead of buffering the corpus.
+Per-stage throughput is logged at the end of `run()` and returned in its summary.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import collections
+import functools
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+
+from src.chunker.chunk_batch import ChunkBatch
+from src.chunker.chunkers import iter_paragraph_chunks
+from .doc_state import DocUpdate
+from .indexer import (
+    ChromaIndexer, chunk_document, iter_document_chunks, build_chunk_batch, chunk_batch_ids, chunk_batch_metadatas,
+    document_meta,
+)
+
+logger = logging.getLogger("xr.indexer")
+
+_DONE = object()    # end-of-stream marker passed down the queues
+
+
+
+@dataclass
+class StageStats:
+    """Throughput counters of one pipeline stage."""
+    name: str
+    unit: str
+    items: int = 0
+    busy_seconds: float = 0.0
+    wall_seconds: float = 0.0
+
+    def rate(self) -> float:
+        """Items per second over the stage's wall-clock lifetime."""
+        return self.items / self.wall_seconds if self.wall_seconds > 0 else 0.0
+
+    def utilization(self) -> float:
+        """Fraction of the stage's lifetime spent working (not waiting on its queues)."""
+        return self.busy_seconds / self.wall_seconds if self.wall_seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "items": self.items,
+            "unit": self.unit,
+            "per_sec": round(self.rate(), 2),
+            "busy_seconds": round(self.busy_seconds, 2),
+            "utilization": round(self.utilization(), 3),
+        }
+
+
+
+def _chunk_task(docs: List[Dict[str, Any]], chunking_method: str, max_chars: int, overlap_sentences: int,
+                language: Optional[str], by_paragraph: Optional[Sequence[bool]] = None, cache_dir: Optional[str] = None,
+                language_field: str = "language", source_field: str = "source", doc_fields: Optional[Dict[str, str]] = None
+                ) -> Tuple[float, List[Tuple[str, str, ChunkBatch, List[int]]]]:
+    """
+    Worker-process body of the chunk stage (docs flagged in `by_paragraph` are chunked paragraph by paragraph,
+    chunks are read from / stored in the chunk cache at `cache_dir` when given). Documents are grouped by
+    `language_field` / `source_field`; `doc_fields` (text_field, id_field, title_field, date_field) name the
+    fields their text and chunk metadata are read from, as in `ChromaIndexer.index_documents`.
+    Returns (seconds spent, [(lang, src, batch, rows) per (language, source) group, chunks in input order]),
+    rows[r] being the position in `docs` of the document of batch row r (one entry per chunk, not per document).
+    """
+    started = time.monotonic()
+    doc_fields = doc_fields or {}
+    text_field = doc_fields.get("text_field", "text")
+    out: Dict[Tuple[str, str], Tuple[ChunkBatch, List[int]]] = {}
+    for pos, doc in enumerate(docs):
+        raw_text = doc.get(text_field, "") or doc.get("context", "")
+        if not raw_text:
+            continue
+        lang = doc.get(language_field, "") or language
+        src = doc.get(source_field, "") or ""
+        try:
+            if by_paragraph and by_paragraph[pos]:
+                chunks = list(iter_paragraph_chunks(doc, functools.partial(
+                    iter_document_chunks, chunking_method=chunking_method, max_chars=max_chars,
+                    overlap_sentences=overlap_sentences, views=True, cache_dir=cache_dir)))
+            else:
+                chunks = chunk_document(doc, chunking_method, max_chars, overlap_sentences, views=True, cache_dir=cache_dir)
+        except Exception as e:
+            logger.warning(f"Chunking failed for doc {doc.get('doc_id')} (lang={lang}): {e}")
+            chunks = [(raw_text, {})]
+        batch, rows = out.get((lang, src)) or (None, [])
+        batch = build_chunk_batch(doc, chunks, lang, src, batch=batch, **doc_fields)
+        rows.extend([pos] * (len(batch.doc_metas) - len(rows)))
+        out[(lang, src)] = (batch, rows)
+    return time.monotonic() - started, [(lang, src, batch, rows) for (lang, src), (batch, rows) in out.items()]
+
+
+
+class IndexingPipeline:
+    """
+    Staged, backpressured indexing into Chroma on top of a `ChromaIndexer`.
+
+    - indexer: provides providers, collections, checksum stores and upserts (its settings are used)
+    - chunking_method: one of the indexer's chunking methods (collections are named after it)
+    - workers: number of chunking processes
+    - doc_batch_size: docs per reader buffer; split evenly into `workers` chunking tasks
+    - language: fallback language for docs without a language field
+    - rebuild: delete and recreate every touched collection once, on first sight
+    - language_field, source_field, text_field, id_field, title_field, date_field: document field names, as in
+      `ChromaIndexer.index_documents`
+    """
+    def __init__(self, indexer: ChromaIndexer, chunking_method: str = "context_aware_chunking", workers: int = 2,
+                 doc_batch_size: int = 256, language: Optional[str] = None, rebuild: bool = False,
+                 language_field: str = "language", source_field: str = "source", text_field: str = "text",
+                 id_field: str = "id", title_field: str = "title", date_field: str = "date_publish"):
+        if chunking_method == "model_token_chunking":
+            raise ValueError("model_token_chunking is sized by each group's embedding model; use ChromaIndexer.index_documents")
+        self.indexer = indexer
+        self.settings = indexer.settings
+        self.chunking_method = chunking_method
+        self.workers = max(1, int(workers))
+        self.task_size = max(1, int(doc_batch_size) // self.workers)
+        self.language = language
+        self.rebuild = rebuild
+        self.language_field = language_field
+        self.source_field = source_field
+        self.doc_fields = {"text_field": text_field, "id_field": id_field, "title_field": title_field, "date_field": date_field}
+
+        self.queue_size = getattr(self.settings, "PIPELINE_QUEUE_SIZE", 8)
+        self.embed_batch_size = getattr(self.settings, "PIPELINE_EMBED_BATCH_SIZE", 64)
+
+        self._stop = threading.Event()
+        self._errors: List[BaseException] = []
+        self._groups: Dict[Tuple[str, str], Tuple[Any, Any, Any, Any, Any]] = {}    # (lang, src) -> (provider, col, store, near_dup, doc_state)
+        self._groups_lock = threading.Lock()
+        self._adopt: Dict[Tuple[str, str], bool] = {}
+        self._signature = indexer.chunking_signature(chunking_method)
+        self._pending = set()       # checksums handed to the writer but not yet stored
+        self._pending_lock = threading.Lock()
+        self.stats = {
+            "reader": StageStats("reader", "docs"),
+            "chunk": StageStats("chunk", "docs"),
+            "embed": StageStats("embed", "chunks"),
+            "write": StageStats("write", "chunks"),
+        }
+        self.skipped = 0
+        self.near_duplicates = 0
+        self.unchanged_docs = 0
+        self.changed_docs = 0
+        self.kept_chunks = 0
+        self.deleted_chunks = 0
+
+
+    # -------------------------
+    # Queue helpers (abort-aware so a failing stage never deadlocks the others)
+    # -------------------------
+    def _put(self, q: "queue.Queue", item: Any) -> None:
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def _get(self, q: "queue.Queue") -> Any:
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=0.5)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _run_stage(self, name: str, target, *args) -> threading.Thread:
+        def body():
+            started = time.monotonic()
+            try:
+                target(*args)
+            except BaseException as e:
+                logger.exception("Indexing pipeline stage '%s' failed: %s", name, e)
+                self._errors.append(e)
+                self._stop.set()
+            finally:
+                self.stats[name].wall_seconds = time.monotonic() - started
+        t = threading.Thread(target=body, name=f"xrag-index-{name}", daemon=True)
+        t.start()
+        return t
+
+
+    # -------------------------
+    # Stages
+    # -------------------------
+    def _plan(self, doc: Dict[str, Any]) -> Tuple[bool, Optional[Tuple[Tuple[str, str], DocUpdate]]]:
+        """(index the doc?, (group key, DocUpdate)) against the doc state of its collection (None when disabled)."""
+        raw_text = doc.get(self.doc_fields["text_field"], "") or doc.get("context", "")
+        if not raw_text:
+            return True, None
+        key = (doc.get(self.language_field, "") or self.language, doc.get(self.source_field, "") or "")
+        doc_state = self._group(*key)[4]
+        if doc_state is None:
+            return True, None
+        upd = self.indexer.plan_doc_update(doc_state, doc, document_meta(doc, *key, **self.doc_fields), raw_text,
+                                           self._signature, id_field=self.doc_fields["id_field"], adopt=self._adopt[key])
+        if upd is None:
+            self.unchanged_docs += 1
+            return False, None
+        self.changed_docs += upd.by_paragraph
+        return True, (key, upd)
+
+    def _reader(self, docs: Iterable[Dict[str, Any]], out_q: "queue.Queue") -> None:
+        stats = self.stats["reader"]
+        incremental = getattr(self.settings, "DOC_STATE_ENABLED", False)
+        task: List[Dict[str, Any]] = []
+        updates: List[Optional[Tuple[Tuple[str, str], DocUpdate]]] = []      # per doc of the task
+        t0 = time.monotonic()
+        for doc in docs:
+            if self._stop.is_set():
+                return
+            stats.items += 1
+            if incremental:
+                index, upd = self._plan(doc)
+                if not index:
+                    continue
+                updates.append(upd)
+            task.append(doc)
+            if len(task) >= self.task_size:
+                stats.busy_seconds += time.monotonic() - t0
+                self._put(out_q, (task, updates if incremental else None))
+                task, updates = [], []
+                t0 = time.monotonic()
+        stats.busy_seconds += time.monotonic() - t0
+        if task:
+            self._put(out_q, (task, updates if incremental else None))
+        self._put(out_q, _DONE)
+
+
+    def _chunker(self, pool: ProcessPoolExecutor, in_q: "queue.Queue", out_q: "queue.Queue") -> None:
+        stats = self.stats["chunk"]
+        max_chars = self.settings.CHUNK_MAX_CHARS
+        overlap = self.settings.CHUNK_OVERLAP_SENTENCES
+        cache_dir = self.indexer.chunk_cache_dir()
+        in_flight = collections.deque()     # (future, n_docs, doc updates), kept in submission order
+
+        def _drain_one():
+            fut, n_docs, updates = in_flight.popleft()
+            seconds, result = fut.result()
+            stats.items += n_docs
+            stats.busy_seconds += seconds / self.workers     # utilization of the whole pool
+            self._put(out_q, (result, updates))
+
+        while True:
+            item = self._get(in_q)
+            if item is _DONE:
+                break
+            task, updates = item
+            by_paragraph = [u is not None and u[1].by_paragraph for u in updates] if updates else None
+            in_flight.append((
+                pool.submit(_chunk_task, task, self.chunking_method, max_chars, overlap, self.language, by_paragraph,
+                            cache_dir, self.language_field, self.source_field, self.doc_fields),
+                len(task), updates,
+            ))
+            # backpressure: bounded number of tasks in the pool
+            while len(in_flight) >= 2 * self.workers:
+                _drain_one()
+        while in_flight and not self._stop.is_set():
+            _drain_one()
+        self._put(out_q, _DONE)
+
+
+    def _group(self, lang: str, src: str) -> Tuple[Any, Any, Any, Any, Any]:
+        key = (lang, src)
+        with self._groups_lock:     # the reader, embedder and writer all resolve groups
+            if key not in self._groups:
+                provider = self.indexer.resolve_provider(lang)
+                col = self.indexer.prepare_collection(lang, src, provider, self.chunking_method, rebuild=self.rebuild)
+                store = self.indexer._get_checksum_store(col)
+                near_dup = self.indexer._get_near_dup_index(col)
+                doc_state = self.indexer._get_doc_state(col)
+                self._adopt[key] = doc_state is not None and not doc_state.bootstrapped
+                logger.info("Pipeline group ready: language=%s source=%s collection=%s (existing checksums=%d)",
+                            lang, src, col.name, len(store))
+                self._groups[key] = (provider, col, store, near_dup, doc_state)
+            return self._groups[key]
+
+
+    def _embedder(self, in_q: "queue.Queue", out_q: "queue.Queue") -> None:
+        stats = self.stats["embed"]
+        buffers: Dict[Tuple[str, str], ChunkBatch] = {}
+        buffer_updates: Dict[Tuple[str, str], List[Optional[DocUpdate]]] = {}     # DocUpdate of every buffered row
+
+        def _flush(key):
+            batch = buffers.pop(key, None)
+            row_updates = buffer_updates.pop(key, [])
+            if not batch:
+                return
+            provider, col, store, near_dup, _ = self._group(*key)
+            texts = batch.texts()
+            t0 = time.monotonic()
+            try:
+                embeddings = provider.embed_documents(texts)
+            except Exception as e:
+                logger.warning(f"Embedding failed for batch of {len(texts)} [Language={key[0]}, Source={key[1]}]: {e}")
+                with self._pending_lock:
+                    self._pending.difference_update(batch.checksums)
+                if near_dup is not None:
+                    near_dup.discard(chunk_batch_ids(batch))
+                # the writer settles the documents of the lost rows
+                if any(u is not None for u in row_updates):
+                    self._put(out_q, (key, batch, None, None, row_updates, []))
+                return
+            finally:
+                stats.busy_seconds += time.monotonic() - t0
+            stats.items += len(batch)
+            self._put(out_q, (key, batch, texts, embeddings, row_updates, []))
+
+        while True:
+            item = self._get(in_q)
+            if item is _DONE:
+                break
+            result, updates = item
+            for lang, src, batch, rows in result:
+                _, _, store, near_dup, doc_state = self._group(lang, src)
+                ids = chunk_batch_ids(batch) if near_dup is not None or updates else None
+                keep = []
+                keep_updates = []
+                for i, checksum in enumerate(batch.checksums):
+                    upd = updates[rows[batch.doc[i]]][1] if updates and updates[rows[batch.doc[i]]] else None
+                    if upd is not None:
+                        kept_id = upd.keep(checksum)
+                        if kept_id is not None:
+                            self.kept_chunks += 1
+                            if upd.by_paragraph:
+                                upd.kept_metas.append((kept_id, batch.metadata(i, "chunk_index", "checksum")))
+                            continue
+                    with self._pending_lock:
+                        duplicate = checksum in store or checksum in self._pending
+                    if duplicate:
+                        self.skipped += 1
+                        if upd is not None:
+                            if upd.adopt:
+                                upd.candidates[ids[i]] = checksum
+                            # the chunk is stored by another document: keep it while this one needs it
+                            upd.refs.add(checksum)
+                            doc_state.add_ref(upd.key, checksum)
+                        continue
+                    # only this thread adds to _pending, so the checksum cannot appear there meanwhile;
+                    # an edited chunk near-duplicates its own stale version, which is about to be deleted
+                    if near_dup is not None and near_dup.check(ids[i], batch.text(i),
+                                                               ignore=upd.prev if upd is not None else ()):
+                        self.near_duplicates += 1
+                        continue
+                    with self._pending_lock:
+                        self._pending.add(checksum)
+                    keep.append(i)
+                    keep_updates.append(upd)
+                    if upd is not None:
+                        upd.outstanding += 1
+                buffers.setdefault((lang, src), ChunkBatch()).extend(batch, keep)
+                buffer_updates.setdefault((lang, src), []).extend(keep_updates)
+            # seal the task's documents before any of their rows reaches the writer: from here on only the
+            # writer settles them; documents with nothing left to write are finished by the writer right away
+            finished: Dict[Tuple[str, str], List[DocUpdate]] = {}
+            for key, upd in filter(None, updates or ()):
+                upd.sealed = True
+                if upd.done:
+                    finished.setdefault(key, []).append(upd)
+            for key, done in finished.items():
+                self._put(out_q, (key, None, None, None, [], done))
+            for key in [key for key, buf in buffers.items() if len(buf) >= self.embed_batch_size]:
+                _flush(key)
+        for key in list(buffers):
+            _flush(key)
+        self._put(out_q, _DONE)
+
+
+    def _writer(self, in_q: "queue.Queue") -> None:
+        stats = self.stats["write"]
+        while True:
+            item = self._get(in_q)
+            if item is _DONE:
+                break
+            key, batch, texts, embeddings, row_updates, finished = item
+            _, col, store, near_dup, doc_state = self._group(*key)
+            t0 = time.monotonic()
+            if batch is not None:
+                checksums = batch.checksums
+                ids = chunk_batch_ids(batch)
+                ok = False
+                try:
+                    if embeddings is not None:
+                        self.indexer.upsert_batch(col, texts, chunk_batch_metadatas(batch), ids, embeddings)
+                        store.add_many(checksums)
+                        if near_dup is not None:
+                            near_dup.commit(ids)
+                        stats.items += len(batch)
+                        ok = True
+                except Exception as e:
+                    logger.warning(f"Failed to upsert/add batch to Chroma [Language={key[0]}, Source={key[1]}]: {e}")
+                    if near_dup is not None:
+                        near_dup.discard(ids)
+                finally:
+                    with self._pending_lock:
+                        self._pending.difference_update(checksums)
+                settled = {}
+                for i, upd in enumerate(row_updates):
+                    if upd is not None:
+                        upd.resolve([ids[i]], [checksums[i]], ok)
+                        settled[id(upd)] = upd
+                finished = list(finished) + [upd for upd in settled.values() if upd.done]
+            if finished:
+                for upd in finished:
+                    self.deleted_chunks += self.indexer.finish_doc_update(col, upd, doc_state, store, near_dup)
+                doc_state.commit()
+            stats.busy_seconds += time.monotonic() - t0
+
+
+    # -------------------------
+    # Entry point
+    # -------------------------
+    def run(self, docs: Iterable[Dict[str, Any]], persist: bool = True) -> Dict[str, Any]:
+        """
+        Index every document yielded by `docs` and return a summary with per-stage throughput.
+        Raises the first stage error (after all stages have stopped), if any.
+        """
+        started = time.monotonic()
+        doc_q: "queue.Queue" = queue.Queue(maxsize=self.queue_size)
+        chunk_q: "queue.Queue" = queue.Queue(maxsize=self.queue_size)
+        write_q: "queue.Queue" = queue.Queue(maxsize=self.queue_size)
+
+        # created here, before any stage thread runs; workers are spawned, not forked: forking a process whose
+        # reader / embedder (torch) / writer threads hold logging, sqlite or torch locks can deadlock the child
+        pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        try:
+            threads = [
+                self._run_stage("reader", self._reader, docs, doc_q),
+                self._run_stage("chunk", self._chunker, pool, doc_q, chunk_q),
+                self._run_stage("embed", self._embedder, chunk_q, write_q),
+                self._run_stage("write", self._writer, write_q),
+            ]
+            for t in threads:
+                t.join()
+        finally:
+            pool.shutdown(wait=not self._errors, cancel_futures=True)
+
+        if persist:
+            self.indexer.persist_client()
+
+        elapsed = time.monotonic() - started
+        summary = {
+            "indexed_chunks": self.stats["write"].items,
+            "skipped": self.skipped,
+            "near_duplicates": self.near_duplicates,
+            "docs": self.stats["reader"].items,
+            "elapsed_seconds": round(elapsed, 2),
+            "docs_per_sec": round(self.stats["reader"].items / elapsed, 2) if elapsed > 0 else 0.0,
+            "stages": {name: s.to_dict() for name, s in self.stats.items()},
+        }
+        for name, s in self.stats.items():
+            logger.info("[PIPELINE] %-6s %8d %-6s %9.1f/s  utilization=%.0f%%",
+                        name, s.items, s.unit, s.rate(), 100 * s.utilization())
+        if self.indexer._doc_states:
+            summary.update(unchanged_docs=self.unchanged_docs, changed_docs=self.changed_docs,
+                           kept_chunks=self.kept_chunks, deleted_chunks=self.deleted_chunks)
+            logger.info("[PIPELINE] incremental: unchanged docs=%d changed docs=%d kept chunks=%d deleted stale chunks=%d",
+                        self.unchanged_docs, self.changed_docs, self.kept_chunks, self.deleted_chunks)
+        if self.indexer._embedding_caches:
+            summary["embedding_cache"] = self.indexer.embedding_cache_stats()
+            for name, c in summary["embedding_cache"].items():
+                logger.info("[PIPELINE] embedding cache %s: hits=%d misses=%d hit_rate=%.1f%%",
+                            name, c["hits"], c["misses"], 100 * c["hit_rate"])
+        if self.indexer._near_dup_indexes:
+            summary["near_dup"] = self.indexer.near_dup_stats()
+            for name, nd in summary["near_dup"].items():
+                logger.info("[PIPELINE] near-dup %s: skipped=%d saved_chars=%d saved_vector_bytes=%d",
+                            name, nd["skipped"], nd["saved_chars"], nd.get("saved_vector_bytes", 0))
+        if self._errors:
+            raise self._errors[0]
+        return summary
@@ -1,7 +1,8 @@
 import json
 import logging
+import os
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 logger = logging.getLogger("index_all")
@@ -10,6 +11,14 @@ logger = logging.getLogger("index_all")
 
 
 
+def collection_state_dir(persist_directory: Optional[str], state_dirname: str, collection_name: str) -> Optional[str]:
+    """Directory holding the indexer's side-car state for a collection (None when Chroma is not persisted)."""
+    if not persist_directory:
+        return None
+    return os.path.join(persist_directory, state_dirname, collection_name)
+
+
+
 def is_ccnews_record(obj: dict) -> bool:
     return "text" in obj and "title" in obj and ("_global_idx" in obj or "url" in obj)
 
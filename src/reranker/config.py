@@ -7,7 +7,7 @@ You can replace this with environment-driven loading (e.g., pydantic, dynaconf)
 if you prefer.
 """
 from dataclasses import dataclass
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 
 
 
@@ -27,6 +27,11 @@ class Settings:
 
     TOP_K: int = 10    # Default top-k to return
 
+    # Docs are scored on their first token chunk, tokenized with the shared spaCy tokenizer of the doc's language
+    CHUNK_SIZE: int = 20
+    CHUNK_STRIDE: int = 5
+    CHUNK_LANGUAGES: Tuple[str, ...] = ("en",)     # preloaded by Reranker._lazy_load; the first is the fallback
+
     # Whether to min-max normalize cross-encoder raw scores
     NORMALIZE_SCORES: bool = False
 
@@ -40,5 +45,8 @@ class Settings:
             "JINA_LISTWISE_MAX_DOCS": self.JINA_LISTWISE_MAX_DOCS,
             "BATCH_SIZE": self.BATCH_SIZE,
             "TOP_K": self.TOP_K,
+            "CHUNK_SIZE": self.CHUNK_SIZE,
+            "CHUNK_STRIDE": self.CHUNK_STRIDE,
+            "CHUNK_LANGUAGES": self.CHUNK_LANGUAGES,
             "NORMALIZE_SCORES": self.NORMALIZE_SCORES,
         }
\ No newline at end of file
@@ -17,7 +17,7 @@ import logging
 from typing import List, Dict, Any, Optional
 import math
 
-from src.chunker.chunkers import TokenChunker, SlidingWindowChunker, SentenceChunker, ParagraphChunker, context_aware_chunking
+from src.chunker.registry import get_token_chunker, tokenizer_memory_report, warm as warm_chunkers
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
@@ -68,6 +68,14 @@ class Reranker:
         if self._loaded:
             return
 
+        # shared spaCy tokenizers/chunkers (process-wide, loaded once)
+        try:
+            warm_chunkers(self.settings.CHUNK_LANGUAGES, chunk_size=self.settings.CHUNK_SIZE, stride=self.settings.CHUNK_STRIDE)
+        except Exception as e:
+            logger.warning("Failed to preload chunk tokenizers for %s: %s", self.settings.CHUNK_LANGUAGES, e)
+        for name, stats in tokenizer_memory_report().items():
+            logger.info("Tokenizer %s: load %.2fs, RSS +%s bytes", name, stats["load_seconds"], stats["rss_bytes"])
+
         # Cross-encoder (pairwise)
         if self._HAS_CROSS_ENCODER and self._use_cross:
             try:
@@ -115,6 +123,17 @@ class Reranker:
             yield iterable[i : i + size]
 
 
+    def _first_chunks(self, docs: List[Dict[str, Any]]) -> List[str]:
+        """Text of each doc's first token chunk, tokenized with the shared chunker of the doc's language."""
+        texts = []
+        for d in docs:
+            chunker = get_token_chunker(d.get("language") or self.settings.CHUNK_LANGUAGES[0],
+                                        chunk_size=self.settings.CHUNK_SIZE, stride=self.settings.CHUNK_STRIDE)
+            chunks = chunker.chunk(d)
+            texts.append(chunks[0][0] if chunks else d["text"])
+        return texts
+
+
     @staticmethod
     def _minmax_normalize(values: List[float], eps: float = 1e-12) -> List[float]:
         if not values:
@@ -171,16 +190,8 @@ class Reranker:
         pairs = [(query, d["text"]) for d in docs]
         scores: List[float] = []
 
-        import spacy
-        chunker = TokenChunker(
-            tokenizer=spacy.load("en_core_web_sm", disable=["parser", "ner", "tagger"]),
-            chunk_size=20, 
-            stride=5
-        )
-        chunks = [chunker.chunk(d) for d in docs]
-    
         # pair_chunks = [(query, chunk_text) for chunk_text in chunks]
-        pair_chunks = [(query, chunk_text[0][0]) for chunk_text in chunks]
+        pair_chunks = [(query, chunk_text) for chunk_text in self._first_chunks(docs)]
 
         for chunk in self._batched_chunks(pair_chunks, batch_size):
             try:
@@ -213,18 +224,9 @@ class Reranker:
         # doc_texts = [d["text"] for d in docs]
         doc_embs = []
 
-        import spacy
-        chunker = TokenChunker(
-            tokenizer=spacy.load("en_core_web_sm", disable=["parser", "ner", "tagger"]),
-            chunk_size=20, 
-            stride=5
-        )
-        chunks = [chunker.chunk(d) for d in docs]
-    
-        # pair_chunks = [(query, chunk_text) for chunk_text in chunks]
-        pair_chunks = [(query, chunk_text) for chunk_text in chunks]
+        chunk_texts = self._first_chunks(docs)
 
-        for chunk in self._batched_chunks(pair_chunks, batch_size):
+        for chunk in self._batched_chunks(chunk_texts, batch_size):
             enc = self.mono_encoder.encode(chunk, convert_to_numpy=True, show_progress_bar=False)
             doc_embs.extend(enc)
 
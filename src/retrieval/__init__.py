@@ -4,10 +4,12 @@ XRAG+ Retrieval implemented with ChromaDB
 from src.retrieval.config import Settings
 from src.retrieval.chroma_client import ChromaManager
 from src.retrieval.retriever import Retriever
+from src.retrieval.query_embedder import QueryEmbedder
 
 
 __all__ = [
     "Settings",
     "ChromaManager",
-    "Retriever"
+    "Retriever",
+    "QueryEmbedder"
 ]
\ No newline at end of file
@@ -13,6 +13,24 @@ class Settings:
         default_factory=lambda: ["semantic", "keyword", "hybrid"]
     )
     CHROMA_PERSIST_DIR: str = "./.chroma_db"
+    # Indexer side-car state per collection (<CHROMA_PERSIST_DIR>/<INDEX_STATE_DIRNAME>/<collection>/), must match src/indexing
+    INDEX_STATE_DIRNAME: str = "xrag_index_state"
+
+    # Query embeddings cached per (provider, model, normalized query) - LRU size (0 disables)
+    QUERY_EMBEDDING_CACHE_SIZE: int = 4096
+
+    # Query embeddings sent to Chroma per `collection.query` call by Retriever.retrieve_batch
+    RETRIEVAL_BATCH_SIZE: int = 256
+
+    # Multi-collection search (retrieve_lang_specific / retrieve_embedding_specific): collections searched
+    # in parallel, and seconds after submitting the searches by which a collection must have answered, queued or
+    # running, or it is merged without (0 = no limit)
+    RETRIEVAL_MAX_CONCURRENCY: int = 8
+    RETRIEVAL_COLLECTION_TIMEOUT: float = 10.0
+
+    # Keyword retrieval: BM25 parameters of the per-collection inverted index built by the indexer
+    BM25_K1: float = 1.2
+    BM25_B: float = 0.75
 
     DEFAULT_EMBEDDING_MODEL: str = "all-MiniLM-L6-v2"
     DEFAULT_EMBEDDING_PROVIDER: str = "sentence_transformers"
@@ -61,6 +79,13 @@ class Settings:
         return {
             "RETRIEVAL_METHODS": self.RETRIEVAL_METHODS,
             "CHROMA_PERSIST_DIR": self.CHROMA_PERSIST_DIR,
+            "INDEX_STATE_DIRNAME": self.INDEX_STATE_DIRNAME,
+            "QUERY_EMBEDDING_CACHE_SIZE": self.QUERY_EMBEDDING_CACHE_SIZE,
+            "RETRIEVAL_BATCH_SIZE": self.RETRIEVAL_BATCH_SIZE,
+            "RETRIEVAL_MAX_CONCURRENCY": self.RETRIEVAL_MAX_CONCURRENCY,
+            "RETRIEVAL_COLLECTION_TIMEOUT": self.RETRIEVAL_COLLECTION_TIMEOUT,
+            "BM25_K1": self.BM25_K1,
+            "BM25_B": self.BM25_B,
             "DEFAULT_EMBEDDING_MODEL": self.DEFAULT_EMBEDDING_MODEL,
             "DEFAULT_EMBEDDING_PROVIDER": self.DEFAULT_EMBEDDING_PROVIDER,
             "SEMANTIC_CHUNKING_MODEL": self.SEMANTIC_CHUNKING_MODEL,
@@ -0,0 +1,89 @@
+"""
+Query embedding for retrieval: resident embedding models and an LRU cache of query vectors.
+
+`QueryEmbedder` takes its providers from the process-wide registry (`src.chunker.registry.get_embedding_provider`),
+so queries and indexing share one loaded instance per (provider, model). Query embeddings are cached keyed by
+(provider, model, normalized query text), so hybrid and multi-collection searches embed a query a single time.
+"""
+from collections import OrderedDict
+from typing import Dict, List, Sequence, Tuple
+import threading
+import unicodedata
+
+from src.chunker.registry import get_embedding_provider
+
+
+
+def normalize_query(query: str) -> str:
+    """Cache key text of a query: NFC-normalized, whitespace collapsed (case is kept, models are case-sensitive)."""
+    return " ".join(unicodedata.normalize("NFC", query or "").split())
+
+
+
+class QueryEmbedder:
+    """
+    LRU cache of query embeddings over the shared embedding providers.
+
+    - cache_size: max number of cached query vectors (0 disables the cache)
+    - Thread-safe: providers are loaded once per process by the registry, even under concurrent first use.
+    """
+    def __init__(self, cache_size: int = 4096):
+        self.cache_size = int(cache_size)
+        self._providers: Dict[Tuple[str, str], object] = {}
+        self._cache: "OrderedDict[Tuple[str, str, str], Tuple[float, ...]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+
+    def get_provider(self, provider: str, model_name: str):
+        """Return the shared provider of (provider, model), loading it on first use."""
+        key = (provider, model_name)
+        prov = self._providers.get(key)
+        if prov is None:
+            prov = self._providers.setdefault(key, get_embedding_provider(provider, model_name))
+        return prov
+
+
+    def embed(self, queries: Sequence[str], provider: str, model_name: str) -> List[List[float]]:
+        """
+        Embed queries with (provider, model). Cached vectors are reused; the misses (each distinct
+        normalized query once) are embedded in a single provider call.
+        """
+        keys = [(provider, model_name, normalize_query(q)) for q in queries]
+        found: Dict[Tuple[str, str, str], Tuple[float, ...]] = {}
+        with self._cache_lock:
+            for key in keys:
+                vec = self._cache.get(key)
+                if vec is not None:
+                    self._cache.move_to_end(key)
+                    found[key] = vec
+            hits = sum(1 for key in keys if key in found)
+            self.hits += hits
+            self.misses += len(keys) - hits
+
+        missing = list(dict.fromkeys(key for key in keys if key not in found))
+        if missing:
+            vectors = self.get_provider(provider, model_name).embed_documents([key[2] for key in missing])
+            if not isinstance(vectors, list) or len(vectors) != len(missing):
+                raise RuntimeError("Embedding function did not return embeddings for the query.")
+            with self._cache_lock:
+                for key, vec in zip(missing, vectors):
+                    found[key] = tuple(vec)
+                    if self.cache_size > 0:
+                        self._cache[key] = found[key]
+                        self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        return [list(found[key]) for key in keys]
+
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "cached": len(self._cache), "models": len(self._providers)}
+
+    def clear_cache(self) -> None:
+        with self._cache_lock:
+            self._cache.clear()
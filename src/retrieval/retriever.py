@@ -2,10 +2,17 @@
 """
 Retrieve from chroma collection using embedding similarity, keyword search, and hybrid methods.
 """
+from concurrent.futures import ThreadPoolExecutor, wait
 from typing import List, Dict, Optional, Tuple
 import logging
+import re
+import time
+
+import numpy as np
+
 from .chroma_client import ChromaManager
 from .config import Settings
+from .query_embedder import QueryEmbedder
 
 logger = logging.getLogger(__name__)
 
@@ -14,11 +21,14 @@ logger = logging.getLogger(__name__)
 
 class Retriever:
     """Retriever that is specific to a Language, uses LANG_EMBEDDING_MAP from Retriever Config to decide Embedding Model
-    according to the Language of the retriever."""
-    def __init__(self, settings: Settings = None, chroma_manager: ChromaManager = None, language: str = "en"):
+    according to the Language of the retriever.
+    Query embedding models stay loaded in `query_embedder` (pass one to share models/cache between Retrievers)."""
+    def __init__(self, settings: Settings = None, chroma_manager: ChromaManager = None, language: str = "en",
+                 query_embedder: Optional[QueryEmbedder] = None):
         self.settings = settings or Settings()
         self.chroma_manager = chroma_manager or ChromaManager(persist_directory=self.settings.CHROMA_PERSIST_DIR)
         self.language = language
+        self.query_embedder = query_embedder or QueryEmbedder(cache_size=self.settings.QUERY_EMBEDDING_CACHE_SIZE)
 
         lang_map = self.settings.LANG_EMBEDDING_MAP[self.language]  
         self.semantic_provider = None
@@ -31,6 +41,8 @@ class Retriever:
             self.semantic_provider = getattr(self.settings, "DEFAULT_EMBEDDING_PROVIDER", None)
             self.semantic_model_name = getattr(self.settings, "DEFAULT_EMBEDDING_MODEL", None)
 
+        self._bm25_indexes = {}     # collection name -> BM25Index (opened on first keyword query)
+
 
     def _merge_and_rank(self, results_list: List[Dict], prefer_source: Optional[str] = None,
                         boost: float = 0.18, top_k: int = 5) -> Dict:
@@ -132,56 +144,135 @@ class Retriever:
         }
 
 
+    def embed_query(self, query: str) -> List[float]:
+        """Embedding of a query with this retriever's model (loaded once, LRU-cached per normalized query)."""
+        return self.query_embedder.embed([query], self.semantic_provider, self.semantic_model_name)[0]
+
+
+    @staticmethod
+    def _empty_result() -> Dict:
+        return {"ids": [], "distances": [], "metadatas": [], "documents": []}
+
+
     def retrieve_semantic(self, collection_name: str, query: str, k: int = 5, where: Optional[Dict] = None) -> Dict:
         """
         Embedding-based retrieval. Returns dict with keys: ids, distances, metadatas, documents (each a list length <= k).
         """
+        return self._semantic_batch(collection_name, [query], k=k, where=where)[0]
+
+
+    def _semantic_batch(self, collection_name: str, queries: List[str], k: int = 5, where: Optional[Dict] = None) -> List[Dict]:
+        """Embed all queries in one pass and send them to Chroma `RETRIEVAL_BATCH_SIZE` query embeddings at a time."""
         col = self.chroma_manager.get_collection(collection_name)
 
-        # Embedding for the query
-        if self.semantic_provider == "sentence_transformers":
-            from src.indexing.embeddings import SentenceTransformersProvider
-            q_embs = SentenceTransformersProvider(self.semantic_model_name, device="cuda").embed_documents([query])
-        elif self.semantic_provider == "cohere":
-            from src.indexing.embeddings import CohereAIEmbeddingProvider
-            q_embs = CohereAIEmbeddingProvider(self.semantic_model_name).embed_documents([query])
-        elif self.semantic_provider == "openai":
-            from src.indexing.embeddings import OpenAIEmbeddingProvider
-            q_embs = OpenAIEmbeddingProvider(model=self.semantic_model_name).embed_documents([query])
-
-        if not isinstance(q_embs, list) or len(q_embs) == 0:
-            raise RuntimeError("Embedding function did not return embeddings for the query.")
-        q_emb = q_embs[0]
-
-        # query chroma
-        results = col.query(query_embeddings=[q_emb], n_results=k, where=where)
-
-        # normalize results (collection.query returns lists per query)
-        ids = results.get("ids", [[]])[0] if results.get("ids") else []
-        distances = results.get("distances", [[]])[0] if results.get("distances") else []
-        metadatas = results.get("metadatas", [[]])[0] if results.get("metadatas") else []
-        documents = results.get("documents", [[]])[0] if results.get("documents") else []
+        # Embeddings for the queries (resident model, cached per normalized query)
+        q_embs = self.query_embedder.embed(queries, self.semantic_provider, self.semantic_model_name)
+
+        out: List[Dict] = []
+        step = max(1, self.settings.RETRIEVAL_BATCH_SIZE)
+        for start in range(0, len(q_embs), step):
+            part = q_embs[start:start + step]
+            # query chroma
+            results = col.query(query_embeddings=part, n_results=k, where=where)
+
+            # normalize results (collection.query returns lists per query)
+            for i in range(len(part)):
+                out.append({
+                    "ids": results["ids"][i] if results.get("ids") else [],
+                    "distances": results["distances"][i] if results.get("distances") else [],
+                    "metadatas": results["metadatas"][i] if results.get("metadatas") else [],
+                    "documents": results["documents"][i] if results.get("documents") else [],
+                })
+        return out
 
-        return {
-            "ids": ids,
-            "distances": distances,
-            "metadatas": metadatas,
-            "documents": documents,
-        }
+
+    def _get_bm25_index(self, collection_name: str):
+        """BM25 index maintained by the indexer for a collection, or None if the collection has none (yet)."""
+        index = self._bm25_indexes.get(collection_name)
+        if index is None:
+            from src.indexing.bm25_index import BM25Index
+            from src.indexing.utils import collection_state_dir
+            state_dir = collection_state_dir(self.settings.CHROMA_PERSIST_DIR, self.settings.INDEX_STATE_DIRNAME, collection_name)
+            if not BM25Index.exists_for_collection(state_dir):
+                return None
+            index = BM25Index.for_collection(state_dir)
+            self._bm25_indexes[collection_name] = index
+        return index if index.bootstrapped else None
 
 
     def retrieve_keyword(self, collection_name: str, query: str, k: int = 5, where: Optional[Dict] = None,
                          require_all_terms: bool = False) -> Dict:
         """
-        Keyword retrieval
+        Keyword retrieval (BM25)
+        - Answers from the collection's persistent BM25 inverted index (built by the indexer): only the
+          postings of the query terms are read, the collection itself is only asked for the top-k rows.
+        - `where` filters on `source` / `language` (equality, $eq, $in, $and) are applied inside the index.
+        - Falls back to scanning the collection (`_retrieve_keyword_scan`) when there is no index or
+          the `where` clause uses other fields.
+        - Distances are 1 - score / max_score, like the scan.
+
+        Parameters:
+            require_all_terms: if True, only documents containing ALL query terms are considered.
+        """
+        return self._keyword_batch(collection_name, [query], k=k, where=where, require_all_terms=require_all_terms)[0]
+
+
+    def _keyword_batch(self, collection_name: str, queries: List[str], k: int = 5, where: Optional[Dict] = None,
+                       require_all_terms: bool = False) -> List[Dict]:
+        """BM25 search per query, then a single Chroma `get` for the top-k rows of every query."""
+        from src.indexing.bm25_index import where_to_filters
+
+        index = self._get_bm25_index(collection_name)
+        filters = where_to_filters(where)
+        if index is None or filters is None:
+            logger.debug("No usable BM25 index for %s (where=%s): scanning the collection", collection_name, where)
+            return self._keyword_scan_batch(collection_name, queries, k=k, where=where, require_all_terms=require_all_terms)
+
+        all_hits = [
+            index.search(q, k=k, filters=filters, require_all_terms=require_all_terms,
+                         k1=self.settings.BM25_K1, b=self.settings.BM25_B)
+            for q in queries
+        ]
+        wanted = list(dict.fromkeys(cid for hits in all_hits for cid, _ in hits))
+        by_id = {}
+        if wanted:
+            col = self.chroma_manager.get_collection(collection_name)
+            rows = col.get(ids=wanted, include=["documents", "metadatas"])
+            by_id = {
+                cid: (doc, meta)
+                for cid, doc, meta in zip(rows.get("ids", []), rows.get("documents", []), rows.get("metadatas", []))
+            }
+
+        out: List[Dict] = []
+        for hits in all_hits:
+            res = self._empty_result()
+            max_score = hits[0][1] if hits else 0.0
+            for cid, score in hits:
+                if cid not in by_id:        # deleted from Chroma behind the index's back
+                    continue
+                res["ids"].append(cid)
+                res["documents"].append(by_id[cid][0])
+                res["metadatas"].append(by_id[cid][1])
+                res["distances"].append(1.0 - (score / max_score) if max_score > 0 else 1.0)
+            out.append(res)
+        return out
+
+
+    def _retrieve_keyword_scan(self, collection_name: str, query: str, k: int = 5, where: Optional[Dict] = None,
+                               require_all_terms: bool = False) -> Dict:
+        """
+        Keyword retrieval without an index
         - simple substring/token matching + ranking
         - Fetches stored documents from Chroma (respecting `where` if provided via collection.get).
         - Scores documents by simple token/substring match count.
         - Returns top-k documents by score.
-
-        Parameters:
-            require_all_terms: if True, only documents containing ALL query terms are considered.
         """
+        return self._keyword_scan_batch(collection_name, [query], k=k, where=where, require_all_terms=require_all_terms)[0]
+
+
+    def _keyword_scan_batch(self, collection_name: str, queries: List[str], k: int = 5, where: Optional[Dict] = None,
+                            require_all_terms: bool = False) -> List[Dict]:
+        """Fetch the collection once and score every query against it."""
         col = self.chroma_manager.get_collection(collection_name)
 
         # Fetch stored docs (ids, documents, metadatas). `where` is honored if provided.
@@ -195,48 +286,52 @@ class Retriever:
         ids: List[str] = all_items.get("ids", [])
         docs: List[str] = all_items.get("documents", [])
         metas: List[Dict] = all_items.get("metadatas", [])
-
+        docs_lower = [(doc or "").lower() for doc in docs]
+
+        out: List[Dict] = []
+        for query in queries:
+            scores = self._keyword_scores(query, docs_lower, require_all_terms=require_all_terms)
+            # keep matching docs only, sorted by score descending
+            scores = [(score, idx) for idx, score in enumerate(scores) if score is not None and score > 0]
+            scores.sort(reverse=True, key=lambda x: x[0])
+            top = scores[:k]
+
+            # For keyword retrieval we don't have real distances; instead provide inverse of normalized score
+            max_score = max(s[0] for s in scores) if scores else 1
+            out.append({
+                "ids": [ids[idx] for (_, idx) in top],
+                "distances": [1.0 - (s / max_score) if max_score > 0 else 1.0 for (s, _) in top],
+                "metadatas": [metas[idx] for (_, idx) in top],
+                "documents": [docs[idx] for (_, idx) in top],
+            })
+        return out
+
+
+    @staticmethod
+    def _keyword_scores(query: str, docs_lower: List[str], require_all_terms: bool = False) -> List[Optional[int]]:
+        """
+        Token/substring match count of `query` in each (lowercased) doc, +2 if the exact phrase appears.
+        None marks docs excluded by `require_all_terms`.
+        """
         query_lower = query.lower().strip()
         # basic tokenization: split on whitespace and punctuation
-        import re
         tokens = [t for t in re.split(r"\W+", query_lower) if t]
 
-        scores: List[Tuple[int, int]] = []  # (score, idx)
-        for idx, doc in enumerate(docs):
-            doc_text = (doc or "").lower()
+        scores: List[Optional[int]] = []
+        for doc_text in docs_lower:
             # count occurrences of each token
             counts = [doc_text.count(tok) for tok in tokens] if tokens else [0]
-            # score is sum of counts (higher better)
-            score = sum(counts)
             if require_all_terms and any(c == 0 for c in counts):
                 # skip if not all tokens present
+                scores.append(None)
                 continue
+            # score is sum of counts (higher better)
+            score = sum(counts)
             # small heuristic: boost if exact phrase appears
             if tokens and query_lower in doc_text:
                 score += 2
-            if score > 0:
-                scores.append((score, idx))
-
-        # sort scores descending
-        scores.sort(reverse=True, key=lambda x: x[0])
-        top = scores[:k]
-
-        out_ids = [ids[idx] for (_, idx) in top]
-        out_docs = [docs[idx] for (_, idx) in top]
-        out_metas = [metas[idx] for (_, idx) in top]
-        # For keyword retrieval we don't have real distances; instead provide inverse of normalized score
-        if scores:
-            max_score = max(s[0] for s in scores)
-        else:
-            max_score = 1
-        out_distances = [1.0 - (s / max_score) if max_score > 0 else 1.0 for (s, _) in top]
-
-        return {
-            "ids": out_ids,
-            "distances": out_distances,
-            "metadatas": out_metas,
-            "documents": out_docs,
-        }
+            scores.append(score)
+        return scores
 
 
     def retrieve_hybrid(self, collection_name: str, query: str, k: int = 5, where: Optional[Dict] = None,
@@ -251,92 +346,56 @@ class Retriever:
 
         alpha: weight of semantic score in [0,1]. 1.0 => pure semantic, 0.0 => pure keyword.
         """
+        return self._hybrid_batch(collection_name, [query], k=k, where=where, alpha=alpha)[0]
+
+
+    def _hybrid_batch(self, collection_name: str, queries: List[str], k: int = 5, where: Optional[Dict] = None,
+                      alpha: float = 0.7) -> List[Dict]:
         # 1) get semantic results (we ask for more than k to allow keyword boost to reorder)
         sem_k = max(k * 3, k)  # fetch up to 3x to give keyword boosting room
-        sem_res = self.retrieve_semantic(collection_name, query, k=sem_k, where=where)
+        sem_results = self._semantic_batch(collection_name, queries, k=sem_k, where=where)
+        return [self._combine_hybrid(query, sem_res, k=k, alpha=alpha) for query, sem_res in zip(queries, sem_results)]
+
+
+    def _combine_hybrid(self, query: str, sem_res: Dict, k: int = 5, alpha: float = 0.7) -> Dict:
+        """Re-rank the semantic candidates of one query by alpha * semantic + (1 - alpha) * keyword score."""
         sem_ids = sem_res.get("ids", [])
         sem_docs = sem_res.get("documents", [])
         sem_metas = sem_res.get("metadatas", [])
         sem_dists = sem_res.get("distances", [])
+        if not sem_ids:
+            return self._empty_result()
 
-        # Convert distances -> semantic similarity in [0,1] (higher better).
-        # handle missing distances gracefully
-        sem_sims = []
+        n = len(sem_ids)
+        # Convert distances -> semantic similarity in [0,1] (higher better): sim = 1/(1+dist).
+        # handle missing distances gracefully: fallback to descending scores by rank
         if sem_dists:
-            # distances are non-negative; smaller is better. convert to sim = 1/(1+dist)
-            for d in sem_dists:
+            dists = np.full(n, np.inf)      # unparsable distance -> similarity 0
+            for i, d in enumerate(sem_dists[:n]):
                 try:
-                    sim = 1.0 / (1.0 + float(d))
-                except Exception:
-                    sim = 0.0
-                sem_sims.append(sim)
+                    dists[i] = float(d)
+                except (TypeError, ValueError):
+                    pass
+            sem_sims = 1.0 / (1.0 + dists)
         else:
-            # fallback: assign descending scores by rank
-            for rank in range(len(sem_ids)):
-                sem_sims.append(1.0 - (rank / max(1, len(sem_ids) - 1)))
-
-        # 2) compute keyword scores for the semantic candidate set (faster than whole DB)
-        # Build a map id -> doc text / meta
-        id_to_doc = {i: d for i, d in zip(sem_ids, sem_docs)}
-        id_to_meta = {i: m for i, m in zip(sem_ids, sem_metas)}
-
-        # keyword scoring same as in retrieve_keyword but restricted to sem candidates
-        import re
-        q_lower = query.lower().strip()
-        tokens = [t for t in re.split(r"\W+", q_lower) if t]
-
-        keyword_scores = {}
-        max_count = 0
-        for idx, doc in id_to_doc.items():
-            doc_text = (doc or "").lower()
-            counts = [doc_text.count(tok) for tok in tokens] if tokens else [0]
-            score = sum(counts)
-            if tokens and q_lower in doc_text:
-                score += 2
-            keyword_scores[idx] = score
-            if score > max_count:
-                max_count = score
-
-        # Normalize keyword scores to [0,1]
-        if max_count <= 0:
-            # none matched; all zero
-            norm_keyword = {i: 0.0 for i in id_to_doc.keys()}
-        else:
-            norm_keyword = {i: (keyword_scores.get(i, 0) / max_count) for i in id_to_doc.keys()}
-
-        # 3) combine scores and rank
-        combined_list = []
-        for pos, doc_id in enumerate(sem_ids):
-            sem_score = sem_sims[pos] if pos < len(sem_sims) else 0.0
-            kw_score = norm_keyword.get(doc_id, 0.0)
-            combined = alpha * sem_score + (1.0 - alpha) * kw_score
-            combined_list.append((combined, doc_id, sem_score, kw_score, id_to_doc.get(doc_id), id_to_meta.get(doc_id)))
-
-        # Sort by combined score descending and take top-k
-        combined_list.sort(reverse=True, key=lambda x: x[0])
-        top = combined_list[:k]
-
-        out_ids = [item[1] for item in top]
-        out_documents = [item[4] for item in top]
-        out_metadatas = [item[5] for item in top]
-        # we provide semantic distance where possible (converted back from sim approx): d = (1/sim) - 1
-        out_distances = []
-        for item in top:
-            sem_score = item[2]
-            if sem_score > 0:
-                try:
-                    d = (1.0 / sem_score) - 1.0
-                except Exception:
-                    d = None
-            else:
-                d = None
-            out_distances.append(d)
+            sem_sims = 1.0 - np.arange(n) / max(1, n - 1)
+
+        # 2) compute keyword scores for the semantic candidate set (faster than whole DB), normalized to [0,1]
+        kw = np.zeros(n)
+        kw[:min(n, len(sem_docs))] = self._keyword_scores(query, [(d or "").lower() for d in sem_docs[:n]])
+        max_count = kw.max()
+        norm_keyword = kw / max_count if max_count > 0 else kw
 
+        # 3) combine scores and rank (stable: ties keep the semantic order)
+        combined = alpha * sem_sims + (1.0 - alpha) * norm_keyword
+        top = np.argsort(-combined, kind="stable")[:k]
+
+        # we provide semantic distance where possible (converted back from sim approx): d = (1/sim) - 1
         return {
-            "ids": out_ids,
-            "distances": out_distances,
-            "metadatas": out_metadatas,
-            "documents": out_documents,
+            "ids": [sem_ids[i] for i in top],
+            "distances": [(1.0 / sem_sims[i]) - 1.0 if sem_sims[i] > 0 else None for i in top],
+            "metadatas": [sem_metas[i] if i < len(sem_metas) else None for i in top],
+            "documents": [sem_docs[i] if i < len(sem_docs) else None for i in top],
         }
 
 
@@ -360,6 +419,32 @@ class Retriever:
             raise ValueError(f"Unknown retrieval method: {method}. Supported: semantic, keyword, hybrid.")
 
 
+    def retrieve_batch(self, collection_name: str, queries: List[str], k: int = 5, where: Optional[Dict] = None,
+                       method: str = "semantic", **kwargs) -> List[Dict]:
+        """
+        Batched `retrieve` for many queries (e.g. a whole evaluation dataset) against one collection.
+        Returns one result dict per query, in order, in the same format as `retrieve`.
+
+        - semantic: queries are embedded in one pass and sent to Chroma `RETRIEVAL_BATCH_SIZE` at a time
+        - keyword : one BM25 search per query, then a single Chroma `get` for all top-k rows
+                    (without an index the collection is fetched once for the whole batch)
+        - hybrid  : batched semantic candidates, re-ranked per query with numpy
+        """
+        if not queries:
+            return []
+        queries = list(queries)
+        method = (method or "semantic").lower()
+        if method == "semantic":
+            return self._semantic_batch(collection_name, queries, k=k, where=where)
+        elif method == "keyword":
+            return self._keyword_batch(collection_name, queries, k=k, where=where, **kwargs)
+        elif method == "hybrid":
+            alpha = kwargs.get("alpha", 0.7)
+            return self._hybrid_batch(collection_name, queries, k=k, where=where, alpha=alpha)
+        else:
+            raise ValueError(f"Unknown retrieval method: {method}. Supported: semantic, keyword, hybrid.")
+
+
     def retrieve_lang_specific(self, query: str, k: int = 5, language: Optional[str] = None, method: str = "hybrid", 
             where: Optional[Dict] = None, prefer_source: Optional[str] = None, boost: float = 0.18, 
             alpha: float = 0.7, top_k: Optional[int] = None) -> Dict:
@@ -377,23 +462,8 @@ class Retriever:
         if not collections:
             return {"ids": [], "distances": [], "metadatas": [], "documents": []}
 
-        results_pool = []
         per_col_k = max(3, k)       # pick per-collection retrieval k (small) to reduce API load
-
-        for coll in collections:
-            try:
-                if method == "semantic":
-                    r = self.retrieve_semantic(coll, query, k=per_col_k, where=where)
-                elif method == "keyword":
-                    r = self.retrieve_keyword(coll, query, k=per_col_k, where=where)
-                elif method == "hybrid":
-                    r = self.retrieve_hybrid(coll, query, k=per_col_k, where=where, alpha=alpha)
-                else:
-                    r = self.retrieve_semantic(coll, query, k=per_col_k, where=where)
-            except Exception as e:
-                logger.warning("Retrieval failed for collection %s: %s", coll, e)
-                continue
-            results_pool.append(r)
+        results_pool = self._fan_out(collections, query, k=per_col_k, method=method, where=where, alpha=alpha)
 
         final_top_k = top_k or k
         return self._merge_and_rank(results_pool, prefer_source=prefer_source, boost=boost, top_k=final_top_k)
@@ -423,18 +493,58 @@ class Retriever:
         if not candidate_colls:
             return {"ids": [], "distances": [], "metadatas": [], "documents": []}
 
-        results_pool = []
         per_col_k = max(3, k)
-        for coll in candidate_colls:
-            if method == "semantic":
-                r = self.retrieve_semantic(coll, query, k=per_col_k, where=where)
-            elif method == "keyword":
-                r = self.retrieve_keyword(coll, query, k=per_col_k, where=where)
-            elif method == "hybrid":
-                r = self.retrieve_hybrid(coll, query, k=per_col_k, where=where, alpha=alpha)
-            else:
-                r = self.retrieve_semantic(coll, query, k=per_col_k, where=where)
-            results_pool.append(r)
+        results_pool = self._fan_out(candidate_colls, query, k=per_col_k, method=method, where=where, alpha=alpha)
 
         final_top_k = top_k or k
-        return self._merge_and_rank(results_pool, prefer_source=prefer_source, boost=boost, top_k=final_top_k)
\ No newline at end of file
+        return self._merge_and_rank(results_pool, prefer_source=prefer_source, boost=boost, top_k=final_top_k)
+
+
+    def _fan_out(self, collections: List[str], query: str, k: int, method: str = "hybrid",
+                 where: Optional[Dict] = None, alpha: float = 0.7) -> List[Dict]:
+        """
+        Search several collections concurrently (at most RETRIEVAL_MAX_CONCURRENCY at a time) and return
+        the results that arrived: collections that fail, or have not answered RETRIEVAL_COLLECTION_TIMEOUT
+        seconds after the searches were submitted (queued ones included), are logged and left out, so a slow
+        or hung collection cannot stall the merge. Queued searches are cancelled, running ones abandoned.
+        The query is embedded once up front; every collection then hits the query-embedding cache.
+        """
+        if method not in ("semantic", "keyword", "hybrid"):
+            method = "semantic"
+        if method in ("semantic", "hybrid"):
+            try:
+                self.embed_query(query)
+            except Exception as e:
+                logger.warning("Query embedding failed: %s", e)     # surfaces again per collection below
+
+        def _search(coll: str) -> Dict:
+            if method == "keyword":
+                return self.retrieve_keyword(coll, query, k=k, where=where)
+            elif method == "hybrid":
+                return self.retrieve_hybrid(coll, query, k=k, where=where, alpha=alpha)
+            return self.retrieve_semantic(coll, query, k=k, where=where)
+
+        timeout = self.settings.RETRIEVAL_COLLECTION_TIMEOUT
+        workers = max(1, min(self.settings.RETRIEVAL_MAX_CONCURRENCY, len(collections)))
+        results: Dict[str, Dict] = {}
+
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="xrag-retrieve")
+        try:
+            pending = {executor.submit(_search, coll): coll for coll in collections}
+            deadline = time.monotonic() + timeout if timeout else None
+            done, not_done = wait(pending, timeout=max(0.0, deadline - time.monotonic()) if deadline else None)
+            for fut, coll in pending.items():
+                if fut in not_done:
+                    fut.cancel()    # queued: never runs; running: abandoned
+                    logger.warning("Retrieval timed out for collection %s after %.1fs; merging without it", coll, timeout)
+                    continue
+                try:
+                    results[coll] = fut.result()
+                except Exception as e:
+                    logger.warning("Retrieval failed for collection %s: %s", coll, e)
+        finally:
+            # never wait for timed-out searches: their threads finish in the background
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        # keep the collection order of the serial loop for a deterministic merge
+        return [results[coll] for coll in collections if coll in results]
@@ -35,8 +35,9 @@ class Settings:
 
     DEVICE: str = "cpu"
 
-    SENTENCE_SPLITTER: str = "nltk"  # "nltk" or "simple"
-    BATCH_SIZE: int = 8
+    SENTENCE_SPLITTER: str = "segmenter"  # multilingual rule-based segmenter (src/chunker/segmenter.py), no NLTK
+    BATCH_SIZE: int = 8     # chunks per model call in batched summarization
+    BATCHED_SUMMARIZATION: bool = True      # summarize_docs: batch the chunks of all docs (length-sorted) together
     TEMPERATURE = 0.0
 
     OVERLAP_SENTENCES = 1
@@ -56,6 +57,7 @@ class Settings:
             "DEVICE": self.DEVICE,
             "SENTENCE_SPLITTER": self.SENTENCE_SPLITTER,
             "BATCH_SIZE": self.BATCH_SIZE,
+            "BATCHED_SUMMARIZATION": self.BATCHED_SUMMARIZATION,
         }
 
 __all__ = ["Settings"]
\ No newline at end of file
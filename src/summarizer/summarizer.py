@@ -49,21 +49,112 @@ class Summarizer:
             )
 
 
-    def summarize_docs(self, docs: List[Dict[str, Any]] | Dict[str, Any]) -> List[Dict[str, Any]] | Dict[str, Any]:
+    def summarize_docs(self, docs: List[Dict[str, Any]] | Dict[str, Any], batched: Optional[bool] = None) -> List[Dict[str, Any]] | Dict[str, Any]:
         """
         Accept documents in `List[Dict[str, Any]]` and `Dict[str, Any]` format and return after adding "summary" from the "text"
+
+        - batched: summarize the chunks of all docs together in batches of `Settings.BATCH_SIZE`
+          (defaults to `Settings.BATCHED_SUMMARIZATION`); otherwise docs and chunks are summarized one by one.
         """
         if type(docs) is dict:
             docs = [docs]       # To bring single doc to List[Dict[str, Any]] format
 
-        summarized_docs: List[Dict[str, Any]] = []
+        if batched is None:
+            batched = getattr(self.settings, "BATCHED_SUMMARIZATION", True)
+        if batched:
+            return self._summarize_docs_batched(docs)
 
-        # TODO: To implement multiple document passing on one API call for Cohere and HuggingFace, instead of Iteration.
+        summarized_docs: List[Dict[str, Any]] = []
         for doc in docs:
             summarized_docs.append(self._summarize_doc(doc))
         return summarized_docs
 
 
+    def _chunk_texts(self, doc: Dict[str, Any]) -> List[str]:
+        """Chunk texts of a cleaned document (empty list for an empty document)."""
+        if not doc.get("text"):
+            return []
+        # TODO: to give option for Chunking Method.
+        from src.chunker.chunkers import context_aware_chunking
+        chunks = context_aware_chunking(
+            doc, max_chars=self.settings.MAX_CHUNK_CHARS, overlap_sentences=self.settings.OVERLAP_SENTENCES
+        )
+        return [chunk_text for chunk_text, metadata in chunks]
+
+
+    def _summarize_texts(self, texts: List[str]) -> List[str]:
+        """
+        Summarize a list of chunk texts with one model call (the HF pipeline pads and runs them as one batch).
+        Returns one summary per text ("" where the provider failed).
+        """
+        provider = self.settings.MODEL_PROVIDER
+        if provider == "sentence_transformers":
+            out = self.model_wrapper.summarize(
+                texts, max_length=self.settings.MAX_SUMMARY_TOKENS,
+                min_length=self.settings.MIN_SUMMARY_TOKENS, batch_size=len(texts)
+            )
+        elif provider == "openai":
+            out = self.model_wrapper.summarize(texts, max_tokens=self.settings.MAX_SUMMARY_TOKENS)
+        elif provider == "cohere":
+            try:
+                out = self.model_wrapper.summarize(texts)
+            except Exception as e:
+                logger.warning(f"Cohere summarization failed: {e}")
+                return [""] * len(texts)
+        else:
+            raise ValueError(f"Unknown summarizer provider: {provider}")
+
+        if not isinstance(out, list):
+            out = [out]
+        summaries = []
+        for item in out:
+            if isinstance(item, list):      # some pipeline versions nest one list per input
+                item = item[0] if item else ""
+            summaries.append((item.get("summary_text", "") if isinstance(item, dict) else str(item)).strip())
+        return summaries
+
+
+    def _finalize_summary(self, doc: Dict[str, Any], summaries: List[str]) -> Dict[str, Any]:
+        """Join chunk summaries into doc["summary"] (compressed with extractive TextRank when there are several)."""
+        joined = "\n\n".join([s for s in summaries if s])
+        # If we have multiple chunk summaries we can compress them using extractive_textrank
+        if len(summaries) > 1:
+            try:
+                doc["summary"] = extractive_textrank(joined, top_k=self.settings.TOP_K, lang=doc.get("language"))
+                return doc
+            except Exception:
+                doc["summary"] = joined
+                return doc
+        doc["summary"] = joined
+        return doc
+
+
+    def _summarize_docs_batched(self, docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Batched execution mode of `summarize_docs`:
+        - chunks every doc, then flattens the chunks of all docs into one work list
+        - sorts the work list by chunk length so each batch pads to similar lengths
+        - summarizes `Settings.BATCH_SIZE` chunks per model call
+        - scatters the summaries back to their (doc, chunk) slots and finalizes every doc
+        """
+        cleaned = [clean_text(doc) for doc in docs]
+        doc_chunks = [self._chunk_texts(doc) for doc in cleaned]
+
+        work = [(d, c) for d, chunks in enumerate(doc_chunks) for c in range(len(chunks))]
+        work.sort(key=lambda dc: len(doc_chunks[dc[0]][dc[1]]), reverse=True)
+
+        doc_summaries: List[List[str]] = [[""] * len(chunks) for chunks in doc_chunks]
+        batch_size = max(1, int(self.settings.BATCH_SIZE))
+        for start in range(0, len(work), batch_size):
+            batch = work[start:start + batch_size]
+            outs = self._summarize_texts([doc_chunks[d][c] for d, c in batch])
+            for (d, c), summary in zip(batch, outs):
+                doc_summaries[d][c] = summary
+            logger.info("Summarized chunks %d-%d of %d", start + 1, start + len(batch), len(work))
+
+        return [self._finalize_summary(doc, summaries) for doc, summaries in zip(cleaned, doc_summaries)]
+
+
     def _summarize_doc(self, doc: Dict[str, Any]) -> Dict[str, Any]:
         """
         Summarize a single Document in `Dict[str, Any]` format and return the summary string.
@@ -73,17 +164,8 @@ class Summarizer:
         if not doc:
             return ""
 
-        # TODO: to give option for Chunking Method.
-        from src.chunker.chunkers import context_aware_chunking
-        chunks = context_aware_chunking(
-            doc, max_chars=self.settings.MAX_CHUNK_CHARS, overlap_sentences=self.settings.OVERLAP_SENTENCES
-        )
-
-        print(chunks)
-        # exit()
-
         summaries = []
-        for chunk_text, metadata in chunks:        # (tuple[list, list] | list[tuple])
+        for chunk_text in self._chunk_texts(doc):
             if provider == "sentence_transformers":
                 out = self.model_wrapper.summarize(
                     chunk_text, max_length=self.settings.MAX_SUMMARY_TOKENS,
@@ -104,17 +186,7 @@ class Summarizer:
                     logger.warning(f"Cohere summarization failed: {e}")
 
         # Join chunk summaries and optionally run a short final summarization step
-        joined = "\n\n".join([s for s in summaries if s])
-        # If we have multiple chunk summaries we can compress them using extractive_textrank
-        if len(summaries) > 1:
-            try:
-                doc["summary"] = extractive_textrank(joined, top_k=self.settings.TOP_K)
-                return doc
-            except Exception:
-                doc["summary"] = joined
-                return doc
-        doc["summary"] = joined
-        return doc
+        return self._finalize_summary(doc, summaries)
 
 
 
@@ -3,9 +3,11 @@ Utility helpers for summarizer: sentence-splitting, cleaning, extractive TextRan
 """
 
 from __future__ import annotations
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import re
 
+from src.chunker.segmenter import split_sentences as _segment_sentences
+
 
 
 def clean_text(doc: Dict[str, Any]) -> Dict[str, Any]:
@@ -41,17 +43,18 @@ def clean_text(doc: Dict[str, Any]) -> Dict[str, Any]:
 
 
 
-def extractive_textrank(text: str, top_k: int = 3) -> str:
+def extractive_textrank(text: str, top_k: int = 3, lang: Optional[str] = None) -> str:
     """
     Simple extractive summarizer using TF-IDF + PageRank on sentence similarity graph.
 
     This avoids heavy model dependencies and is useful as a reliable fallback.
+    Sentences are split with the segmenter rules of `lang`.
     """
     from sklearn.feature_extraction.text import TfidfVectorizer
     from sklearn.metrics.pairwise import cosine_similarity
     import networkx as nx
 
-    sents = split_sentences(text)
+    sents = split_sentences(text, lang)
     if not sents:
         return ""
     if len(sents) <= top_k:
@@ -76,19 +79,9 @@ def extractive_textrank(text: str, top_k: int = 3) -> str:
 
 
 
-def split_sentences(text: str) -> List[str]:
-    # Prefer nltk if available, otherwise simple punctuation split
-    try:
-        import nltk
-        nltk.data.find("tokenizers/punkt")
-    except Exception:
-        # fallback naive split
-        sentences = re.split(r'(?<=[.!?])\s+', text)
-        return [s.strip() for s in sentences if s.strip()]
-    else:
-        from nltk.tokenize import sent_tokenize
-
-        return sent_tokenize(text)
+def split_sentences(text: str, lang: Optional[str] = None) -> List[str]:
+    # Same multilingual segmenter as the chunkers (src/chunker/segmenter.py); paragraph breaks end sentences
+    return _segment_sentences(text, lang)
 
 
 